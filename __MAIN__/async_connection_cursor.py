@@ -0,0 +1,77 @@
+from aiomysql import Pool, Connection, Cursor, DictCursor, create_pool
+from pymysql.converters import conversions
+from pymysql.constants import FIELD_TYPE
+from pymysql.err import Error, IntegrityError
+from fastapi import HTTPException
+from asyncio import AbstractEventLoop, Lock, get_running_loop, wait_for, TimeoutError
+from config import db_pool_config
+from typing import Any
+
+# Same conversions as CustomConverter, so async handlers return the same JSON as sync ones
+converters: dict[int, Any] = {
+    **conversions,
+    FIELD_TYPE.TINY: lambda value: bool(int(value)),
+    FIELD_TYPE.DATETIME: str
+}
+
+# A pool is bound to the event loop it was created in
+async_pools: dict[tuple[tuple[str, Any], ...], tuple[AbstractEventLoop, Pool]] = {}
+async_pools_lock: tuple[AbstractEventLoop, Lock] | None = None
+
+def get_async_pools_lock() -> Lock:
+    global async_pools_lock
+    if async_pools_lock is None or async_pools_lock[0] is not get_running_loop():
+        async_pools_lock = (get_running_loop(), Lock())
+    return async_pools_lock[1]
+
+async def get_async_pool(config: dict[str, Any]) -> Pool:
+    key: tuple[tuple[str, Any], ...] = tuple(sorted(config.items(), key=lambda item: item[0]))
+    async with get_async_pools_lock():
+        if key not in async_pools or async_pools[key][0] is not get_running_loop():
+            async_pools[key] = (get_running_loop(), await create_pool(
+                minsize=0,
+                maxsize=db_pool_config['size'],
+                pool_recycle=db_pool_config['idle_timeout'],
+                host=config['host'],
+                port=config['port'] or 3306,
+                user=config['user'],
+                password=config['password'],
+                db=config['database'],
+                charset=config['charset'],
+                autocommit=True,
+                conv=converters,
+                cursorclass=DictCursor
+            ))
+        return async_pools[key][1]
+
+def get_async_pools_metrics() -> list[dict[str, Any]]:
+    return [{'size': pool.maxsize, 'open': pool.size, 'idle': pool.freesize} for _, pool in async_pools.values()]
+
+class AsyncConnectionCursor:
+
+    def __init__(self, config: dict[str, Any]) -> None:
+        self.config = config
+
+    async def __aenter__(self) -> Any:
+        self.pool: Pool = await get_async_pool(self.config)
+        try:
+            self.connection: Connection = await wait_for(self.pool.acquire(), db_pool_config['timeout'])
+        except TimeoutError:
+            raise HTTPException(status_code=503, detail="Service Unavailable (database connection pool is exhausted)")
+        try:
+            self.cursor: Cursor = await self.connection.cursor()
+        except:
+            self.connection.close()
+            await self.pool.release(self.connection)
+            raise
+        return self.cursor
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        try:
+            await self.cursor.close()
+        except:
+            self.connection.close()
+        # A database error other than a constraint violation may leave the session in an unknown state, closed connections are dropped by the pool
+        if isinstance(exc_val, Error) and not isinstance(exc_val, IntegrityError):
+            self.connection.close()
+        await self.pool.release(self.connection)
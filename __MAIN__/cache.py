@@ -1,8 +1,19 @@
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from asyncio import AbstractEventLoop, get_running_loop
 from config import config, cache_config
 
 cache: Redis = Redis(**cache_config)
 
+# Async handlers wait on Redis without blocking the event loop, a client is bound to the event loop it was created in
+async_cache: tuple[AbstractEventLoop, AsyncRedis] | None = None
+
+def get_async_cache() -> AsyncRedis:
+    global async_cache
+    if async_cache is None or async_cache[0] is not get_running_loop():
+        async_cache = (get_running_loop(), AsyncRedis(**cache_config))
+    return async_cache[1]
+
 for key, value in config.items():
     if key.startswith('CACHE_SET_') and cache.get(key[10:].lower()) is None:
         cache.set(key[10:].lower(), str(value))
\ No newline at end of file
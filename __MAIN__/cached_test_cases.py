@@ -0,0 +1,33 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any
+
+class CachedTestCases():
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.used = 0
+        self.entries: OrderedDict[tuple[int, int], tuple[list[Any], int]] = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, problem_id: int, edition: int) -> list[Any] | None:
+        with self.lock:
+            entry: tuple[list[Any], int] | None = self.entries.get((problem_id, edition))
+            if entry is None:
+                return None
+            self.entries.move_to_end((problem_id, edition))
+            return entry[0]
+
+    def put(self, problem_id: int, edition: int, test_cases: list[Any]) -> None:
+        size: int = sum(len(test_case['input']) + len(test_case['solution']) for test_case in test_cases)
+        with self.lock:
+            # Every change of the test cases bumps the edition, so older editions of the problem are never read again
+            for key in [key for key in self.entries if key[0] == problem_id]:
+                self.used -= self.entries.pop(key)[1]
+            if size > self.size:
+                return
+            self.entries[(problem_id, edition)] = (test_cases, size)
+            self.used += size
+            while self.used > self.size:
+                self.used -= self.entries.popitem(last=False)[1][1]
+
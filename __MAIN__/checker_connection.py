@@ -71,9 +71,10 @@ class Library:
         except:
             return CreateFilesResultLib(7, "")
 
-    def check_test_case(self, submission_id: int, test_case_id: int, language: str, input: str, solution: str, time_limit: int, memory_limit: int, custom_check: int, custom_check_language: str) -> TestResultLib:
+    def check_test_case(self, submission_id: int, test_case_id: int, language: str, input: str | bytes, solution: str | bytes, time_limit: int, memory_limit: int, custom_check: int, custom_check_language: str) -> TestResultLib:
         try:
-            result: Any = self.lib.check_test_case(submission_id, test_case_id, language.encode('utf-8'), input.encode('utf-8'), solution.encode('utf-8'), time_limit, memory_limit, 1, custom_check, custom_check_language.encode('utf-8')).contents
+            # Already encoded test data is passed as is, ctypes hands the buffer of bytes to the library without a copy
+            result: Any = self.lib.check_test_case(submission_id, test_case_id, language.encode('utf-8'), input if isinstance(input, bytes) else input.encode('utf-8'), solution if isinstance(solution, bytes) else solution.encode('utf-8'), time_limit, memory_limit, 1, custom_check, custom_check_language.encode('utf-8')).contents
             return TestResultLib(result.status, result.time, result.cpu_time, result.physical_memory)
         except:
             return TestResultLib(7, 0, 0, 0)
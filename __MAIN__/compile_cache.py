@@ -0,0 +1,129 @@
+from checker_connection import Library, CreateFilesResultLib
+from cache import cache
+from config import compile_cache_config
+from contextlib import contextmanager
+from hashlib import sha256
+from socket import gethostname
+from fcntl import flock, LOCK_EX, LOCK_SH, LOCK_NB, LOCK_UN
+from json import dumps, loads
+from time import time
+from typing import Any, Iterator
+import os
+
+lock_path: str = os.path.dirname(__file__).replace('\\', '/') + "/checker_files/compile_cache"
+
+# Compiled files live on the local disk, so the index is kept per host while slot ids are unique across hosts
+entries_key: str = f"compile_cache:{gethostname()}:entries"
+lru_key: str = f"compile_cache:{gethostname()}:lru"
+slot_key: str = 'compile_cache:slot'
+
+# Compilation errors are as deterministic as successful compilations, other statuses are retried
+cacheable_statuses: tuple[int, ...] = (0, 5)
+
+def get_key(code: str, language: str, submission: int, custom_check: int, custom_check_language: str, custom_check_code: str) -> str:
+    return sha256('\0'.join([str(submission), language, code, str(custom_check), custom_check_language, custom_check_code]).encode('utf-8')).hexdigest()
+
+# Compiled files are marked next to the lock files, so a wiped checker_files directory drops the marks with the files
+def get_mark_path(slot: int) -> str:
+    return f"{lock_path}/slots/{-slot}"
+
+def mark_slot(slot: int) -> None:
+    os.makedirs(f"{lock_path}/slots", exist_ok=True)
+    open(get_mark_path(slot), 'w').close()
+
+def unmark_slot(slot: int) -> None:
+    if os.path.exists(get_mark_path(slot)):
+        os.remove(get_mark_path(slot))
+
+@contextmanager
+def lock_file(name: str, operation: int = LOCK_EX) -> Iterator[None]:
+    os.makedirs(lock_path, exist_ok=True)
+    with open(f"{lock_path}/{name}.lock", 'w') as file:
+        flock(file, operation)
+        try:
+            yield
+        finally:
+            flock(file, LOCK_UN)
+
+# Judging holds a shared lock, so workers judging from slots of one stripe never wait for each other and only eviction is kept out
+@contextmanager
+def lock_slot(slot: int, operation: int) -> Iterator[None]:
+    # Locks are striped so the number of lock files stays bounded
+    with lock_file(str(-slot % compile_cache_config['locks']), operation):
+        yield
+
+@contextmanager
+def lock_run(files_id: int, run_id: int) -> Iterator[None]:
+    # Runs of one files id take consecutive stripes, so the concurrent test cases of a submission do not wait for each other
+    with lock_file(f"run_{(files_id + run_id) % compile_cache_config['locks']}"):
+        yield
+
+# An entry is only removed while it still points at the same slot, so a newer compilation of the same code is kept
+delete_entry_script: Any = cache.register_script("""
+    if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then
+        return 0
+    end
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    redis.call('ZREM', KEYS[2], ARGV[1])
+    return 1
+""")
+
+def delete_entry(lib: Library, key: str, entry: str) -> None:
+    if delete_entry_script(keys=[entries_key, lru_key], args=[key, entry]) == 1:
+        unmark_slot(loads(entry)['slot'])
+        lib.delete_files(loads(entry)['slot'], loads(entry)['submission'])
+
+def evict(lib: Library) -> None:
+    while cache.zcard(lru_key) > compile_cache_config['size']:
+        evicted: list[tuple[str, float]] = cache.zpopmin(lru_key)
+        if len(evicted) == 0:
+            return
+        entry: str | None = cache.hget(entries_key, evicted[0][0])
+        if entry is None:
+            continue
+        try:
+            with lock_slot(loads(entry)['slot'], LOCK_EX | LOCK_NB):
+                delete_entry(lib, evicted[0][0], entry)
+        except BlockingIOError:
+            # The slot is being judged, it is evicted by a later compilation
+            cache.zadd(lru_key, {evicted[0][0]: time()})
+            return
+
+@contextmanager
+def compiled_files(lib: Library, id: int, code: str, language: str, submission: int, custom_check: int, custom_check_language: str, custom_check_code: str) -> Iterator[tuple[int, CreateFilesResultLib]]:
+    if compile_cache_config['size'] <= 0:
+        try:
+            yield id, lib.create_files(id, code, language, submission, custom_check, custom_check_language, custom_check_code)
+        finally:
+            lib.delete_files(id, submission)
+        return
+    key: str = get_key(code, language, submission, custom_check, custom_check_language, custom_check_code)
+    entry: str | None = cache.hget(entries_key, key)
+    if entry is not None:
+        slot: int = loads(entry)['slot']
+        with lock_slot(slot, LOCK_SH):
+            # The entry might have been evicted while waiting for the lock, or its files removed from the disk
+            if cache.hget(entries_key, key) == entry and os.path.exists(get_mark_path(slot)):
+                cache.zadd(lru_key, {key: time()})
+                yield slot, CreateFilesResultLib(loads(entry)['status'], loads(entry)['description'])
+                return
+        if not os.path.exists(get_mark_path(slot)):
+            delete_entry(lib, key, entry)
+    # Slots are negative so they never collide with submission and debug ids, a new slot is not in the index, so it is compiled without a lock
+    slot: int = -cache.incr(slot_key)
+    create_files_result: CreateFilesResultLib = lib.create_files(slot, code, language, submission, custom_check, custom_check_language, custom_check_code)
+    stored: bool = False
+    with lock_slot(slot, LOCK_SH):
+        if create_files_result.status in cacheable_statuses:
+            mark_slot(slot)
+            # Another worker might have compiled the same code in the meantime, then this slot is not kept
+            stored = cache.hsetnx(entries_key, key, dumps({'slot': slot, 'submission': submission, 'status': create_files_result.status, 'description': create_files_result.description}))
+            if stored:
+                cache.zadd(lru_key, {key: time()})
+        try:
+            yield slot, create_files_result
+        finally:
+            if not stored:
+                unmark_slot(slot)
+                lib.delete_files(slot, submission)
+    evict(lib)
@@ -46,6 +46,68 @@ db_config: dict[str, str | int | Type[CustomConverter] | None] = {
     'charset': 'utf8mb4'
 }
 
+db_pool_config: dict[str, int | float] = {
+    'size': int(config.get('DB_POOL_SIZE') or 32),
+    'timeout': float(config.get('DB_POOL_TIMEOUT') or 10),
+    'idle_timeout': float(config.get('DB_POOL_IDLE_TIMEOUT') or 300),
+    'ping_interval': float(config.get('DB_POOL_PING_INTERVAL') or 30)
+}
+
+judge_config: dict[str, int | float] = {
+    'workers': int(config.get('JUDGE_WORKERS') or 4),
+    # Defaults to an even share of the cores between workers so concurrent test cases do not skew each other's timings
+    'test_cases_parallelism': int(config.get('JUDGE_TEST_CASES_PARALLELISM') or max(1, (os.cpu_count() or 1) // int(config.get('JUDGE_WORKERS') or 4))),
+    'visibility_timeout': float(config.get('JUDGE_VISIBILITY_TIMEOUT') or 120),
+    'requeue_interval': float(config.get('JUDGE_REQUEUE_INTERVAL') or 1),
+    'maximum_attempts': int(config.get('JUDGE_MAXIMUM_ATTEMPTS') or 3),
+    'done_ttl': int(config.get('JUDGE_DONE_TTL') or 3600),
+    # Results are written in one insert at the end of judging unless a positive number of results per insert is set
+    'results_flush_size': int(config.get('JUDGE_RESULTS_FLUSH_SIZE') or 0)
+}
+
+compile_cache_config: dict[str, int] = {
+    'size': int(config.get('COMPILE_CACHE_SIZE') or 256),
+    'locks': int(config.get('COMPILE_CACHE_LOCKS') or 1024)
+}
+
+jwt_config: dict[str, float | int] = {
+    'secret_ttl': float(config.get('JWT_SECRET_TTL') or 5),
+    'verified_tokens_size': int(config.get('JWT_VERIFIED_TOKENS_SIZE') or 4096)
+}
+
+# Flags flipped straight in Redis are seen after the ttl, flags set through feature_flags are pushed at once
+feature_flags_config: dict[str, float] = {
+    'ttl': float(config.get('FEATURE_FLAGS_TTL') or 0.5)
+}
+
+reference_data_config: dict[str, float] = {
+    'ttl': float(config.get('REFERENCE_DATA_TTL') or 60)
+}
+
+# Artifacts are keyed by the problem edition, a changed checker gets a new key and the ttl only drops the old ones
+custom_checker_artifacts_config: dict[str, int] = {
+    'ttl': int(config.get('CUSTOM_CHECKER_ARTIFACT_TTL') or 86400)
+}
+
+test_cases_cache_config: dict[str, int] = {
+    'size': int(config.get('TEST_CASES_CACHE_SIZE') or 256 * 1024 * 1024)
+}
+
+# Scoreboards are kept up to date by invalidations and team updates, the ttl only drops scoreboards nobody reads
+scoreboard_config: dict[str, int] = {
+    'ttl': int(config.get('SCOREBOARD_TTL') or 3600)
+}
+
+# Only anonymous and public responses are cached, writes invalidate them through tags and the ttl bounds anything missed
+response_cache_config: dict[str, int] = {
+    'ttl': int(config.get('RESPONSE_CACHE_TTL') or 300)
+}
+
+pagination_config: dict[str, int] = {
+    'default_limit': int(config.get('PAGINATION_DEFAULT_LIMIT') or 100),
+    'maximum_limit': int(config.get('PAGINATION_MAXIMUM_LIMIT') or 500)
+}
+
 
 cache_config: dict[str, int] = {
     'host': cache_host,
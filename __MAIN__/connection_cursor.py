@@ -1,24 +1,175 @@
 from mysql.connector import MySQLConnection
 from mysql.connector.abstracts import MySQLConnectionAbstract, MySQLCursorAbstract
+from mysql.connector.errors import Error, IntegrityError
+from fastapi import HTTPException
+from threading import Condition
+from time import monotonic
+from config import db_pool_config
+import os
 from typing import Any
 
+class ConnectionPool:
+
+    def __init__(self, config: dict[str, Any], size: int, timeout: float, idle_timeout: float, ping_interval: float) -> None:
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.condition = Condition()
+        self.idle: list[tuple[MySQLConnectionAbstract, float]] = []
+        self.in_use = 0
+        self.pid = os.getpid()
+        self.metrics: dict[str, int] = {
+            'checkouts': 0,
+            'created': 0,
+            'reused': 0,
+            'discarded': 0,
+            'reaped': 0,
+            'waits': 0,
+            'exhausted': 0,
+            'max_in_use': 0
+        }
+
+    def check_pid(self) -> None:
+        # Connections inherited through fork share sockets with the parent, so a child starts with an empty pool
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.idle = []
+            self.in_use = 0
+
+    def reap(self) -> list[MySQLConnectionAbstract]:
+        now: float = monotonic()
+        reaped: list[MySQLConnectionAbstract] = [connection for connection, last_used in self.idle if now - last_used > self.idle_timeout]
+        if len(reaped) > 0:
+            self.idle = [(connection, last_used) for connection, last_used in self.idle if now - last_used <= self.idle_timeout]
+            self.metrics['reaped'] += len(reaped)
+        return reaped
+
+    def close_quietly(self, connections: list[MySQLConnectionAbstract]) -> None:
+        for connection in connections:
+            try:
+                connection.close()
+            except:
+                pass
+
+    def acquire(self) -> MySQLConnectionAbstract:
+        connection: MySQLConnectionAbstract | None = None
+        last_used: float = 0
+        with self.condition:
+            self.check_pid()
+            reaped: list[MySQLConnectionAbstract] = self.reap()
+            deadline: float = monotonic() + self.timeout
+            waited: bool = False
+            while len(self.idle) == 0 and self.in_use >= self.size:
+                if not waited:
+                    waited = True
+                    self.metrics['waits'] += 1
+                remaining: float = deadline - monotonic()
+                if remaining <= 0:
+                    self.metrics['exhausted'] += 1
+                    self.close_quietly(reaped)
+                    raise HTTPException(status_code=503, detail="Service Unavailable (database connection pool is exhausted)")
+                self.condition.wait(remaining)
+            self.in_use += 1
+            self.metrics['checkouts'] += 1
+            self.metrics['max_in_use'] = max(self.metrics['max_in_use'], self.in_use)
+            if len(self.idle) > 0:
+                connection, last_used = self.idle.pop()
+        self.close_quietly(reaped)
+        try:
+            if connection is not None and monotonic() - last_used > self.ping_interval and not connection.is_connected():
+                self.close_quietly([connection])
+                connection = None
+                with self.condition:
+                    self.metrics['discarded'] += 1
+            if connection is None:
+                connection = MySQLConnection(**self.config)
+                connection.autocommit = True
+                with self.condition:
+                    self.metrics['created'] += 1
+            else:
+                with self.condition:
+                    self.metrics['reused'] += 1
+            return connection
+        except:
+            with self.condition:
+                self.in_use -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, connection: MySQLConnectionAbstract, discard: bool = False) -> None:
+        with self.condition:
+            if self.pid != os.getpid():
+                return
+            self.in_use -= 1
+            if discard:
+                self.metrics['discarded'] += 1
+            else:
+                self.idle.append((connection, monotonic()))
+            self.condition.notify()
+        if discard:
+            self.close_quietly([connection])
+
+    def reset(self) -> None:
+        with self.condition:
+            idle: list[MySQLConnectionAbstract] = [connection for connection, _ in self.idle]
+            self.idle = []
+        self.close_quietly(idle)
+
+    def to_json(self) -> dict[str, Any]:
+        with self.condition:
+            return {
+                'size': self.size,
+                'in_use': self.in_use,
+                'idle': len(self.idle),
+                **self.metrics
+            }
+
+pools: dict[tuple[tuple[str, Any], ...], ConnectionPool] = {}
+pools_condition: Condition = Condition()
+
+def get_pool(config: dict[str, Any]) -> ConnectionPool:
+    key: tuple[tuple[str, Any], ...] = tuple(sorted(config.items(), key=lambda item: item[0]))
+    with pools_condition:
+        if key not in pools:
+            pools[key] = ConnectionPool(config, **db_pool_config)
+        return pools[key]
+
+def reset_pools() -> None:
+    with pools_condition:
+        for pool in pools.values():
+            pool.reset()
+
+def get_pools_metrics() -> list[dict[str, Any]]:
+    with pools_condition:
+        return [pool.to_json() for pool in pools.values()]
+
 class ConnectionCursor:
 
     def __init__(self, config: dict[str, Any]) -> None:
         self.config = config
 
     def open(self) -> Any:
-        self.connection: MySQLConnectionAbstract = MySQLConnection(**self.config)
-        self.connection.autocommit = True
-        self.cursor: MySQLCursorAbstract = self.connection.cursor(dictionary=True)
+        self.pool: ConnectionPool = get_pool(self.config)
+        self.connection: MySQLConnectionAbstract = self.pool.acquire()
+        try:
+            self.cursor: MySQLCursorAbstract = self.connection.cursor(dictionary=True)
+        except:
+            self.pool.release(self.connection, True)
+            raise
 
     def __enter__(self) -> Any:
         self.open()
         return self.cursor
 
-    def close(self) -> Any:
-        self.cursor.close()
-        self.connection.close()
+    def close(self, discard: bool = False) -> Any:
+        try:
+            self.cursor.close()
+        except:
+            discard = True
+        self.pool.release(self.connection, discard)
 
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
-        self.close()
\ No newline at end of file
+        # A database error other than a constraint violation may leave the session in an unknown state
+        self.close(isinstance(exc_val, Error) and not isinstance(exc_val, IntegrityError))
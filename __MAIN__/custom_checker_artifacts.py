@@ -0,0 +1,40 @@
+from mysql.connector.abstracts import MySQLCursorAbstract
+from cache import cache
+from config import custom_checker_artifacts_config
+from json import dumps, loads
+from typing import Any
+
+def get_custom_checker_artifact_key(problem_id: int, edition: int) -> str:
+    return f"custom_checker:{problem_id}:{edition}"
+
+def store_custom_checker_artifact(cursor: MySQLCursorAbstract, problem_id: int) -> dict[str, Any]:
+    cursor.execute("""
+        SELECT
+            problems.edition AS edition,
+            custom_checkers.code AS code,
+            languages.name AS language_name,
+            languages.version AS language_version
+        FROM problems
+        LEFT JOIN custom_checkers ON custom_checkers.problem_id = problems.id
+        LEFT JOIN languages ON custom_checkers.language_id = languages.id
+        WHERE problems.id = %(problem_id)s
+        LIMIT 1
+    """, {'problem_id': problem_id})
+    problem: Any = cursor.fetchone()
+    artifact: dict[str, Any] = {'custom_check': 0, 'language': '', 'code': ''}
+    if problem is None:
+        return artifact
+    if problem['code'] is not None:
+        artifact = {'custom_check': 1, 'language': f"{problem['language_name']} ({problem['language_version']})", 'code': problem['code']}
+    cache.set(get_custom_checker_artifact_key(problem_id, problem['edition']), dumps(artifact), ex=custom_checker_artifacts_config['ttl'])
+    return artifact
+
+def get_custom_checker_artifact(cursor: MySQLCursorAbstract, problem_id: int, edition: int) -> dict[str, Any]:
+    artifact: str | None = cache.get(get_custom_checker_artifact_key(problem_id, edition))
+    if artifact is not None:
+        return loads(artifact)
+    return store_custom_checker_artifact(cursor, problem_id)
+
+def clear_custom_checker_artifacts() -> None:
+    for key in cache.scan_iter('custom_checker:*'):
+        cache.delete(key)
@@ -0,0 +1,16 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__).replace('\\', '/') + '/../')
+
+from mysql.connector.abstracts import MySQLCursorAbstract
+from config import db_config
+from connection_cursor import ConnectionCursor
+from solved_problems import backfill_solved_problems
+
+def backfill() -> None:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        backfill_solved_problems(cursor)
+
+if __name__ == "__main__":
+    backfill()
@@ -7,6 +7,13 @@ app_path: str = os.path.dirname(__file__).replace("\\", "/")
 from mysql.connector import MySQLConnection
 from mysql.connector.abstracts import MySQLConnectionAbstract, MySQLCursorAbstract
 from config import db_config
+from connection_cursor import reset_pools
+from scoreboard import invalidate_scoreboards
+from custom_checker_artifacts import clear_custom_checker_artifacts
+from response_cache import clear_responses
+from solved_problems import clear_solved_problems
+import judge_queue
+from database_scripts.migrate import migrate
 
 def clear() -> None:
     connection: MySQLConnectionAbstract
@@ -29,6 +36,13 @@ def clear() -> None:
             with open(f"{app_path}/init.sql") as file:
                 for line in file.read().split(";")[2:]:
                     cursor.execute(line.strip())
+    migrate()
+    reset_pools()
+    invalidate_scoreboards()
+    judge_queue.clear()
+    clear_custom_checker_artifacts()
+    clear_responses()
+    clear_solved_problems()
 
 if __name__ == "__main__":
     clear()
\ No newline at end of file
@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__).replace('\\', '/') + '/../')
+
+app_path: str = os.path.dirname(__file__).replace("\\", "/")
+
+from mysql.connector import MySQLConnection
+from mysql.connector.abstracts import MySQLConnectionAbstract, MySQLCursorAbstract
+from config import db_config
+from date_time import get_current_utc_datetime
+
+def migrate() -> list[str]:
+    applied_now: list[str] = []
+    connection: MySQLConnectionAbstract
+    with MySQLConnection(**db_config) as connection:
+        connection.autocommit = True
+        cursor: MySQLCursorAbstract
+        with connection.cursor(dictionary=True) as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version VARCHAR(255) NOT NULL,
+                    applied_at DATETIME NOT NULL,
+                    PRIMARY KEY (version)
+                )
+            """)
+            cursor.execute("SELECT version FROM schema_migrations")
+            applied: set[str] = {migration['version'] for migration in cursor.fetchall()}
+            for file_name in sorted(os.listdir(f"{app_path}/migrations")):
+                if not file_name.endswith(".sql") or file_name[:-4] in applied:
+                    continue
+                # DDL is not transactional in MySQL, so a migration is recorded only after all of its statements succeeded
+                with open(f"{app_path}/migrations/{file_name}") as file:
+                    for statement in file.read().split(";"):
+                        if statement.strip() != "":
+                            cursor.execute(statement.strip())
+                cursor.execute("INSERT INTO schema_migrations (version, applied_at) VALUES (%(version)s, %(now)s)", {'version': file_name[:-4], 'now': get_current_utc_datetime()})
+                applied_now.append(file_name[:-4])
+    return applied_now
+
+if __name__ == "__main__":
+    for version in migrate():
+        print(f"Applied {version}")
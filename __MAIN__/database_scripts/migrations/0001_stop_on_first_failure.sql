@@ -0,0 +1,5 @@
+ALTER TABLE competitions ADD COLUMN stop_on_first_failure BOOLEAN NOT NULL DEFAULT 0;
+
+ALTER TABLE problems ADD COLUMN stop_on_first_failure BOOLEAN NOT NULL DEFAULT 0;
+
+INSERT INTO verdicts (text) VALUES ('Skipped');
@@ -0,0 +1,3 @@
+CREATE INDEX submissions_author_problem_edition ON submissions (author_user_id, problem_id, problem_edition, correct_score, total_score);
+
+CREATE INDEX competition_submissions_competition_team ON competition_submissions (competition_id, team_id, submission_id);
@@ -0,0 +1,3 @@
+CREATE INDEX submissions_author_time_sent ON submissions (author_user_id, time_sent, id);
+
+CREATE INDEX submissions_problem_time_sent ON submissions (problem_id, time_sent, id);
@@ -0,0 +1,23 @@
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__).replace('\\', '/') + '/../')
+
+from mysql.connector.abstracts import MySQLCursorAbstract
+from config import db_config
+from connection_cursor import ConnectionCursor
+from scoreboard import get_scoreboard_competition, rebuild_scoreboard
+from typing import Any
+
+def rebuild(competition_ids: list[int]) -> None:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        if len(competition_ids) == 0:
+            cursor.execute("SELECT id FROM competitions")
+            competition_ids = [competition['id'] for competition in cursor.fetchall()]
+        for competition_id in competition_ids:
+            competition: Any = get_scoreboard_competition(cursor, competition_id)
+            if competition is not None:
+                rebuild_scoreboard(cursor, competition_id, competition)
+
+if __name__ == "__main__":
+    rebuild([int(competition_id) for competition_id in sys.argv[1:]])
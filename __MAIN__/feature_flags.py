@@ -0,0 +1,39 @@
+from cache import cache
+from config import feature_flags_config
+from time import time
+
+feature_flags_channel: str = 'feature_flag_updates'
+
+class FeatureFlags():
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.loaded_at = 0.0
+        self.values: dict[str, str | None] = {}
+
+    def refresh(self, names: list[str] | None = None) -> dict[str, str | None]:
+        values: dict[str, str | None] = self.values
+        names = list(values.keys()) if names is None else names
+        if len(names) == 0:
+            return values
+        # Flags are read together, so a refresh costs one round trip however many flags are in use
+        values = dict(zip(names, cache.mget(names)))
+        self.values = values
+        self.loaded_at = time()
+        return values
+
+    def get(self, name: str) -> str | None:
+        # Another thread may swap the snapshot at any moment, so the flag is read from the snapshot this call saw or refreshed
+        values: dict[str, str | None] = self.values
+        if name not in values:
+            values = self.refresh(list(values.keys()) + [name])
+        elif time() - self.loaded_at > self.ttl:
+            values = self.refresh()
+        return values.get(name)
+
+    def set(self, name: str, value: str) -> None:
+        cache.set(name, value)
+        self.values = {**self.values, name: value}
+        cache.publish(feature_flags_channel, name)
+
+feature_flags: FeatureFlags = FeatureFlags(feature_flags_config['ttl'])
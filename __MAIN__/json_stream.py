@@ -0,0 +1,32 @@
+from connection_cursor import ConnectionCursor
+from mysql.connector.abstracts import MySQLCursorAbstract
+from models import JsonOrNdjson
+from json import dumps
+from typing import Any, Iterator
+
+media_types: dict[JsonOrNdjson, str] = {
+    JsonOrNdjson.json: 'application/json',
+    JsonOrNdjson.ndjson: 'application/x-ndjson'
+}
+
+# Rows are read one by one from an unbuffered cursor and sent as they come, so memory does not grow with the number of rows
+# The connection is taken once the response starts and is discarded if the client leaves before all rows were read
+def stream_rows(config: dict[str, Any], query: str, params: dict[str, Any], head: dict[str, Any], field: str, format: JsonOrNdjson) -> Iterator[str]:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(config) as cursor:
+        cursor.execute(query, params)
+        row: Any = cursor.fetchone()
+        if format is JsonOrNdjson.ndjson:
+            if len(head) > 0:
+                yield dumps(head) + "\n"
+            while row is not None:
+                yield dumps(row) + "\n"
+                row = cursor.fetchone()
+            return
+        yield dumps(head)[:-1] + (", " if len(head) > 0 else "") + dumps(field) + ": ["
+        separator: str = ""
+        while row is not None:
+            yield separator + dumps(row)
+            separator = ", "
+            row = cursor.fetchone()
+        yield "]}"
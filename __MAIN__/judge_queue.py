@@ -0,0 +1,194 @@
+from cache import cache
+from config import judge_config
+from time import time
+from socket import gethostname
+import os
+from typing import Any
+
+pending_key: str = 'judge_queue:pending'
+debug_pending_key: str = 'judge_queue:debug_pending'
+processing_key: str = 'judge_queue:processing'
+sequence_key: str = 'judge_queue:sequence'
+wakeup_key: str = 'judge_queue:wakeup'
+workers_key: str = 'judge_queue:workers'
+requeue_lock_key: str = 'judge_queue:requeue_lock'
+job_key_prefix: str = 'judge_job:'
+
+# Debug jobs share the queue with submissions, their ids are prefixed so they never collide with submission ids
+debug_job_prefix: str = 'debug:'
+
+# Raised to a worker whose job was handed to another worker or failed, the worker has to stop judging it
+class LostLease(Exception):
+    pass
+
+def get_debug_job_id(debug_id: int) -> str:
+    return f"{debug_job_prefix}{debug_id}"
+
+def get_job_key(job_id: int | str) -> str:
+    return f"{job_key_prefix}{job_id}"
+
+def get_done_key(job_id: int | str) -> str:
+    return f"{job_key_prefix}{job_id}:done"
+
+def get_updates_key(job_id: int | str) -> str:
+    return f"{job_key_prefix}{job_id}:updates"
+
+# A job that is still queued or being judged is left alone, so enqueueing is idempotent
+# The lease survives a new enqueue, so a worker still holding a lease of an earlier run never matches a new one
+enqueue_script: Any = cache.register_script("""
+    local state = redis.call('HGET', KEYS[1], 'state')
+    if state and state ~= 'done' then
+        return 0
+    end
+    local lease = redis.call('HGET', KEYS[1], 'lease') or '0'
+    redis.call('DEL', KEYS[1], KEYS[2], KEYS[6])
+    redis.call('HSET', KEYS[1], 'state', 'queued', 'no_realtime', ARGV[2], 'user_id', ARGV[3], 'attempts', 0, 'lease', lease, 'updated', ARGV[4], 'payload', ARGV[5])
+    redis.call('ZADD', KEYS[3], redis.call('INCR', KEYS[4]), ARGV[1])
+    redis.call('RPUSH', KEYS[5], ARGV[1])
+    return 1
+""")
+
+# Debug runs are interactive and bounded by fixed limits, so they are claimed before any queued submission
+# Every claim takes a new lease, only the holder of the current lease can change the state of the job
+claim_script: Any = cache.register_script("""
+    for _, pending_key in ipairs({KEYS[1], KEYS[2]}) do
+        local job_ids = redis.call('ZRANGE', pending_key, 0, 0)
+        if #job_ids > 0 then
+            redis.call('ZREM', pending_key, job_ids[1])
+            redis.call('ZADD', KEYS[3], ARGV[1], job_ids[1])
+            redis.call('HINCRBY', ARGV[2] .. job_ids[1], 'attempts', 1)
+            local lease = redis.call('HINCRBY', ARGV[2] .. job_ids[1], 'lease', 1)
+            redis.call('HSET', ARGV[2] .. job_ids[1], 'updated', ARGV[3])
+            return {job_ids[1], tostring(lease)}
+        end
+    end
+    return false
+""")
+
+# Jobs whose worker stopped extending the deadline are redelivered until they run out of attempts
+# A job that ran out of attempts is failed by the caller, which takes a new lease for it like a claim does
+requeue_script: Any = cache.register_script("""
+    local job_ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+    local failed = {}
+    for _, job_id in ipairs(job_ids) do
+        local attempts = tonumber(redis.call('HGET', ARGV[3] .. job_id, 'attempts') or '0')
+        if attempts >= tonumber(ARGV[2]) then
+            redis.call('ZADD', KEYS[1], ARGV[4], job_id)
+            table.insert(failed, {job_id, tostring(redis.call('HINCRBY', ARGV[3] .. job_id, 'lease', 1))})
+        else
+            local pending_key = KEYS[2]
+            if string.sub(job_id, 1, string.len(ARGV[5])) == ARGV[5] then
+                pending_key = KEYS[5]
+            end
+            redis.call('ZREM', KEYS[1], job_id)
+            redis.call('HSET', ARGV[3] .. job_id, 'state', 'queued')
+            redis.call('ZADD', pending_key, redis.call('INCR', KEYS[3]), job_id)
+            redis.call('RPUSH', KEYS[4], job_id)
+        end
+    end
+    return failed
+""")
+
+# The state is only changed by the holder of the current lease of a job that is still being processed
+set_state_script: Any = cache.register_script("""
+    if redis.call('HGET', KEYS[1], 'lease') ~= ARGV[2] or not redis.call('ZSCORE', KEYS[2], ARGV[1]) then
+        return 0
+    end
+    redis.call('ZADD', KEYS[2], 'XX', ARGV[4], ARGV[1])
+    redis.call('HSET', KEYS[1], 'state', ARGV[3], 'updated', ARGV[5])
+    redis.call('HSET', KEYS[3], ARGV[6], ARGV[5])
+    return 1
+""")
+
+extend_script: Any = cache.register_script("""
+    if redis.call('HGET', KEYS[1], 'lease') ~= ARGV[2] or not redis.call('ZSCORE', KEYS[2], ARGV[1]) then
+        return 0
+    end
+    redis.call('ZADD', KEYS[2], 'XX', ARGV[3], ARGV[1])
+    redis.call('HSET', KEYS[3], ARGV[5], ARGV[4])
+    return 1
+""")
+
+done_script: Any = cache.register_script("""
+    if redis.call('HGET', KEYS[1], 'lease') ~= ARGV[2] or not redis.call('ZSCORE', KEYS[2], ARGV[1]) then
+        return 0
+    end
+    redis.call('ZREM', KEYS[2], ARGV[1])
+    redis.call('HSET', KEYS[1], 'state', 'done', 'updated', ARGV[3])
+    redis.call('EXPIRE', KEYS[1], ARGV[4])
+    redis.call('RPUSH', KEYS[3], 1)
+    redis.call('EXPIRE', KEYS[3], ARGV[4])
+    return 1
+""")
+
+def enqueue(submission_id: int, no_realtime: bool, user_id: int) -> bool:
+    return enqueue_script(keys=[get_job_key(submission_id), get_done_key(submission_id), pending_key, sequence_key, wakeup_key, get_updates_key(submission_id)], args=[submission_id, int(no_realtime), user_id, time(), '']) == 1
+
+def enqueue_debug(debug_id: int, user_id: int, payload: str) -> bool:
+    job_id: str = get_debug_job_id(debug_id)
+    return enqueue_script(keys=[get_job_key(job_id), get_done_key(job_id), debug_pending_key, sequence_key, wakeup_key, get_updates_key(job_id)], args=[job_id, 1, user_id, time(), payload]) == 1
+
+def claim(timeout: int = 5) -> tuple[str, str] | None:
+    job: list[str] | None = claim_script(keys=[debug_pending_key, pending_key, processing_key], args=[time() + judge_config['visibility_timeout'], job_key_prefix, time()])
+    if job is None:
+        cache.blpop([wakeup_key], timeout)
+        return None
+    return job[0], job[1]
+
+def requeue_expired() -> list[tuple[str, str]]:
+    # Expired jobs are swept by one worker per interval instead of by every worker on every loop
+    if not cache.set(requeue_lock_key, f"{gethostname()}:{os.getpid()}", nx=True, px=int(judge_config['requeue_interval'] * 1000)):
+        return []
+    return [(job[0], job[1]) for job in requeue_script(keys=[processing_key, pending_key, sequence_key, wakeup_key, debug_pending_key], args=[time(), judge_config['maximum_attempts'], job_key_prefix, time() + judge_config['visibility_timeout'], debug_job_prefix])]
+
+def get_job(job_id: int | str) -> dict[str, str]:
+    return cache.hgetall(get_job_key(job_id))
+
+def set_state(job_id: int | str, lease: str, state: str) -> None:
+    if set_state_script(keys=[get_job_key(job_id), processing_key, workers_key], args=[str(job_id), lease, state, time() + judge_config['visibility_timeout'], time(), f"{gethostname()}:{os.getpid()}"]) == 0:
+        raise LostLease()
+
+def extend(job_id: int | str, lease: str) -> bool:
+    return extend_script(keys=[get_job_key(job_id), processing_key, workers_key], args=[str(job_id), lease, time() + judge_config['visibility_timeout'], time(), f"{gethostname()}:{os.getpid()}"]) == 1
+
+def done(job_id: int | str, lease: str) -> None:
+    if done_script(keys=[get_job_key(job_id), processing_key, get_done_key(job_id)], args=[str(job_id), lease, time(), judge_config['done_ttl']]) == 0:
+        raise LostLease()
+
+def wait(job_id: int | str, timeout: int = 0) -> bool:
+    return cache.blpop([get_done_key(job_id)], timeout) is not None
+
+# Updates are published for listeners and also kept, so a listener that missed them can catch up
+def push_update(job_id: int | str, channel: str, message: str) -> None:
+    pipeline: Any = cache.pipeline()
+    pipeline.rpush(get_updates_key(job_id), message)
+    pipeline.expire(get_updates_key(job_id), judge_config['done_ttl'])
+    pipeline.publish(channel, message)
+    pipeline.execute()
+
+def get_updates(job_id: int | str) -> list[str]:
+    return cache.lrange(get_updates_key(job_id), 0, -1)
+
+def heartbeat(worker_id: str) -> None:
+    cache.hset(workers_key, worker_id, time())
+
+def get_workers() -> dict[str, float]:
+    alive_after: float = time() - judge_config['visibility_timeout']
+    workers: dict[str, float] = {worker_id: float(last_heartbeat) for worker_id, last_heartbeat in cache.hgetall(workers_key).items()}
+    stale: list[str] = [worker_id for worker_id, last_heartbeat in workers.items() if last_heartbeat < alive_after]
+    if len(stale) > 0:
+        cache.hdel(workers_key, *stale)
+    return {worker_id: last_heartbeat for worker_id, last_heartbeat in workers.items() if last_heartbeat >= alive_after}
+
+def clear() -> None:
+    cache.delete(pending_key, debug_pending_key, processing_key, sequence_key, wakeup_key, workers_key, requeue_lock_key)
+    for key in cache.scan_iter(f"{job_key_prefix}*"):
+        cache.delete(key)
+
+def to_json() -> dict[str, Any]:
+    return {
+        'pending': cache.zcard(pending_key),
+        'debug_pending': cache.zcard(debug_pending_key),
+        'processing': cache.zcard(processing_key),
+        'workers': get_workers()
+    }
@@ -0,0 +1,322 @@
+from mysql.connector.abstracts import MySQLCursorAbstract
+from config import db_config, judge_config, test_cases_cache_config
+from connection_cursor import ConnectionCursor
+from checker_connection import Library, TestResultLib, DebugResultLib
+from compile_cache import compiled_files
+from scoreboard import update_scoreboard_submission
+from custom_checker_artifacts import get_custom_checker_artifact
+from cached_test_cases import CachedTestCases
+from test_case_runs import skipped_status, run_test_cases, debug
+from submission_results import insert_submission_results, add_submission_result
+from reference_data import reference_data
+from response_cache import invalidate_responses
+from solved_problems import add_solved_problem
+from cache import cache
+from multiprocessing import get_context
+from multiprocessing.process import BaseProcess
+from signal import signal, SIGTERM
+from socket import gethostname
+from time import sleep
+from json import dumps, loads
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from contextlib import contextmanager
+from threading import Thread, Event
+from typing import Any, Iterator, Generator
+import judge_queue
+import sys
+import os
+
+lib: Library = Library()
+
+# Test cases are kept per worker process and keyed by problem edition, which every change of the test cases bumps
+cached_test_cases: CachedTestCases = CachedTestCases(test_cases_cache_config['size'])
+
+def publish_realtime(submission_id: int, message: str) -> None:
+    cache.publish(f"submission_updates:{submission_id}", message)
+
+def check_submission(submission_id: int, lease: str, problem_id: int, problem_edition: int, code: str, language: str, no_realtime: bool, user_id: int) -> None:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        # A redelivered job starts over, so results written by a previous attempt are dropped
+        cursor.execute("DELETE FROM submission_results WHERE submission_id = %(submission_id)s", {'submission_id': submission_id})
+        cursor.execute("""
+            SELECT
+                problems.edition AS edition,
+                problems.time_restriction AS time_restriction,
+                problems.memory_restriction AS memory_restriction,
+                problems.stop_on_first_failure OR IFNULL(competitions.stop_on_first_failure, 0) AS stop_on_first_failure
+            FROM problems
+            LEFT JOIN competition_submissions ON competition_submissions.submission_id = %(submission_id)s
+            LEFT JOIN competitions ON competition_submissions.competition_id = competitions.id
+            WHERE problems.id = %(problem_id)s
+            LIMIT 1
+        """, {'problem_id': problem_id, 'submission_id': submission_id})
+        problem: Any = cursor.fetchone()
+        # The checker is read from the artifact of the current problem edition instead of the database
+        custom_checker: dict[str, Any] = get_custom_checker_artifact(cursor, problem_id, problem['edition'])
+        custom_check: int = custom_checker['custom_check']
+        custom_check_language: str = custom_checker['language']
+        custom_check_code: str = custom_checker['code']
+        judge_queue.set_state(submission_id, lease, 'compiling')
+        with compiled_files(lib, submission_id, code, language, 1, custom_check, custom_check_language, custom_check_code) as (files_id, create_files_result):
+            if create_files_result.status == 0 or create_files_result.status == 6:
+                cursor.execute("""
+                    UPDATE submissions
+                    SET compiled = 1, compilation_details = ''
+                    WHERE id = %(submission_id)s
+                """, {'submission_id': submission_id})
+            else:
+                cursor.execute("""
+                    UPDATE submissions
+                    SET compiled = 0, compilation_details = %(compilation_details)s
+                    WHERE id = %(submission_id)s
+                """, {'submission_id': submission_id, 'compilation_details': create_files_result.description})
+            # Test cases are changed before the edition is bumped, so data read after an edition is never older than it
+            test_cases: list[Any] | None = cached_test_cases.get(problem_id, problem['edition'])
+            if test_cases is None:
+                cursor.execute("""
+                    SELECT id, problem_id, input, solution, score, opened
+                    FROM test_cases
+                    WHERE problem_id = %(problem_id)s
+                """, {'problem_id': problem_id})
+                test_cases = list(cursor.fetchall())
+                # Test data is encoded once per edition, so runs do not encode and copy multi-megabyte inputs again
+                for test_case in test_cases:
+                    test_case['input'] = test_case['input'].encode('utf-8')
+                    test_case['solution'] = test_case['solution'].encode('utf-8')
+                cached_test_cases.put(problem_id, problem['edition'], test_cases)
+            judge_queue.set_state(submission_id, lease, 'running')
+            correct_score: int = 0
+            total_score: int = 0
+            total_verdict: tuple[int, str] = (-1, "")
+            test_results: Generator[TestResultLib, None, None]
+            if create_files_result.status == 0:
+                test_results = run_test_cases(lib, files_id, test_cases, language, problem['time_restriction'], problem['memory_restriction'], custom_check, custom_check_language, problem['stop_on_first_failure'], judge_config['test_cases_parallelism'])
+            else:
+                test_results = (TestResultLib(status=create_files_result.status, time=0, cpu_time=0, physical_memory=0) for test_case in test_cases)
+            submission_results: list[dict[str, int]] = []
+            try:
+                for index, (test_case, test_result) in enumerate(zip(test_cases, test_results)):
+                    if test_result.status == 0:
+                        correct_score += test_case['score']
+                    verdict_text: str = reference_data.get_verdict_text(test_result.status + 2)
+                    # The lease is checked before anything is written, so a worker whose job was handed out again stops before writing results
+                    judge_queue.set_state(submission_id, lease, 'running')
+                    add_submission_result(cursor, submission_results, {'submission_id': submission_id, 'test_case_id': test_case['id'], 'verdict_id': test_result.status + 2, 'time_taken': test_result.time, 'cpu_time_taken': test_result.cpu_time, 'physical_memory_taken': test_result.physical_memory})
+                    if not no_realtime:
+                        publish_realtime(submission_id, dumps({
+                            'type': 'result',
+                            'status': 202,
+                            'count': index + 1,
+                            'result': {
+                                'test_case_id': test_case['id'],
+                                'test_case_score': test_case['score'],
+                                'test_case_opened': test_case['opened'],
+                                'verdict_text': verdict_text,
+                                'time_taken': test_result.time,
+                                'cpu_time_taken': test_result.cpu_time,
+                                'physical_memory_taken': test_result.physical_memory
+                            }
+                        }))
+                    total_score += test_case['score']
+                    if test_result.status != skipped_status:
+                        total_verdict = max(total_verdict, (test_result.status, verdict_text))
+            finally:
+                # Closing the runs cancels the test cases that have not started
+                test_results.close()
+            judge_queue.set_state(submission_id, lease, 'saving')
+            insert_submission_results(cursor, submission_results)
+        cursor.execute("""
+            UPDATE submissions
+            SET checked = 1, correct_score = %(correct_score)s, total_verdict_id = %(total_verdict_id)s
+            WHERE id = %(submission_id)s
+        """, {'submission_id': submission_id, 'correct_score': correct_score, 'total_verdict_id': total_verdict[0] + 2})
+        update_scoreboard_submission(cursor, submission_id)
+        invalidate_responses(f"submissions:problem:{problem_id}", f"submissions:user:{user_id}")
+        # The flag compares the edition the submission was sent for, as the listing queries do
+        if correct_score == total_score:
+            add_solved_problem(user_id, problem_id, problem_edition)
+        if not no_realtime:
+            publish_realtime(submission_id, dumps({
+                'type': 'totals',
+                'status': 200,
+                'totals': {
+                    'compiled': create_files_result.status == 0,
+                    'compilation_details': create_files_result.description,
+                    'correct_score': correct_score,
+                    'total_score': total_score,
+                    'total_verdict': total_verdict[1]
+                }
+            }))
+    judge_queue.done(submission_id, lease)
+    publish_realtime(submission_id, dumps({'type': 'done', 'user_id': user_id}))
+
+def fail_submission(submission_id: int, lease: str) -> None:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        cursor.execute("UPDATE submissions SET checked = 1, total_verdict_id = 9 WHERE id = %(submission_id)s", {'submission_id': submission_id})
+        update_scoreboard_submission(cursor, submission_id)
+        cursor.execute("SELECT problem_id, author_user_id FROM submissions WHERE id = %(submission_id)s LIMIT 1", {'submission_id': submission_id})
+        submission: Any = cursor.fetchone()
+        if submission is not None:
+            invalidate_responses(f"submissions:problem:{submission['problem_id']}", f"submissions:user:{submission['author_user_id']}")
+    job: dict[str, str] = judge_queue.get_job(submission_id)
+    judge_queue.done(submission_id, lease)
+    publish_realtime(submission_id, dumps({'type': 'done', 'user_id': int(job.get('user_id', 0))}))
+
+def judge_submission(submission_id: int, lease: str) -> None:
+    job: dict[str, str] = judge_queue.get_job(submission_id)
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        cursor.execute("""
+            SELECT
+                submissions.problem_id AS problem_id,
+                submissions.problem_edition AS problem_edition,
+                submissions.code AS code,
+                submissions.author_user_id AS author_user_id,
+                submissions.language_id AS language_id
+            FROM submissions
+            WHERE submissions.id = %(submission_id)s
+            LIMIT 1
+        """, {'submission_id': submission_id})
+        submission: Any = cursor.fetchone()
+    if submission is None:
+        judge_queue.done(submission_id, lease)
+        return
+    check_submission(submission_id, lease, submission['problem_id'], submission['problem_edition'], submission['code'], reference_data.get_language_by_id(submission['language_id'])['full_name'], job.get('no_realtime') == '1', submission['author_user_id'])
+
+def publish_debug(debug_id: int, message: str) -> None:
+    judge_queue.push_update(judge_queue.get_debug_job_id(debug_id), f"debug_updates:{debug_id}", message)
+
+def get_debug_result(debug_result: DebugResultLib) -> dict[str, str | int]:
+    verdict: str = ''
+    match debug_result.status:
+        case 0:
+            verdict = 'OK'
+        case 2:
+            verdict = 'Time limit exceeded (10s)'
+        case 3:
+            verdict = 'Memory limit exceeded (1024MB)'
+        case 4:
+            verdict = 'Runtime Error'
+        case _:
+            verdict = 'Internal Server Error'
+    return {
+        'verdict_text': verdict,
+        'time_taken': debug_result.time,
+        'cpu_time_taken': debug_result.cpu_time,
+        'physical_memory_taken': debug_result.physical_memory,
+        'output': debug_result.output
+    }
+
+def run_debug(debug_id: int, lease: str) -> None:
+    job_id: str = judge_queue.get_debug_job_id(debug_id)
+    job: dict[str, str] = judge_queue.get_job(job_id)
+    if 'payload' not in job:
+        judge_queue.done(job_id, lease)
+        return
+    payload: Any = loads(job['payload'])
+    judge_queue.set_state(job_id, lease, 'compiling')
+    with compiled_files(lib, debug_id, payload['code'], payload['language'], 0, 0, "", "") as (files_id, create_files_result):
+        judge_queue.set_state(job_id, lease, 'running')
+        if create_files_result.status != 0:
+            for index in range(len(payload['inputs'])):
+                publish_debug(debug_id, dumps({
+                    'type': 'result',
+                    'index': index,
+                    'result': {
+                        'verdict_text': 'Compilation Error',
+                        'time_taken': 0,
+                        'cpu_time_taken': 0,
+                        'physical_memory_taken': 0,
+                        'output': create_files_result.description
+                    }
+                }))
+        else:
+            # Inputs run concurrently and each result is published as soon as it is ready
+            with ThreadPoolExecutor(max_workers=max(1, min(judge_config['test_cases_parallelism'], len(payload['inputs'])))) as debug_executor:
+                debug_results: dict[Future, int] = {debug_executor.submit(debug, lib, files_id, index + 1, payload['language'], debug_input): index for index, debug_input in enumerate(payload['inputs'])}
+                for debug_result in as_completed(debug_results):
+                    judge_queue.set_state(job_id, lease, 'running')
+                    publish_debug(debug_id, dumps({
+                        'type': 'result',
+                        'index': debug_results[debug_result],
+                        'result': get_debug_result(debug_result.result())
+                    }))
+    judge_queue.done(job_id, lease)
+    publish_debug(debug_id, dumps({'type': 'done'}))
+
+def fail_debug(debug_id: int, lease: str) -> None:
+    judge_queue.done(judge_queue.get_debug_job_id(debug_id), lease)
+    # Inputs without a result are reported as internal server errors by the API
+    publish_debug(debug_id, dumps({'type': 'done'}))
+
+# A long compilation or a big set of test cases can outlast the visibility timeout between state changes, so the deadline is extended while the job runs
+@contextmanager
+def extending_lease(job_id: str, lease: str) -> Iterator[None]:
+    stopped: Event = Event()
+    def extend() -> None:
+        while not stopped.wait(judge_config['visibility_timeout'] / 3):
+            try:
+                if not judge_queue.extend(job_id, lease):
+                    return
+            except Exception:
+                pass
+    extender: Thread = Thread(target=extend, daemon=True)
+    extender.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        extender.join()
+
+def run_judge_worker() -> None:
+    worker_id: str = f"{gethostname()}:{os.getpid()}"
+    while True:
+        try:
+            judge_queue.heartbeat(worker_id)
+            for job_id, lease in judge_queue.requeue_expired():
+                if job_id.startswith(judge_queue.debug_job_prefix):
+                    fail_debug(int(job_id[len(judge_queue.debug_job_prefix):]), lease)
+                else:
+                    fail_submission(int(job_id), lease)
+            job: tuple[str, str] | None = judge_queue.claim()
+            if job is None:
+                continue
+            with extending_lease(job[0], job[1]):
+                if job[0].startswith(judge_queue.debug_job_prefix):
+                    run_debug(int(job[0][len(judge_queue.debug_job_prefix):]), job[1])
+                else:
+                    judge_submission(int(job[0]), job[1])
+        except judge_queue.LostLease:
+            # The job belongs to another worker now, which judges it from the start
+            pass
+        except Exception:
+            # The job is left in processing and is redelivered once its deadline passes
+            sleep(1)
+
+def recover_unchecked_submissions() -> None:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        cursor.execute("SELECT id, author_user_id FROM submissions WHERE checked = 0")
+        for submission in cursor.fetchall():
+            judge_queue.enqueue(submission['id'], True, submission['author_user_id'])
+
+def main(workers: int) -> None:
+    recover_unchecked_submissions()
+    signal(SIGTERM, lambda signal_number, frame: sys.exit(0))
+    judge_workers: list[BaseProcess | None] = [None] * workers
+    try:
+        while True:
+            for index, judge_worker in enumerate(judge_workers):
+                if judge_worker is None or not judge_worker.is_alive():
+                    judge_workers[index] = get_context('fork').Process(target=run_judge_worker, daemon=True)
+                    judge_workers[index].start()
+            sleep(1)
+    finally:
+        for judge_worker in judge_workers:
+            if judge_worker is not None:
+                judge_worker.terminate()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else judge_config['workers'])
@@ -1,6 +1,7 @@
-from fastapi import FastAPI, HTTPException, Header, WebSocket
+from fastapi import FastAPI, HTTPException, Header, WebSocket, WebSocketDisconnect, Response, Query
+from fastapi.concurrency import run_in_threadpool
 from websockets.exceptions import ConnectionClosed
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from models import Empty, Error, Can
 from models import AdminQuery, AdminPassword, Question, QuotasUpateRequest
@@ -11,24 +12,38 @@ from models import TestCaseCreate, TestCaseId, TestCaseUpdate, TestCaseFull, Tes
 from models import CustomCheckerBase, CustomCheckerId, CustomCheckerUpdate, CustomCheckerFull
 from models import SubmissionCreate, SubmissionId, SubmissionPublic, SubmissionsPublic, SubmissionFull, SubmissionUnchecked
 from models import WebcoketSubmissionsResult, WebcoketSubmissionsTotals, WebcoketSubmissionsMessage
-from models import Debug, DebugMany, DebugResult, DebugResults
+from models import Debug, DebugMany, DebugResult, DebugResults, DebugResultIndexed
 from models import CompetitionCreate, CompetitionId, CompetitionUpdate, CompetitionFull, CompetitionsFull
 from models import CompetitionParticipantCreate, CompetitionParticipantFull, CompetitionParticipantsFull
 from models import CompetitionProblemsCreate
-from models import CompetitionScoreboard
-from models import DbOrCache, ProblemsOrCompetitions, ApproveOrUnapprove, SetOrIncrement, ActivateOrDeactivate, CoachOrContestant, ConfirmOrDecline, PrivateOrPublic, OpenedOrClosed, IndividualsOrTeams, AuthoredOrParticipated
+from models import CompetitionScoreboard, WebcoketScoreboardFull, WebcoketScoreboardDiff, WebcoketScoreboardMessage
+from models import JsonOrNdjson, DbOrCache, ProblemsOrCompetitions, ApproveOrUnapprove, SetOrIncrement, ActivateOrDeactivate, CoachOrContestant, ConfirmOrDecline, PrivateOrPublic, OpenedOrClosed, IndividualsOrTeams, AuthoredOrParticipated
 from mysql.connector.abstracts import MySQLCursorAbstract
 from mysql.connector.errors import IntegrityError
-from config import config, email_config, db_config
-from connection_cursor import ConnectionCursor
+from config import config, email_config, db_config, pagination_config, response_cache_config, judge_config
+from connection_cursor import ConnectionCursor, get_pools_metrics
+from async_connection_cursor import AsyncConnectionCursor, get_async_pools_metrics
+from pagination import decode_page, check_start, check_limit, get_page
+from queries import verified_user_id_by_username_query, verified_user_by_email_query, team_by_name_query, user_submissions_condition, problem_submissions_condition, competition_team_submissions_condition, get_submissions_public_query, get_competition_submissions_public_query
+from json_stream import stream_rows, media_types
+from response_cache import CachedResponse, invalidate_responses
+from solved_problems import solved_problems_ready, get_solved, get_solved_async, is_solved, remove_solved_problem
+from aiomysql import Cursor
 from security.hash import hash_hex
-from security.jwt import encode_token, Token, decode_token
-from typing import Annotated
-from checker_connection import Library, TestResultLib, CreateFilesResultLib, DebugResultLib
-from concurrent.futures import ThreadPoolExecutor, Future
+from security.jwt import encode_token, Token, decode_token, reload_jwt_secret, jwt_secret_channel
+from typing import Annotated, AsyncIterator
+from custom_checker_artifacts import store_custom_checker_artifact
+from reference_data import reference_data, reference_data_channel
+from feature_flags import feature_flags, feature_flags_channel
 from realtime_testing import RealtimeTesting
+from realtime_scoreboard import RealtimeScoreboard
+from threading import Thread, Lock, Event as ThreadingEvent
+from functools import partial
+import judge_queue
+from asyncio import get_running_loop, create_task, wait, wait_for, FIRST_COMPLETED, Event, Queue, AbstractEventLoop, TimeoutError
+from time import sleep
 from typing import Any
-from json import dumps
+from json import dumps, loads
 from smtplib import SMTP_SSL
 from email.mime.text import MIMEText
 from datetime import datetime, timedelta
@@ -36,22 +51,21 @@ from date_time import convert_and_validate_datetime, get_current_unix_time, get_
 from pyotp import TOTP
 from cache import cache
 from validation import text_max_length
-
-checking_queue: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=4)
-checking_queue_futures: list[Future] = []
-
-debugging_queue: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=2)
-debugging_queue_futures: list[Future] = []
+from scoreboard import get_scoreboard, get_scoreboard_competition, update_scoreboard_team, invalidate_scoreboard, invalidate_scoreboards_by_problem, invalidate_scoreboards_by_team
 
 testing_users: dict[int, bool] = {}
 realtime_testings: dict[int, RealtimeTesting] = {}
+realtime_scoreboards: dict[int, RealtimeScoreboard] = {}
+submission_waiters: dict[int, tuple[AbstractEventLoop, Event]] = {}
+debug_waiters: dict[int, tuple[AbstractEventLoop, Queue]] = {}
+updates_listener: Thread | None = None
+updates_listener_lock: Lock = Lock()
+updates_listener_ready: ThreadingEvent = ThreadingEvent()
 
 totp: TOTP = TOTP(cache.get('totp_secret'))
 
 admin_continuous_failed_attempts: int = 0
 
-lib: Library = Library()
-
 app: FastAPI = FastAPI(
     title="efrog API (Connector)",
     version="1.0.0",
@@ -73,6 +87,73 @@ app.add_middleware(
 def root() -> RedirectResponse:
     return RedirectResponse('/docs', status_code=301)
 
+def handle_submission_update(submission_id: int, message: str) -> None:
+    update: Any = loads(message)
+    if update['type'] == 'done':
+        testing_users.pop(update['user_id'], None)
+        submission_waiter: tuple[AbstractEventLoop, Event] | None = submission_waiters.get(submission_id)
+        if submission_waiter is not None:
+            submission_waiter[0].call_soon_threadsafe(submission_waiter[1].set)
+        if submission_id in realtime_testings:
+            realtime_testings[submission_id].finished = True
+            realtime_testings[submission_id].new_messages_flag.set()
+            if not realtime_testings[submission_id].opened_websocket:
+                del realtime_testings[submission_id]
+    elif submission_id in realtime_testings:
+        realtime_testings[submission_id].add_message(message)
+
+def handle_debug_update(debug_submission_id: int, message: str) -> None:
+    debug_waiter: tuple[AbstractEventLoop, Queue] | None = debug_waiters.get(debug_submission_id)
+    if debug_waiter is not None:
+        debug_waiter[0].call_soon_threadsafe(debug_waiter[1].put_nowait, message)
+
+def handle_scoreboard_update(competition_id: int, message: str) -> None:
+    realtime_scoreboard: RealtimeScoreboard | None = realtime_scoreboards.get(competition_id)
+    if realtime_scoreboard is None:
+        return
+    if loads(message)['type'] == 'reset':
+        realtime_scoreboard.reset_threadsafe()
+    else:
+        realtime_scoreboard.add_message_threadsafe(message)
+
+def listen_updates() -> None:
+    while True:
+        try:
+            pubsub: Any = cache.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe('submission_updates:*', 'scoreboard_updates:*', 'debug_updates:*')
+            pubsub.subscribe(reference_data_channel, feature_flags_channel, jwt_secret_channel)
+            updates_listener_ready.set()
+            for update in pubsub.listen():
+                channel: str = update['channel']
+                if channel == reference_data_channel:
+                    reference_data.refresh()
+                elif channel == feature_flags_channel:
+                    feature_flags.refresh()
+                elif channel == jwt_secret_channel:
+                    reload_jwt_secret()
+                elif channel.startswith('submission_updates:'):
+                    handle_submission_update(int(channel[channel.find(':') + 1:]), update['data'])
+                elif channel.startswith('debug_updates:'):
+                    handle_debug_update(int(channel[channel.find(':') + 1:]), update['data'])
+                else:
+                    handle_scoreboard_update(int(channel[channel.find(':') + 1:]), update['data'])
+        except Exception:
+            sleep(1)
+
+def start_updates_listener() -> None:
+    global updates_listener
+    with updates_listener_lock:
+        if updates_listener is None:
+            updates_listener = Thread(target=listen_updates, daemon=True)
+            updates_listener.start()
+    # Realtime messages published before the subscription exists would be lost
+    updates_listener_ready.wait(5)
+
+@app.on_event("startup")
+def startup() -> None:
+    reference_data.refresh()
+    start_updates_listener()
+
 @app.get("/test", include_in_schema=False)
 def test() -> JSONResponse:
     return JSONResponse({
@@ -87,12 +168,12 @@ def test() -> JSONResponse:
 @app.post("/admin/query/{db_or_cache}", include_in_schema=False)
 def post_admin_query(admin_query: AdminQuery, db_or_cache: DbOrCache) -> JSONResponse:
     global admin_continuous_failed_attempts
-    if cache.get('block_admin') == 'True':
+    if feature_flags.get('block_admin') == 'True':
         raise HTTPException(status_code=403, detail="Admin request is blocked")
     if admin_query.password != totp.at(get_current_unix_time(True)):
         admin_continuous_failed_attempts += 1
         if admin_continuous_failed_attempts >= 10:
-            cache.set('block_admin', 'True')
+            feature_flags.set('block_admin', 'True')
         raise HTTPException(status_code=401, detail="Incorrect password")
     admin_continuous_failed_attempts = 0
     if db_or_cache is DbOrCache.db:
@@ -114,8 +195,12 @@ def post_admin_query(admin_query: AdminQuery, db_or_cache: DbOrCache) -> JSONRes
                 })
     else:
         try:
+            output: Any = cache.execute_command(admin_query.query)
+            # The query might have flipped a flag or rotated the secret, so every API process rereads them
+            cache.publish(feature_flags_channel, 'refresh')
+            cache.publish(jwt_secret_channel, 'refresh')
             return JSONResponse({
-                'output': cache.execute_command(admin_query.query)
+                'output': output
             })
         except Exception as e:
             return JSONResponse({
@@ -125,17 +210,17 @@ def post_admin_query(admin_query: AdminQuery, db_or_cache: DbOrCache) -> JSONRes
 @app.put("/admin/users/{username}/email/verify", include_in_schema=False)
 def put_admin_verify(admin_password: AdminPassword, username: str) -> JSONResponse:
     global admin_continuous_failed_attempts
-    if cache.get('block_admin') == 'True':
+    if feature_flags.get('block_admin') == 'True':
         raise HTTPException(status_code=403, detail="Admin request is blocked")
     if admin_password.password != totp.at(get_current_unix_time(True)):
         admin_continuous_failed_attempts += 1
         if admin_continuous_failed_attempts >= 10:
-            cache.set('block_admin', 'True')
+            feature_flags.set('block_admin', 'True')
         raise HTTPException(status_code=401, detail="Incorrect password")
     admin_continuous_failed_attempts = 0
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT id, username FROM users WHERE username = BINARY %(username)s AND verified = 0 LIMIT 1", {'username': username})
+        cursor.execute("SELECT id, username FROM users WHERE username = %(username)s AND username = BINARY %(username)s AND verified = 0 LIMIT 1", {'username': username})
         user_db: Any = cursor.fetchone()
         if user_db is None:
             raise HTTPException(status_code=404, detail="User does not exist or email is already verified")
@@ -152,20 +237,22 @@ def put_admin_verify(admin_password: AdminPassword, username: str) -> JSONRespon
 @app.put("/admin/{problems_or_competitions}/{id}/{approve_or_unapprove}", include_in_schema=False)
 def put_admin_approve(admin_password: AdminPassword, problems_or_competitions: ProblemsOrCompetitions, id: int, approve_or_unapprove: ApproveOrUnapprove) -> JSONResponse:
     global admin_continuous_failed_attempts
-    if cache.get('block_admin') == 'True':
+    if feature_flags.get('block_admin') == 'True':
         raise HTTPException(status_code=403, detail="Admin request is blocked")
     if admin_password.password != totp.at(get_current_unix_time(True)):
         admin_continuous_failed_attempts += 1
         if admin_continuous_failed_attempts >= 10:
-            cache.set('block_admin', 'True')
+            feature_flags.set('block_admin', 'True')
         raise HTTPException(status_code=401, detail="Incorrect password")
     admin_continuous_failed_attempts = 0
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
         if problems_or_competitions is ProblemsOrCompetitions.problems:
             cursor.execute("UPDATE problems SET approved = %(approve_or_unapprove)s WHERE id = %(id)s", {'id': id, 'approve_or_unapprove': approve_or_unapprove is ApproveOrUnapprove.approve})
+            invalidate_responses('problems', f"problem:{id}")
         else:
             cursor.execute("UPDATE competitions SET approved = %(approve_or_unapprove)s WHERE id = %(id)s", {'id': id, 'approve_or_unapprove': approve_or_unapprove is ApproveOrUnapprove.approve})
+            invalidate_responses('competitions', f"competition:{id}")
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="Problem or competition does not exist or is already approved")
     return JSONResponse({})
@@ -173,60 +260,70 @@ def put_admin_approve(admin_password: AdminPassword, problems_or_competitions: P
 @app.put("/admin/users/{username}/quotas/{set_or_increment}", include_in_schema=False)
 def put_admin_quotas(username: str, quotas: QuotasUpateRequest, set_or_increment: SetOrIncrement) -> JSONResponse:
     global admin_continuous_failed_attempts
-    if cache.get('block_admin') == 'True':
+    if feature_flags.get('block_admin') == 'True':
         raise HTTPException(status_code=403, detail="Admin request is blocked")
     if quotas.password != totp.at(get_current_unix_time(True)):
         admin_continuous_failed_attempts += 1
         if admin_continuous_failed_attempts >= 10:
-            cache.set('block_admin', 'True')
+            feature_flags.set('block_admin', 'True')
         raise HTTPException(status_code=401, detail="Incorrect password")
     admin_continuous_failed_attempts = 0
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT problems_quota, test_cases_quota, competitions_quota FROM users WHERE username = BINARY %(username)s LIMIT 1", {'username': username})
+        cursor.execute("SELECT problems_quota, test_cases_quota, competitions_quota FROM users WHERE username = %(username)s AND username = BINARY %(username)s LIMIT 1", {'username': username})
         user_db: Any = cursor.fetchone()
         if user_db is None:
             raise HTTPException(status_code=404, detail="User does not exist")
         if quotas.problems is not None:
             if (user_db['problems_quota'] if set_or_increment is SetOrIncrement.increment else 0) + quotas.problems < 0:
                 raise HTTPException(status_code=400, detail="Quota cannot be negative")
-            cursor.execute("UPDATE users SET problems_quota = %(problems_quota)s WHERE username = BINARY %(username)s", {'problems_quota': (user_db['problems_quota'] if set_or_increment is SetOrIncrement.increment else 0) + quotas.problems, 'username': username})
+            cursor.execute("UPDATE users SET problems_quota = %(problems_quota)s WHERE username = %(username)s AND username = BINARY %(username)s", {'problems_quota': (user_db['problems_quota'] if set_or_increment is SetOrIncrement.increment else 0) + quotas.problems, 'username': username})
         if quotas.test_cases is not None:
             if (user_db['test_cases_quota'] if set_or_increment is SetOrIncrement.increment else 0) + quotas.test_cases < 0:
                 raise HTTPException(status_code=400, detail="Quota cannot be negative")
-            cursor.execute("UPDATE users SET test_cases_quota = %(test_cases_quota)s WHERE username = BINARY %(username)s", {'test_cases_quota': (user_db['test_cases_quota'] if set_or_increment is SetOrIncrement.increment else 0) + quotas.test_cases, 'username': username})
+            cursor.execute("UPDATE users SET test_cases_quota = %(test_cases_quota)s WHERE username = %(username)s AND username = BINARY %(username)s", {'test_cases_quota': (user_db['test_cases_quota'] if set_or_increment is SetOrIncrement.increment else 0) + quotas.test_cases, 'username': username})
         if quotas.competitions is not None:
             if (user_db['competitions_quota'] if set_or_increment is SetOrIncrement.increment else 0) + quotas.competitions < 0:
                 raise HTTPException(status_code=400, detail="Quota cannot be negative")
-            cursor.execute("UPDATE users SET competitions_quota = %(competitions_quota)s WHERE username = BINARY %(username)s", {'competitions_quota': (user_db['competitions_quota'] if set_or_increment is SetOrIncrement.increment else 0) + quotas.competitions, 'username': username})
-        cursor.execute("SELECT problems_quota AS new_problems_quota, test_cases_quota AS new_test_cases_quota, competitions_quota AS new_competitions_quota FROM users WHERE username = BINARY %(username)s LIMIT 1", {'username': username})
+            cursor.execute("UPDATE users SET competitions_quota = %(competitions_quota)s WHERE username = %(username)s AND username = BINARY %(username)s", {'competitions_quota': (user_db['competitions_quota'] if set_or_increment is SetOrIncrement.increment else 0) + quotas.competitions, 'username': username})
+        invalidate_responses(f"user:{username}")
+        cursor.execute("SELECT problems_quota AS new_problems_quota, test_cases_quota AS new_test_cases_quota, competitions_quota AS new_competitions_quota FROM users WHERE username = %(username)s AND username = BINARY %(username)s LIMIT 1", {'username': username})
         return JSONResponse(cursor.fetchone())
 
+@app.put("/admin/reference-data/refresh", include_in_schema=False)
+def put_admin_refresh_reference_data(admin_password: AdminPassword) -> JSONResponse:
+    global admin_continuous_failed_attempts
+    if feature_flags.get('block_admin') == 'True':
+        raise HTTPException(status_code=403, detail="Admin request is blocked")
+    if admin_password.password != totp.at(get_current_unix_time(True)):
+        admin_continuous_failed_attempts += 1
+        if admin_continuous_failed_attempts >= 10:
+            feature_flags.set('block_admin', 'True')
+        raise HTTPException(status_code=401, detail="Incorrect password")
+    admin_continuous_failed_attempts = 0
+    reference_data.refresh()
+    # Other API processes refresh through the updates listener, judge workers pick the change up once their copy expires
+    cache.publish(reference_data_channel, 'refresh')
+    return JSONResponse(reference_data.to_json())
+
 @app.get("/admin/current-testing", include_in_schema=False)
 def get_admin_current_testing(admin_password: AdminPassword) -> JSONResponse:
     global admin_continuous_failed_attempts
-    if cache.get('block_admin') == 'True':
+    if feature_flags.get('block_admin') == 'True':
         raise HTTPException(status_code=403, detail="Admin request is blocked")
     if admin_password.password != totp.at(get_current_unix_time(True)):
         admin_continuous_failed_attempts += 1
         if admin_continuous_failed_attempts >= 10:
-            cache.set('block_admin', 'True')
+            feature_flags.set('block_admin', 'True')
         raise HTTPException(status_code=401, detail="Incorrect password")
     admin_continuous_failed_attempts = 0
-    checking_queue_futures_running: int = 0
-    future: Future
-    for future in checking_queue_futures:
-        checking_queue_futures_running += future.running()
-    debugging_queue_futures_running: int = 0
-    for future in debugging_queue_futures:
-        debugging_queue_futures_running += future.running()
     return JSONResponse({
         'testing_users': testing_users,
         'realtime_testings': dict(map(lambda item: (item[0], item[1].to_json()), realtime_testings.items())),
-        'checking_queue_size': checking_queue._work_queue.qsize(),
-        'checking_queue_futures_running': checking_queue_futures_running,
-        'debugging_queue_size': debugging_queue._work_queue.qsize(),
-        'debugging_queue_futures_running': debugging_queue_futures_running
+        'realtime_scoreboards': dict(map(lambda item: (item[0], item[1].to_json()), realtime_scoreboards.items())),
+        'judge_queue': judge_queue.to_json(),
+        'db_pools': get_pools_metrics(),
+        'async_db_pools': get_async_pools_metrics()
     })
 
 @app.post("/question", tags=["Questions"], description="Ask a question that will be send to as through email with CC to you", responses={
@@ -234,7 +331,7 @@ def get_admin_current_testing(admin_password: AdminPassword) -> JSONResponse:
     403: { 'model': Error, 'description': "Questions are blocked" }
 })
 def post_question(question: Question) -> JSONResponse:
-    if cache.get('block_questions') == 'True':
+    if feature_flags.get('block_questions') == 'True':
         raise HTTPException(status_code=403, detail="Questions are blocked")
     msg = MIMEText(question.question)
     msg['Subject'] = f"QUESTION: {question.topic} FROM: {question.email}"
@@ -252,11 +349,11 @@ def post_question(question: Question) -> JSONResponse:
     403: { 'model': Error, 'description': "Authorization is blocked" }
 })
 def post_token(user: UserToken) -> JSONResponse:
-    if cache.get('block_authorization') == 'True':
+    if feature_flags.get('block_authorization') == 'True':
         raise HTTPException(status_code=403, detail="Authorization is blocked")
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT id, username, password, verified FROM users WHERE username = BINARY %(username)s LIMIT 1", {'username': user.username})
+        cursor.execute("SELECT id, username, password, verified FROM users WHERE username = %(username)s AND username = BINARY %(username)s LIMIT 1", {'username': user.username})
         user_db: Any = cursor.fetchone()
         if user_db is None:
             raise HTTPException(status_code=401, detail="User does not exist")
@@ -283,7 +380,7 @@ def send_verification_token(id: int, username: str, email: str) -> None:
     409: { 'model': Error, 'description': "User already exists" }
 })
 def post_user(user: UserCreate, do_not_send_verification_token: bool = False) -> JSONResponse:
-    if cache.get('block_user_registration') == 'True':
+    if feature_flags.get('block_user_registration') == 'True':
         raise HTTPException(status_code=403, detail="User registration is blocked")
     if user.username == "":
         raise HTTPException(status_code=400, detail="Username is empty")
@@ -324,7 +421,7 @@ def post_user(user: UserCreate, do_not_send_verification_token: bool = False) ->
 def get_email_resend_token(email: str) -> JSONResponse:
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT id, username, email, verified FROM users WHERE email = BINARY %(email)s LIMIT 1", {'email': email})
+        cursor.execute("SELECT id, username, email, verified FROM users WHERE email = %(email)s AND email = BINARY %(email)s LIMIT 1", {'email': email})
         user_db: Any = cursor.fetchone()
         if user_db is None:
             raise HTTPException(status_code=401, detail="User does not exist")
@@ -381,20 +478,24 @@ def get_user_me_id(authorization: Annotated[str | None, Header()]) -> JSONRespon
     200: { 'model': UserFull, 'description': "All good" },
     404: { 'model': Error, 'description': "User does not exist" }
 })
-def get_user(username: str) -> JSONResponse:  
+def get_user(username: str, if_none_match: Annotated[str | None, Header()] = None) -> Response:  
+    cached: CachedResponse = CachedResponse(f"user:{username}", [f"user:{username}"], if_none_match)
+    response: Response | None = cached.get()
+    if response is not None:
+        return response
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT username, email, name, problems_quota, test_cases_quota, competitions_quota FROM users WHERE username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': username})
+        cursor.execute("SELECT username, email, name, problems_quota, test_cases_quota, competitions_quota FROM users WHERE username = %(username)s AND username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': username})
         user: Any = cursor.fetchone()
         if user is None:
             raise HTTPException(status_code=404, detail="User does not exist")
-        return JSONResponse(user)
+        return cached.set(user)
 
 @app.get("/users/{username}/id", include_in_schema=False)
 def get_user_id(username: str) -> JSONResponse:  
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT id FROM users WHERE username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': username})
+        cursor.execute(verified_user_id_by_username_query, {'username': username})
         user: Any = cursor.fetchone()
         if user is None:
             raise HTTPException(status_code=404, detail="User does not exist")
@@ -424,7 +525,7 @@ def put_user(username: str, user: UserUpdate, authorization: Annotated[str | Non
         raise HTTPException(status_code=403, detail="You are trying to change not your data")
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT username, email, name, password FROM users WHERE username = BINARY %(username)s LIMIT 1", {'username': username})
+        cursor.execute("SELECT username, email, name, password FROM users WHERE username = %(username)s AND username = BINARY %(username)s LIMIT 1", {'username': username})
         user_db: Any = cursor.fetchone()
         if user_db is None:
             raise HTTPException(status_code=404, detail="User does not exist")
@@ -434,7 +535,7 @@ def put_user(username: str, user: UserUpdate, authorization: Annotated[str | Non
             if len(user.email) > text_max_length['tinytext']:
                 raise HTTPException(status_code=400, detail="Email is too long")
             try:
-                cursor.execute("UPDATE users SET email = %(email)s WHERE username = BINARY %(username)s", {'email': user.email, 'username': username})
+                cursor.execute("UPDATE users SET email = %(email)s WHERE username = %(username)s AND username = BINARY %(username)s", {'email': user.email, 'username': username})
             except IntegrityError:
                 raise HTTPException(status_code=409, detail="This email is already taken")
         if user.name is not None:
@@ -442,34 +543,41 @@ def put_user(username: str, user: UserUpdate, authorization: Annotated[str | Non
                 raise HTTPException(status_code=400, detail="Name is empty")
             if len(user.name) > text_max_length['tinytext']:
                 raise HTTPException(status_code=400, detail="Name is too long")
-            cursor.execute("UPDATE users SET name = %(name)s WHERE username = BINARY %(username)s", {'name': user.name, 'username': username})
+            cursor.execute("UPDATE users SET name = %(name)s WHERE username = %(username)s AND username = BINARY %(username)s", {'name': user.name, 'username': username})
         if user.password is not None:
             if user.password == "":
                 raise HTTPException(status_code=400, detail="Password is empty")
             if len(user.password) > text_max_length['tinytext']:
                 raise HTTPException(status_code=400, detail="Password is too long")
-            cursor.execute("UPDATE users SET password = %(password)s WHERE username = BINARY %(username)s", {'password': hash_hex(user.password), 'username': username})
+            cursor.execute("UPDATE users SET password = %(password)s WHERE username = %(username)s AND username = BINARY %(username)s", {'password': hash_hex(user.password), 'username': username})
         if user.username is not None:
             if user.username == "":
                 raise HTTPException(status_code=400, detail="Username is empty")
             if len(user.username) < 3:
-                cursor.execute("UPDATE users SET email = %(email)s WHERE username = BINARY %(username)s", {'email': user_db['email'], 'username': username})
-                cursor.execute("UPDATE users SET name = %(name)s WHERE username = BINARY %(username)s", {'name': user_db['name'], 'username': username})
-                cursor.execute("UPDATE users SET password = %(password)s WHERE username = BINARY %(username)s", {'password': user_db['password'], 'username': username})
+                cursor.execute("UPDATE users SET email = %(email)s WHERE username = %(username)s AND username = BINARY %(username)s", {'email': user_db['email'], 'username': username})
+                cursor.execute("UPDATE users SET name = %(name)s WHERE username = %(username)s AND username = BINARY %(username)s", {'name': user_db['name'], 'username': username})
+                cursor.execute("UPDATE users SET password = %(password)s WHERE username = %(username)s AND username = BINARY %(username)s", {'password': user_db['password'], 'username': username})
+                invalidate_responses(f"user:{username}")
                 raise HTTPException(status_code=400, detail="Username is too short")
             if len(user.username) > text_max_length['tinytext']:
-                cursor.execute("UPDATE users SET email = %(email)s WHERE username = BINARY %(username)s", {'email': user_db['email'], 'username': username})
-                cursor.execute("UPDATE users SET name = %(name)s WHERE username = BINARY %(username)s", {'name': user_db['name'], 'username': username})
-                cursor.execute("UPDATE users SET password = %(password)s WHERE username = BINARY %(username)s", {'password': user_db['password'], 'username': username})
+                cursor.execute("UPDATE users SET email = %(email)s WHERE username = %(username)s AND username = BINARY %(username)s", {'email': user_db['email'], 'username': username})
+                cursor.execute("UPDATE users SET name = %(name)s WHERE username = %(username)s AND username = BINARY %(username)s", {'name': user_db['name'], 'username': username})
+                cursor.execute("UPDATE users SET password = %(password)s WHERE username = %(username)s AND username = BINARY %(username)s", {'password': user_db['password'], 'username': username})
+                invalidate_responses(f"user:{username}")
                 raise HTTPException(status_code=400, detail="Username is too long")
             try:
-                cursor.execute("UPDATE users SET username = %(new_username)s WHERE username = BINARY %(username)s", {'new_username': user.username, 'username': username})
-                cursor.execute("UPDATE teams SET name = %(new_username)s WHERE name = BINARY %(username)s AND individual = 1", {'new_username': user.username, 'username': username})
+                cursor.execute("UPDATE users SET username = %(new_username)s WHERE username = %(username)s AND username = BINARY %(username)s", {'new_username': user.username, 'username': username})
+                cursor.execute("UPDATE teams SET name = %(new_username)s WHERE name = %(username)s AND name = BINARY %(username)s AND individual = 1", {'new_username': user.username, 'username': username})
+                invalidate_scoreboards_by_team(cursor, user.username, True)
+                # Usernames are shown in problems, competitions, teams and submissions, so every cached response is dropped
+                invalidate_responses('users')
             except IntegrityError:
-                cursor.execute("UPDATE users SET email = %(email)s WHERE username = BINARY %(username)s", {'email': user_db['email'], 'username': username})
-                cursor.execute("UPDATE users SET name = %(name)s WHERE username = BINARY %(username)s", {'name': user_db['name'], 'username': username})
-                cursor.execute("UPDATE users SET password = %(password)s WHERE username = BINARY %(username)s", {'password': user_db['password'], 'username': username})
+                cursor.execute("UPDATE users SET email = %(email)s WHERE username = %(username)s AND username = BINARY %(username)s", {'email': user_db['email'], 'username': username})
+                cursor.execute("UPDATE users SET name = %(name)s WHERE username = %(username)s AND username = BINARY %(username)s", {'name': user_db['name'], 'username': username})
+                cursor.execute("UPDATE users SET password = %(password)s WHERE username = %(username)s AND username = BINARY %(username)s", {'password': user_db['password'], 'username': username})
+                invalidate_responses(f"user:{username}")
                 raise HTTPException(status_code=409, detail="This username is already taken")
+        invalidate_responses(f"user:{username}")
     return JSONResponse({})
 
 @app.get("/users/password/reset/token/email/{email}", tags=["Users"], description="Request a password reset token", responses={
@@ -478,11 +586,11 @@ def put_user(username: str, user: UserUpdate, authorization: Annotated[str | Non
     404: { 'model': Error, 'description': "User does not exist" }
 })
 def get_password_reset_token(email: str) -> JSONResponse:
-    if cache.get('block_password_reset') == 'True':
+    if feature_flags.get('block_password_reset') == 'True':
         raise HTTPException(status_code=403, detail="Password reset is blocked")
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT id, username FROM users WHERE email = BINARY %(email)s AND verified = 1 LIMIT 1", {'email': email})
+        cursor.execute(verified_user_by_email_query, {'email': email})
         user: Any = cursor.fetchone()
         if user is None:
             raise HTTPException(status_code=404, detail="User does not exist")
@@ -508,7 +616,7 @@ def reset_password(data: UserResetPassword) -> JSONResponse:
     return JSONResponse({})
 
 def detect_error_teams(cursor: MySQLCursorAbstract, team_name: str, owner_user_id: int, ignore_ownership: bool, ignore_internal_server_error: bool) -> None:
-    cursor.execute("SELECT owner_user_id FROM teams WHERE name = BINARY %(name)s AND individual = 0 LIMIT 1", {'name': team_name})
+    cursor.execute("SELECT owner_user_id FROM teams WHERE name = %(name)s AND name = BINARY %(name)s AND individual = 0 LIMIT 1", {'name': team_name})
     team: Any = cursor.fetchone()
     if team is None:
         raise HTTPException(status_code=404, detail="Team does not exist")
@@ -525,7 +633,7 @@ def detect_error_teams(cursor: MySQLCursorAbstract, team_name: str, owner_user_i
     409: { 'model': Error, 'description': "This name is already taken" }
 })
 def post_team(team: Team, authorization: Annotated[str | None, Header()]) -> JSONResponse:
-    if cache.get('block_team_creation') == 'True':
+    if feature_flags.get('block_team_creation') == 'True':
         raise HTTPException(status_code=403, detail="Team creation is blocked")
     token: Token = decode_token(authorization)
     if team.name == "":
@@ -550,7 +658,11 @@ def post_team(team: Team, authorization: Annotated[str | None, Header()]) -> JSO
     200: { 'model': Team, 'description': "All good" },
     404: { 'model': Error, 'description': "Team does not exist" }
 })
-def get_team(team_name: str) -> JSONResponse:
+def get_team(team_name: str, if_none_match: Annotated[str | None, Header()] = None) -> Response:
+    cached: CachedResponse = CachedResponse(f"team:{team_name}", [f"team:{team_name}", 'users'], if_none_match)
+    response: Response | None = cached.get()
+    if response is not None:
+        return response
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
         cursor.execute("""
@@ -560,13 +672,13 @@ def get_team(team_name: str) -> JSONResponse:
                 teams.active AS active
             FROM teams
             INNER JOIN users ON teams.owner_user_id = users.id
-            WHERE teams.name = BINARY %(name)s AND teams.individual = 0
+            WHERE teams.name = %(name)s AND teams.name = BINARY %(name)s AND teams.individual = 0
             LIMIT 1
             """, {'name': team_name})
         team: Any = cursor.fetchone()
         if team is None:
             raise HTTPException(status_code=404, detail="Team does not exist")
-        return JSONResponse(team)
+        return cached.set(team)
 
 def check_if_team_can_be_edited(cursor: MySQLCursorAbstract, team_name: str) -> bool:
     cursor.execute("""
@@ -574,7 +686,7 @@ def check_if_team_can_be_edited(cursor: MySQLCursorAbstract, team_name: str) ->
         FROM competition_participants
         INNER JOIN teams ON competition_participants.team_id = teams.id
         INNER JOIN competitions ON competition_participants.competition_id = competitions.id
-        WHERE teams.name = BINARY %(team_name)s AND teams.individual = 0 AND competitions.end_time < %(now)s
+        WHERE teams.name = %(team_name)s AND teams.name = BINARY %(team_name)s AND teams.individual = 0 AND competitions.end_time < %(now)s
     """, {'team_name': team_name, 'now': get_current_utc_datetime()})
     return len(cursor.fetchall()) == 0
 
@@ -608,11 +720,13 @@ def put_team(team_name: str, team: Team, authorization: Annotated[str | None, He
         if not check_if_team_can_be_edited(cursor, team_name):
             raise HTTPException(status_code=403, detail="This team cannot be edited")
         try:
-            cursor.execute("UPDATE teams SET name = %(new_name)s WHERE name = BINARY %(name)s AND owner_user_id = %(owner_user_id)s AND individual = 0", {'new_name': team.name, 'name': team_name, 'owner_user_id': token.id})
+            cursor.execute("UPDATE teams SET name = %(new_name)s WHERE name = %(name)s AND name = BINARY %(name)s AND owner_user_id = %(owner_user_id)s AND individual = 0", {'new_name': team.name, 'name': team_name, 'owner_user_id': token.id})
         except IntegrityError:
             raise HTTPException(status_code=409, detail="This name is already taken")
         if cursor.rowcount == 0:
             detect_error_teams(cursor, team_name, token.id, False, True)
+        invalidate_scoreboards_by_team(cursor, team.name, False)
+        invalidate_responses(f"team:{team_name}")
     return JSONResponse({})
 
 @app.get("/users/{username}/teams", tags=["Teams", "Users"], description="Get user's teams", responses={
@@ -622,7 +736,7 @@ def put_team(team_name: str, team: Team, authorization: Annotated[str | None, He
 def get_users_teams(username: str, only_owned: bool = False, only_unowned: bool = False, only_active: bool = False, only_unactive: bool = False, only_coached: bool = False, only_contested: bool = False, only_confirmed: bool = False, only_unconfirmed: bool = False, only_declined: bool = False, only_undeclined: bool = False) -> JSONResponse:
     filter_conditions: str = ""
     if only_owned:
-        filter_conditions += " AND owners.username = BINARY %(username)s"
+        filter_conditions += " AND owners.username = %(username)s AND owners.username = BINARY %(username)s"
     if only_unowned:
         filter_conditions += " AND owners.username <> %(username)s"
     if only_active:
@@ -652,11 +766,11 @@ def get_users_teams(username: str, only_owned: bool = False, only_unowned: bool
             INNER JOIN users AS owners ON teams.owner_user_id = owners.id
             INNER JOIN team_members ON team_members.team_id = teams.id
             INNER JOIN users AS members ON team_members.member_user_id = members.id
-            WHERE members.username = BINARY %(username)s AND teams.individual = 0
+            WHERE members.username = %(username)s AND members.username = BINARY %(username)s AND teams.individual = 0
         """ + filter_conditions, {'username': username})
         teams: list[Any] = list(cursor.fetchall())
         if len(teams) == 0:
-            cursor.execute("SELECT 1 FROM users WHERE username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': username})
+            cursor.execute("SELECT 1 FROM users WHERE username = %(username)s AND username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': username})
             if cursor.fetchone() is None:
                 raise HTTPException(status_code=404, detail="User does not exist")
         return JSONResponse({
@@ -675,9 +789,10 @@ def put_activate_team(team_name: str, activate_or_deactivate: ActivateOrDeactiva
     with ConnectionCursor(db_config) as cursor:
         if not check_if_team_can_be_edited(cursor, team_name):
             raise HTTPException(status_code=403, detail="This team cannot be edited")
-        cursor.execute("UPDATE teams SET active = %(activate_or_deactivate)s WHERE name = BINARY %(name)s AND owner_user_id = %(owner_user_id)s AND individual = 0", {'name': team_name, 'owner_user_id': token.id, 'activate_or_deactivate': activate_or_deactivate is ActivateOrDeactivate.activate})
+        cursor.execute("UPDATE teams SET active = %(activate_or_deactivate)s WHERE name = %(name)s AND name = BINARY %(name)s AND owner_user_id = %(owner_user_id)s AND individual = 0", {'name': team_name, 'owner_user_id': token.id, 'activate_or_deactivate': activate_or_deactivate is ActivateOrDeactivate.activate})
         if cursor.rowcount == 0:
             detect_error_teams(cursor, team_name, token.id, False, True)
+        invalidate_responses(f"team:{team_name}")
     return JSONResponse({})
 
 def check_if_team_can_be_deleted(cursor: MySQLCursorAbstract, team_name: str) -> bool:
@@ -685,7 +800,7 @@ def check_if_team_can_be_deleted(cursor: MySQLCursorAbstract, team_name: str) ->
         SELECT 1
         FROM competition_participants
         INNER JOIN teams ON competition_participants.team_id = teams.id
-        WHERE teams.name = BINARY %(team_name)s AND teams.individual = 0
+        WHERE teams.name = %(team_name)s AND teams.name = BINARY %(team_name)s AND teams.individual = 0
     """, {'team_name': team_name})
     return len(cursor.fetchall()) == 0
 
@@ -715,25 +830,26 @@ def delete_team(team_name: str, authorization: Annotated[str | None, Header()])
             DELETE team_members
             FROM team_members
             INNER JOIN teams ON team_members.team_id = teams.id
-            WHERE teams.name = BINARY %(name)s AND teams.owner_user_id = %(owner_user_id)s AND teams.individual = 0
+            WHERE teams.name = %(name)s AND teams.name = BINARY %(name)s AND teams.owner_user_id = %(owner_user_id)s AND teams.individual = 0
         """, {'name': team_name, 'owner_user_id': token.id})
         cursor.execute("""
             DELETE teams
             FROM teams
-            WHERE name = BINARY %(name)s AND individual = 0 AND owner_user_id = %(owner_user_id)s
+            WHERE name = %(name)s AND name = BINARY %(name)s AND individual = 0 AND owner_user_id = %(owner_user_id)s
         """, {'name': team_name, 'owner_user_id': token.id})
         if cursor.rowcount == 0:
             detect_error_teams(cursor, team_name, token.id, False, False)
+        invalidate_responses(f"team:{team_name}")
     return JSONResponse({})
 
 def detect_error_team_members(cursor: MySQLCursorAbstract, team_name: str, owner_user_id: int, member_username: str, ignore_ownership: bool, ignore_internal_server_error: bool) -> None:
-    cursor.execute("SELECT owner_user_id FROM teams WHERE name = BINARY %(name)s AND individual = 0 LIMIT 1", {'name': team_name})
+    cursor.execute("SELECT owner_user_id FROM teams WHERE name = %(name)s AND name = BINARY %(name)s AND individual = 0 LIMIT 1", {'name': team_name})
     team: Any = cursor.fetchone()
     if team is None:
         raise HTTPException(status_code=404, detail="Team does not exist")
     if not ignore_ownership and team['owner_user_id'] != owner_user_id:
         raise HTTPException(status_code=403, detail="You are not the owner of the team")
-    cursor.execute("SELECT 1 FROM users WHERE username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': member_username})
+    cursor.execute("SELECT 1 FROM users WHERE username = %(username)s AND username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': member_username})
     if cursor.fetchone() is None:
         raise HTTPException(status_code=404, detail="User does not exist")
     cursor.execute("""
@@ -741,7 +857,7 @@ def detect_error_team_members(cursor: MySQLCursorAbstract, team_name: str, owner
             FROM users
             INNER JOIN team_members ON team_members.member_user_id = users.id
             INNER JOIN teams ON teams.id = team_members.team_id
-            WHERE teams.name = BINARY %(name)s AND teams.individual = 0 AND users.username = BINARY %(username)s
+            WHERE teams.name = %(name)s AND teams.name = BINARY %(name)s AND teams.individual = 0 AND users.username = %(username)s AND users.username = BINARY %(username)s
             LIMIT 1
         """, {'name': team_name, 'username': member_username})
     if cursor.fetchone() is None:
@@ -763,14 +879,14 @@ def post_team_member(team_member: TeamMember, team_name: str, authorization: Ann
         raise HTTPException(status_code=400, detail="Username is empty")
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT id FROM users WHERE username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': team_member.member_username})
+        cursor.execute(verified_user_id_by_username_query, {'username': team_member.member_username})
         member: Any = cursor.fetchone()
         if member is None:
             raise HTTPException(status_code=404, detail="User does not exist")
         member_user_id: int = member['id']
         if not check_if_team_can_be_edited(cursor, team_name):
             raise HTTPException(status_code=403, detail="This team cannot be edited")
-        cursor.execute("SELECT id, owner_user_id FROM teams WHERE name = BINARY %(name)s AND individual = 0 LIMIT 1", {'name': team_name})
+        cursor.execute("SELECT id, owner_user_id FROM teams WHERE name = %(name)s AND name = BINARY %(name)s AND individual = 0 LIMIT 1", {'name': team_name})
         team: Any = cursor.fetchone()
         if team is None:
             raise HTTPException(status_code=404, detail="Team does not exist")
@@ -813,11 +929,11 @@ def get_team_members(team_name: str, only_coaches: bool = False, only_contestant
             FROM team_members
             INNER JOIN users ON team_members.member_user_id = users.id
             INNER JOIN teams ON team_members.team_id = teams.id
-            WHERE teams.name = BINARY %(team_name)s AND individual = 0
+            WHERE teams.name = %(team_name)s AND teams.name = BINARY %(team_name)s AND individual = 0
         """ + filter_conditions, {'team_name': team_name})
         team_members: list[Any] = list(cursor.fetchall())
         if len(team_members) == 0:
-            cursor.execute("SELECT 1 FROM teams WHERE name = BINARY %(team_name)s AND individual = 0 LIMIT 1", {'team_name': team_name})
+            cursor.execute("SELECT 1 FROM teams WHERE name = %(team_name)s AND name = BINARY %(team_name)s AND individual = 0 LIMIT 1", {'team_name': team_name})
             if cursor.fetchone() is None:
                 raise HTTPException(status_code=404, detail="Team does not exist")
         return JSONResponse({
@@ -841,15 +957,15 @@ def get_team_member(team_name: str, member_username: str) -> JSONResponse:
             FROM team_members
             INNER JOIN users ON team_members.member_user_id = users.id
             INNER JOIN teams ON team_members.team_id = teams.id
-            WHERE teams.name = BINARY %(team_name)s AND individual = 0 AND users.username = %(member_username)s
+            WHERE teams.name = %(team_name)s AND teams.name = BINARY %(team_name)s AND individual = 0 AND users.username = %(member_username)s
             LIMIT 1
         """, {'team_name': team_name, 'member_username': member_username})
         team_member: Any = cursor.fetchone()
         if team_member is None:
-            cursor.execute("SELECT 1 FROM teams WHERE name = BINARY %(team_name)s AND individual = 0 LIMIT 1", {'team_name': team_name})
+            cursor.execute("SELECT 1 FROM teams WHERE name = %(team_name)s AND name = BINARY %(team_name)s AND individual = 0 LIMIT 1", {'team_name': team_name})
             if cursor.fetchone() is None:
                 raise HTTPException(status_code=404, detail="Team does not exist")
-            cursor.execute("SELECT 1 FROM users WHERE username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': member_username})
+            cursor.execute("SELECT 1 FROM users WHERE username = %(username)s AND username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': member_username})
             if cursor.fetchone() is None:
                 raise HTTPException(status_code=404, detail="User does not exist")
             raise HTTPException(status_code=404, detail="This user is not in the team")
@@ -871,7 +987,7 @@ def put_team_member_make_coach_or_contestant(team_name: str, member_username: st
             INNER JOIN users ON team_members.member_user_id = users.id
             INNER JOIN teams ON team_members.team_id = teams.id
             SET team_members.coach = %(coach_or_contestant)s
-            WHERE teams.name = BINARY %(team_name)s AND teams.individual = 0 AND teams.owner_user_id = %(owner_user_id)s AND users.username = %(member_username)s
+            WHERE teams.name = %(team_name)s AND teams.name = BINARY %(team_name)s AND teams.individual = 0 AND teams.owner_user_id = %(owner_user_id)s AND users.username = %(member_username)s
         """, {'team_name': team_name, 'owner_user_id': token.id, 'member_username': member_username, 'coach_or_contestant': coach_or_contestant is CoachOrContestant.coach})
         if cursor.rowcount == 0:
             detect_error_team_members(cursor, team_name, token.id, member_username, False, True)
@@ -897,7 +1013,7 @@ def put_team_member_confirm_or_decline(team_name: str, member_username: str, con
             SET 
                 team_members.confirmed = %(confirmed)s,
                 team_members.declined = %(declined)s
-            WHERE teams.name = BINARY %(team_name)s AND teams.individual = 0 AND users.username = BINARY %(member_username)s
+            WHERE teams.name = %(team_name)s AND teams.name = BINARY %(team_name)s AND teams.individual = 0 AND users.username = %(member_username)s AND users.username = BINARY %(member_username)s
         """, {'team_name': team_name, 'member_username': member_username, 'confirmed': confirm_or_decline is ConfirmOrDecline.confirm, 'declined': confirm_or_decline is ConfirmOrDecline.decline})
         if cursor.rowcount == 0:
             detect_error_team_members(cursor, team_name, -1, member_username, True, True)
@@ -916,7 +1032,7 @@ def delete_team_member(team_name: str, member_username: str, authorization: Anno
             FROM team_members
             INNER JOIN users ON team_members.member_user_id = users.id
             INNER JOIN teams ON team_members.team_id = teams.id
-            WHERE teams.name = BINARY %(team_name)s AND teams.individual = 0 AND teams.owner_user_id = %(owner_user_id)s AND users.username = BINARY %(member_username)s
+            WHERE teams.name = %(team_name)s AND teams.name = BINARY %(team_name)s AND teams.individual = 0 AND teams.owner_user_id = %(owner_user_id)s AND users.username = %(member_username)s AND users.username = BINARY %(member_username)s
         """, {'team_name': team_name, 'owner_user_id': token.id, 'member_username': member_username})
         if cursor.rowcount == 0:
             detect_error_team_members(cursor, team_name, token.id, member_username, False, False)
@@ -939,7 +1055,7 @@ def detect_error_problems(cursor: MySQLCursorAbstract, problem_id: int, author_u
     403: { 'model': Error, 'description': "Problem creation is blocked or you have used all your problems creation quota" }
 })
 def post_problem(problem: ProblemCreate, authorization: Annotated[str | None, Header()]) -> JSONResponse:
-    if cache.get('block_problem_creation') == 'True':
+    if feature_flags.get('block_problem_creation') == 'True':
         raise HTTPException(status_code=403, detail="Problem creation is blocked")
     token: Token = decode_token(authorization)
     if problem.name == "":
@@ -966,13 +1082,14 @@ def post_problem(problem: ProblemCreate, authorization: Annotated[str | None, He
         if cursor.fetchone()['problems_quota'] <= 0:
             raise HTTPException(status_code=403, detail="You have used all your problems creation quota")
         cursor.execute("""
-            INSERT INTO problems (author_user_id, name, statement, input_statement, output_statement, notes, time_restriction, memory_restriction, private, approved, edition)
-            VALUES (%(author_user_id)s, %(name)s, %(statement)s, %(input_statement)s, %(output_statement)s, %(notes)s, %(time_restriction)s, %(memory_restriction)s, %(private)s, 0, 1)
-        """, {'author_user_id': token.id, 'name': problem.name, 'statement': problem.statement, 'input_statement': problem.input_statement, 'output_statement': problem.output_statement, 'notes': problem.notes, 'time_restriction': problem.time_restriction, 'memory_restriction': problem.memory_restriction, 'private': int(problem.private)})
+            INSERT INTO problems (author_user_id, name, statement, input_statement, output_statement, notes, time_restriction, memory_restriction, private, approved, edition, stop_on_first_failure)
+            VALUES (%(author_user_id)s, %(name)s, %(statement)s, %(input_statement)s, %(output_statement)s, %(notes)s, %(time_restriction)s, %(memory_restriction)s, %(private)s, 0, 1, %(stop_on_first_failure)s)
+        """, {'author_user_id': token.id, 'name': problem.name, 'statement': problem.statement, 'input_statement': problem.input_statement, 'output_statement': problem.output_statement, 'notes': problem.notes, 'time_restriction': problem.time_restriction, 'memory_restriction': problem.memory_restriction, 'private': int(problem.private), 'stop_on_first_failure': problem.stop_on_first_failure})
         problem_id: int | None = cursor.lastrowid
         if problem_id is None:
             raise HTTPException(status_code=500, detail="Internal Server Error")
         cursor.execute("UPDATE users SET problems_quota = problems_quota - 1 WHERE id = %(id)s", {'id': token.id})
+        invalidate_responses('problems', f"user:{token.username}")
         return JSONResponse({'problem_id': problem_id})
         
 @app.get("/problems/{problem_id}", tags=["Problems"], description="Get a problem", responses={
@@ -981,7 +1098,12 @@ def post_problem(problem: ProblemCreate, authorization: Annotated[str | None, He
     403: { 'model': Error, 'description': "You are not the author of this private problem" },
     404: { 'model': Error, 'description': "Problem does not exist" }
 })
-def get_problem(problem_id: int, authorization: Annotated[str | None, Header()] = None) -> JSONResponse:
+def get_problem(problem_id: int, authorization: Annotated[str | None, Header()] = None, if_none_match: Annotated[str | None, Header()] = None) -> Response:
+    # The solved flag depends on the token, so only anonymous responses are cached
+    cached: CachedResponse = CachedResponse(f"problem:{problem_id}", [f"problem:{problem_id}", 'users'], if_none_match, authorization is None or authorization == '')
+    response: Response | None = cached.get()
+    if response is not None:
+        return response
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
         cursor.execute("""
@@ -997,6 +1119,7 @@ def get_problem(problem_id: int, authorization: Annotated[str | None, Header()]
                 problems.memory_restriction AS memory_restriction,
                 problems.private AS private,
                 problems.approved AS approved,
+                problems.stop_on_first_failure AS stop_on_first_failure,
                 problems.edition AS edition
             FROM problems
             INNER JOIN users ON problems.author_user_id = users.id
@@ -1012,24 +1135,29 @@ def get_problem(problem_id: int, authorization: Annotated[str | None, Header()]
                 raise HTTPException(status_code=403, detail="You are not the author of this private problem")
         if authorization is not None and authorization != '':
             token: Token = decode_token(authorization)
-            cursor.execute("SELECT 1 FROM submissions WHERE problem_id = %(problem_id)s AND author_user_id = %(author_user_id)s AND problem_edition = %(problem_edition)s AND correct_score = total_score LIMIT 1", {'problem_id': problem_id, 'author_user_id': token.id, 'problem_edition': problem['edition']})
-            problem['solved'] = cursor.fetchone() is not None
+            problem['solved'] = is_solved(cursor, token.id, problem_id, problem['edition'])
         else:
             problem['solved'] = None
-        return JSONResponse(problem)
+        return cached.set(problem)
 
 @app.get("/problems", tags=["Problems"], description="Get all public problems", responses={
     200: { 'model': ProblemsFull, 'description': "All good" },
     400: { 'model': Error, 'description': "Invalid data" }
 })
-def get_problems(start: int = 1, limit: int = 100, unapproved: bool = False, authorization: Annotated[str | None, Header()] = None) -> JSONResponse:
-    if start < 1:
-        raise HTTPException(status_code=400, detail="Start must be greater than or equal 1")
-    if limit < 1:
-        raise HTTPException(status_code=400, detail="Limit must be greater than or equal 1")
-    cursor: MySQLCursorAbstract
-    with ConnectionCursor(db_config) as cursor:
-        cursor.execute("""
+async def get_problems(page: str | None = None, limit: int = pagination_config['default_limit'], unapproved: bool = False, authorization: Annotated[str | None, Header()] = None, if_none_match: Annotated[str | None, Header()] = None, start: Annotated[int | None, Query(deprecated=True)] = None) -> Response:
+    check_start(start)
+    check_limit(limit)
+    page_key: dict[str, Any] | None = decode_page(page, ('id',))
+    # The token and the flag are read from in-process snapshots that are refreshed from Redis now and then, so they are read off the event loop
+    token: Token | None = await run_in_threadpool(decode_token, authorization) if authorization is not None and authorization != '' else None
+    cached: CachedResponse = CachedResponse(f"problems:{page}:{limit}:{unapproved}", ['problems', 'users'], if_none_match, token is None)
+    response: Response | None = await cached.get_async()
+    if response is not None:
+        return response
+    solved_from_submissions: bool = token is not None and not await run_in_threadpool(solved_problems_ready)
+    cursor: Cursor
+    async with AsyncConnectionCursor(db_config) as cursor:
+        await cursor.execute("""
             SELECT
                 problems.id AS id,
                 users.username AS author_user_username,
@@ -1042,22 +1170,28 @@ def get_problems(start: int = 1, limit: int = 100, unapproved: bool = False, aut
                 problems.memory_restriction AS memory_restriction,
                 problems.private AS private,
                 problems.approved AS approved,
-                problems.edition AS edition
+                problems.stop_on_first_failure AS stop_on_first_failure,
+                problems.edition AS edition,
+                """ + ("""EXISTS(
+                    SELECT 1 FROM submissions
+                    WHERE submissions.problem_id = problems.id AND submissions.author_user_id = %(user_id)s AND submissions.problem_edition = problems.edition AND submissions.correct_score = submissions.total_score
+                )""" if solved_from_submissions else "NULL") + """ AS solved
             FROM problems
             INNER JOIN users ON problems.author_user_id = users.id
-            WHERE problems.private = 0 """ + ("" if unapproved else "AND problems.approved = 1 ") + """
-            LIMIT %(limit)s OFFSET %(start)s
-        """, {'limit': limit, 'start': start - 1})
-        problems: list[Any] = list(cursor.fetchall())
-        for problem in problems:
-            if authorization is not None and authorization != '':
-                token: Token = decode_token(authorization)
-                cursor.execute("SELECT 1 FROM submissions WHERE problem_id = %(problem_id)s AND author_user_id = %(author_user_id)s AND problem_edition = %(problem_edition)s AND correct_score = total_score LIMIT 1", {'problem_id': problem['id'], 'author_user_id': token.id, 'problem_edition': problem['edition']})
-                problem['solved'] = cursor.fetchone() is not None
-            else:
-                problem['solved'] = None
-        return JSONResponse({
-            'problems': problems
+            WHERE problems.private = 0 """ + ("" if unapproved else "AND problems.approved = 1 ") + ("" if page_key is None else "AND problems.id > %(page_id)s ") + """
+            ORDER BY problems.id
+            LIMIT %(limit)s
+        """, {'limit': limit + 1, 'user_id': None if token is None else token.id, **(page_key or {})})
+        problems: list[Any]
+        next_page: str | None
+        problems, next_page = get_page(list(await cursor.fetchall()), limit, ('id',))
+        # The flag is read from the solved set of the user, it is computed in the query only until the sets are backfilled
+        solved: list[bool] = await get_solved_async(token.id, [(problem['id'], problem['edition']) for problem in problems]) if token is not None and not solved_from_submissions else [bool(problem['solved']) for problem in problems]
+        for problem, problem_solved in zip(problems, solved):
+            problem['solved'] = problem_solved if token is not None else None
+        return await cached.set_async({
+            'problems': problems,
+            'next_page': next_page
         })
 
 @app.get("/users/{username}/problems", tags=["Problems", "Users"], description="Get all problems owned by a user", responses={
@@ -1066,11 +1200,15 @@ def get_problems(start: int = 1, limit: int = 100, unapproved: bool = False, aut
     403: { 'model': Error, 'description': 'You are trying to access not only public problems not being owned by you' },
     404: { 'model': Error, 'description': "User does not exist" }
 })
-def get_problems_users(username: str, authorization: Annotated[str | None, Header()] = None, only_public: bool = False, only_private: bool = False, only_approved: bool = False, only_unapproved: bool = False) -> JSONResponse:
+def get_problems_users(username: str, authorization: Annotated[str | None, Header()] = None, only_public: bool = False, only_private: bool = False, only_approved: bool = False, only_unapproved: bool = False, page: str | None = None, limit: int = pagination_config['default_limit']) -> JSONResponse:
+    check_limit(limit)
+    page_key: dict[str, Any] | None = decode_page(page, ('id',))
+    token: Token | None = decode_token(authorization) if authorization is not None and authorization != '' else None
     if not only_public:
-        token: Token = decode_token(authorization)
+        token = decode_token(authorization) if token is None else token
         if token.username != username:
             raise HTTPException(status_code=403, detail="You are trying to access not only public problems not being owned by you")
+    solved_from_submissions: bool = token is not None and not solved_problems_ready()
     filter_conditions: str = ""
     if only_public:
         filter_conditions += " AND problems.private = 0"
@@ -1095,25 +1233,33 @@ def get_problems_users(username: str, authorization: Annotated[str | None, Heade
                 problems.memory_restriction AS memory_restriction,
                 problems.private AS private,
                 problems.approved AS approved,
-                problems.edition AS edition
+                problems.stop_on_first_failure AS stop_on_first_failure,
+                problems.edition AS edition,
+                """ + ("""EXISTS(
+                    SELECT 1 FROM submissions
+                    WHERE submissions.problem_id = problems.id AND submissions.author_user_id = %(user_id)s AND submissions.problem_edition = problems.edition AND submissions.correct_score = submissions.total_score
+                )""" if solved_from_submissions else "NULL") + """ AS solved
             FROM problems
             INNER JOIN users ON problems.author_user_id = users.id
-            WHERE users.username = BINARY %(username)s AND users.verified = 1
-        """ + filter_conditions, {'username': username})
-        problems: list[Any] = list(cursor.fetchall())
+            WHERE users.username = %(username)s AND users.username = BINARY %(username)s AND users.verified = 1
+        """ + filter_conditions + ("" if page_key is None else " AND problems.id > %(page_id)s") + """
+            ORDER BY problems.id
+            LIMIT %(limit)s
+        """, {'username': username, 'user_id': None if token is None else token.id, 'limit': limit + 1, **(page_key or {})})
+        problems: list[Any]
+        next_page: str | None
+        problems, next_page = get_page(list(cursor.fetchall()), limit, ('id',))
         if len(problems) == 0:
-            cursor.execute("SELECT 1 FROM users WHERE username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': username})
+            cursor.execute("SELECT 1 FROM users WHERE username = %(username)s AND username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': username})
             if cursor.fetchone() is None:
                 raise HTTPException(status_code=404, detail="User does not exist")
-        for problem in problems:
-            if authorization is not None and authorization != '':
-                token: Token = decode_token(authorization)
-                cursor.execute("SELECT 1 FROM submissions WHERE problem_id = %(problem_id)s AND author_user_id = %(author_user_id)s AND problem_edition = %(problem_edition)s AND correct_score = total_score LIMIT 1", {'problem_id': problem['id'], 'author_user_id': token.id, 'problem_edition': problem['edition']})
-                problem['solved'] = cursor.fetchone() is not None
-            else:
-                problem['solved'] = None
+        # The flag is read from the solved set of the user, it is computed in the query only until the sets are backfilled
+        solved: list[bool] = get_solved(token.id, [(problem['id'], problem['edition']) for problem in problems]) if token is not None and not solved_from_submissions else [bool(problem['solved']) for problem in problems]
+        for problem, problem_solved in zip(problems, solved):
+            problem['solved'] = problem_solved if token is not None else None
         return JSONResponse({
-            'problems': problems
+            'problems': problems,
+            'next_page': next_page
         })
 
 @app.put("/problems/{problem_id}/make-{private_or_public}", tags=["Problems"], description="Make a problem private or public", responses={
@@ -1132,6 +1278,7 @@ def put_problem_make_private_or_public(problem_id: int, private_or_public: Priva
         """, {'problem_id': problem_id, 'author_user_id': token.id, 'private_or_public': private_or_public is PrivateOrPublic.private})
         if cursor.rowcount == 0:
             detect_error_problems(cursor, problem_id, token.id, False, False, True)
+        invalidate_responses('problems', f"problem:{problem_id}")
     return JSONResponse({})
 
 def update_edition(cursor: MySQLCursorAbstract, problem_id: int) -> None:
@@ -1142,6 +1289,8 @@ def update_edition(cursor: MySQLCursorAbstract, problem_id: int) -> None:
         SET competition_problems.problem_edition = competition_problems.problem_edition + 1
         WHERE competition_problems.problem_id = %(problem_id)s AND competitions.end_time > %(now)s
     """, {'problem_id': problem_id, 'now': get_current_utc_datetime()})
+    invalidate_scoreboards_by_problem(cursor, problem_id)
+    invalidate_responses('problems', f"problem:{problem_id}")
 
 @app.put("/problems/{problem_id}", tags=["Problems"], description="Update a problem", responses={
     200: { 'model': Empty, 'description': "All good" },
@@ -1192,6 +1341,9 @@ def put_problem(problem_id: int, problem: ProblemUpdate, authorization: Annotate
             raise HTTPException(status_code=400, detail="Time restriction is not in the range from 1 to 10")
         update_set += "memory_restriction = %(memory_restriction)s, "
         update_dict['memory_restriction'] = problem.memory_restriction
+    if problem.stop_on_first_failure is not None:
+        update_set += "stop_on_first_failure = %(stop_on_first_failure)s, "
+        update_dict['stop_on_first_failure'] = problem.stop_on_first_failure
     if update_set == "":
         return JSONResponse({})
     cursor: MySQLCursorAbstract
@@ -1266,6 +1418,7 @@ def delete_problem(problem_id: int, authorization: Annotated[str | None, Header(
         if cursor.rowcount == 0:
             detect_error_problems(cursor, problem_id, token.id, False, False, False)
         cursor.execute("UPDATE users SET problems_quota = problems_quota + 1 WHERE id = %(id)s", {'id': token.id})
+        invalidate_responses('problems', f"problem:{problem_id}", f"user:{token.username}")
     return JSONResponse({})
 
 @app.post("/problems/{problem_id}/test-cases", tags=["Problems", "TestCases"], description="Add a test case", responses={
@@ -1298,6 +1451,7 @@ def post_test_case(problem_id: int, test_case: TestCaseCreate, authorization: An
             raise HTTPException(status_code=500, detail="Internal Server Error")
         update_edition(cursor, problem_id)
         cursor.execute("UPDATE users SET test_cases_quota = test_cases_quota - 1 WHERE id = %(id)s", {'id': token.id})
+        invalidate_responses(f"user:{token.username}")
         return JSONResponse({
             'test_case_id': test_case_id
         })
@@ -1334,7 +1488,7 @@ def get_test_case(problem_id: int, test_case_id: int, authorization: Annotated[s
     403: { 'model': Error, 'description': "You are not the author of the problem" },
     404: { 'model': Error, 'description': "Problem does not exist" }
 })
-def get_test_cases(problem_id: int, authorization: Annotated[str | None, Header()] = None, only_opened: bool = False, only_closed: bool = False) -> JSONResponse:
+def get_test_cases(problem_id: int, authorization: Annotated[str | None, Header()] = None, only_opened: bool = False, only_closed: bool = False, stream: JsonOrNdjson | None = None) -> Response:
     filter_conditions: str = ""
     if only_opened:
         filter_conditions += " AND opened = 1"
@@ -1350,11 +1504,14 @@ def get_test_cases(problem_id: int, authorization: Annotated[str | None, Header(
             token: Token = decode_token(authorization)
             if problem['author_user_id'] != token.id:
                 raise HTTPException(status_code=403, detail="You are not the author of this private problem")
-        cursor.execute("""
+        test_cases_query: str = """
             SELECT id, problem_id, input, solution, score, opened
             FROM test_cases
             WHERE problem_id = %(problem_id)s
-        """ + filter_conditions, {'problem_id': problem_id})
+        """ + filter_conditions
+        if stream is not None:
+            return StreamingResponse(stream_rows(db_config, test_cases_query, {'problem_id': problem_id}, {}, 'test_cases', stream), media_type=media_types[stream])
+        cursor.execute(test_cases_query, {'problem_id': problem_id})
         test_cases: list[Any] = list(cursor.fetchall())
         return JSONResponse({
             'test_cases': test_cases
@@ -1366,7 +1523,7 @@ def get_test_cases(problem_id: int, authorization: Annotated[str | None, Header(
     403: { 'model': Error, 'description': "You are not the author of the problem" },
     404: { 'model': Error, 'description': "Problem does not exist" }
 })
-def get_problem_full(problem_id: int, authorization: Annotated[str | None, Header()] = None, only_opened: bool = False, only_closed: bool = False) -> JSONResponse:
+def get_problem_full(problem_id: int, authorization: Annotated[str | None, Header()] = None, only_opened: bool = False, only_closed: bool = False, stream: JsonOrNdjson | None = None) -> Response:
     filter_conditions: str = ""
     if only_opened:
         filter_conditions += " AND opened = 1"
@@ -1387,6 +1544,7 @@ def get_problem_full(problem_id: int, authorization: Annotated[str | None, Heade
                 problems.memory_restriction AS memory_restriction,
                 problems.private AS private,
                 problems.approved AS approved,
+                problems.stop_on_first_failure AS stop_on_first_failure,
                 problems.edition AS edition
             FROM problems
             INNER JOIN users ON problems.author_user_id = users.id
@@ -1402,15 +1560,17 @@ def get_problem_full(problem_id: int, authorization: Annotated[str | None, Heade
                 raise HTTPException(status_code=403, detail="You are not the author of this private problem")
         if authorization is not None and authorization != '':
             token: Token = decode_token(authorization)
-            cursor.execute("SELECT 1 FROM submissions WHERE problem_id = %(problem_id)s AND author_user_id = %(author_user_id)s AND problem_edition = %(problem_edition)s AND correct_score = total_score LIMIT 1", {'problem_id': problem_id, 'author_user_id': token.id, 'problem_edition': problem['edition']})
-            problem['solved'] = cursor.fetchone() is not None
+            problem['solved'] = is_solved(cursor, token.id, problem_id, problem['edition'])
         else:
             problem['solved'] = None
-        cursor.execute("""
+        test_cases_query: str = """
             SELECT id, problem_id, input, solution, score, opened
             FROM test_cases
             WHERE problem_id = %(problem_id)s
-        """ + filter_conditions, {'problem_id': problem_id})
+        """ + filter_conditions
+        if stream is not None:
+            return StreamingResponse(stream_rows(db_config, test_cases_query, {'problem_id': problem_id}, problem, 'test_cases', stream), media_type=media_types[stream])
+        cursor.execute(test_cases_query, {'problem_id': problem_id})
         problem['test_cases'] = list(cursor.fetchall())
         return JSONResponse(problem)
 
@@ -1496,6 +1656,7 @@ def delete_test_case(problem_id: int, test_case_id: int, authorization: Annotate
         else:
             update_edition(cursor, problem_id)
         cursor.execute("UPDATE users SET test_cases_quota = test_cases_quota + 1 WHERE id = %(id)s", {'id': token.id})
+        invalidate_responses(f"user:{token.username}")
     return JSONResponse({})
 
 @app.post("/problems/{problem_id}/custom-checker", tags=["Problems", "CustomCheckers"], description="Create a custom checker", responses={
@@ -1519,8 +1680,7 @@ def post_custom_checker(problem_id: int, custom_checker: CustomCheckerBase, auth
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
         detect_error_problems(cursor, problem_id, token.id, False, False, True)
-        cursor.execute("SELECT id FROM languages WHERE name = %(name)s AND version = %(version)s AND supported = 1 LIMIT 1", {'name': custom_checker.language_name, 'version': custom_checker.language_version})
-        language: Any = cursor.fetchone()
+        language: dict[str, Any] | None = reference_data.get_language(custom_checker.language_name, custom_checker.language_version)
         if language is None:
             raise HTTPException(status_code=404, detail="Language does not exist")
         if testing_users.get(token.id) is not None:
@@ -1536,6 +1696,7 @@ def post_custom_checker(problem_id: int, custom_checker: CustomCheckerBase, auth
         if custom_checker_id is None:
             raise HTTPException(status_code=500, detail="Internal Server Error")
         update_edition(cursor, problem_id)
+        store_custom_checker_artifact(cursor, problem_id)
         return JSONResponse({
             'custom_checker_id': custom_checker_id
         })
@@ -1588,8 +1749,7 @@ def put_custom_checker(problem_id: int, custom_checker: CustomCheckerUpdate, aut
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
         if custom_checker.language_name != '' and custom_checker.language_version != '':
-            cursor.execute("SELECT id FROM languages WHERE name = %(name)s AND version = %(version)s AND supported = 1 LIMIT 1", {'name': custom_checker.language_name, 'version': custom_checker.language_version})
-            language: Any = cursor.fetchone()
+            language: dict[str, Any] | None = reference_data.get_language(custom_checker.language_name, custom_checker.language_version)
             if language is None:
                 raise HTTPException(status_code=404, detail="Language does not exist")
             update_set += "custom_checkers.language_id = %(language_id)s, "
@@ -1604,6 +1764,7 @@ def put_custom_checker(problem_id: int, custom_checker: CustomCheckerUpdate, aut
             detect_error_problems(cursor, problem_id, token.id, False, False, True)
         else:
             update_edition(cursor, problem_id)
+            store_custom_checker_artifact(cursor, problem_id)
     return JSONResponse({})
 
 @app.delete("/problems/{problem_id}/custom-checker", tags=["Problems", "CustomCheckers"], description="Delete a custom checker", responses={
@@ -1626,6 +1787,7 @@ def delete_custom_checker(problem_id: int, authorization: Annotated[str | None,
             detect_error_problems(cursor, problem_id, token.id, False, False, False)
         else:
             update_edition(cursor, problem_id)
+            store_custom_checker_artifact(cursor, problem_id)
     return JSONResponse({})
 
 @app.get("/problems/{problem_id}/full", tags=["Problems", "CustomCheckers", "TestCases"], description="Get a full problem", responses={
@@ -1634,7 +1796,7 @@ def delete_custom_checker(problem_id: int, authorization: Annotated[str | None,
     403: { 'model': Error, 'description': "You are not the author of the problem" },
     404: { 'model': Error, 'description': "Problem does not exist" }
 })
-def get_problem_full(problem_id: int, authorization: Annotated[str | None, Header()] = None) -> JSONResponse:
+def get_problem_full(problem_id: int, authorization: Annotated[str | None, Header()] = None, stream: JsonOrNdjson | None = None) -> Response:
     token: Token = decode_token(authorization)
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
@@ -1652,6 +1814,7 @@ def get_problem_full(problem_id: int, authorization: Annotated[str | None, Heade
                 problems.memory_restriction AS memory_restriction,
                 problems.private AS private,
                 problems.approved AS approved,
+                problems.stop_on_first_failure AS stop_on_first_failure,
                 problems.edition AS edition
             FROM problems
             INNER JOIN users ON problems.author_user_id = users.id
@@ -1672,130 +1835,92 @@ def get_problem_full(problem_id: int, authorization: Annotated[str | None, Heade
             LIMIT 1
         """, {'problem_id': problem_id})
         problem['custom_checker'] = cursor.fetchone()
-        cursor.execute("""
+        test_cases_query: str = """
             SELECT id, problem_id, input, solution, score, opened
             FROM test_cases
             WHERE problem_id = %(problem_id)s
-        """, {'problem_id': problem_id})
+        """
+        if stream is not None:
+            return StreamingResponse(stream_rows(db_config, test_cases_query, {'problem_id': problem_id}, problem, 'test_cases', stream), media_type=media_types[stream])
+        cursor.execute(test_cases_query, {'problem_id': problem_id})
         problem['test_cases'] = list(cursor.fetchall())
         return JSONResponse(problem)
 
-def check_submission(submission_id: int, problem_id: int, code: str, language: str, no_realtime: bool, user_id: int) -> None:
-    cursor: MySQLCursorAbstract
-    with ConnectionCursor(db_config) as cursor:
-        cursor.execute("""
-            SELECT 
-                custom_checkers.id AS id,
-                custom_checkers.problem_id,
-                custom_checkers.code,
-                languages.name AS language_name,
-                languages.version AS language_version
-            FROM custom_checkers
-            INNER JOIN languages ON custom_checkers.language_id = languages.id
-            WHERE custom_checkers.problem_id = %(problem_id)s
-            LIMIT 1
-        """, {'problem_id': problem_id})
-        custom_check: int = 0
-        custom_check_language: str = ''
-        custom_check_code: str = ''
-        custom_checker: Any = cursor.fetchone()
-        if custom_checker is not None:
-            custom_check = 1
-            custom_check_language = f"{custom_checker['language_name']} ({custom_checker['language_version']})"
-            custom_check_code = custom_checker['code']
-        create_files_result: CreateFilesResultLib = lib.create_files(submission_id, code, language, 1, custom_check, custom_check_language, custom_check_code)
-        if create_files_result.status == 0 or create_files_result.status == 6:
-            cursor.execute("""
-                UPDATE submissions
-                SET compiled = 1, compilation_details = ''
-                WHERE id = %(submission_id)s
-            """, {'submission_id': submission_id})
-        else:
-            cursor.execute("""
-                UPDATE submissions
-                SET compiled = 0, compilation_details = %(compilation_details)s
-                WHERE id = %(submission_id)s
-            """, {'submission_id': submission_id, 'compilation_details': create_files_result.description})
-        cursor.execute("""
-            SELECT
-                problems.time_restriction AS time_restriction,
-                problems.memory_restriction AS memory_restriction
-            FROM problems
-            WHERE problems.id = %(problem_id)s
-            LIMIT 1
-        """, {'problem_id': problem_id})
-        problem: Any = cursor.fetchone()
-        cursor.execute("""
-            SELECT id, problem_id, input, solution, score, opened
-            FROM test_cases
-            WHERE problem_id = %(problem_id)s
-        """, {'problem_id': problem_id})
-        test_cases: list[Any] = list(cursor.fetchall())
-        correct_score: int = 0
-        total_score: int = 0
-        total_verdict: tuple[int, str] = (-1, "")
-        for index, test_case in enumerate(test_cases):
-            if create_files_result.status == 0:
-                test_result: TestResultLib = lib.check_test_case(submission_id, test_case['id'], language, test_case['input'], test_case['solution'], problem['time_restriction'], problem['memory_restriction'], custom_check, custom_check_language)
-                if test_result.status == 0:
-                    correct_score += test_case['score']
-            else:
-                test_result: TestResultLib = TestResultLib(status=create_files_result.status, time=0, cpu_time=0, physical_memory=0)
-            cursor.execute("SELECT text FROM verdicts WHERE id = %(verdict_id)s LIMIT 1", {'verdict_id': test_result.status + 2})
-            verdict: Any = cursor.fetchone()
-            cursor.execute("""
-                INSERT INTO submission_results (submission_id, test_case_id, verdict_id, time_taken, cpu_time_taken, physical_memory_taken)
-                VALUES (%(submission_id)s, %(test_case_id)s, %(verdict_id)s, %(time_taken)s, %(cpu_time_taken)s, %(physical_memory_taken)s)
-            """, {'submission_id': submission_id, 'test_case_id': test_case['id'], 'verdict_id': test_result.status + 2, 'time_taken': test_result.time, 'cpu_time_taken': test_result.cpu_time, 'physical_memory_taken': test_result.physical_memory})
-            if not no_realtime:
-                realtime_testings[submission_id].add_message(dumps({
-                    'type': 'result',
-                    'status': 202,
-                    'count': index + 1,
-                    'result': {
-                        'test_case_id': test_case['id'],
-                        'test_case_score': test_case['score'],
-                        'test_case_opened': test_case['opened'],
-                        'verdict_text': verdict['text'],
-                        'time_taken': test_result.time,
-                        'cpu_time_taken': test_result.cpu_time,
-                        'physical_memory_taken': test_result.physical_memory
-                    }
-                }))
-            total_score += test_case['score']
-            total_verdict = max(total_verdict, (test_result.status, verdict['text']))
-        lib.delete_files(submission_id, 1)
-        cursor.execute("""
-            UPDATE submissions
-            SET checked = 1, correct_score = %(correct_score)s, total_verdict_id = %(total_verdict_id)s
-            WHERE id = %(submission_id)s
-        """, {'submission_id': submission_id, 'correct_score': correct_score, 'total_verdict_id': total_verdict[0] + 2})
-        testing_users.pop(user_id, None)
-        if not no_realtime:
-            realtime_testings[submission_id].add_message(dumps({
-                'type': 'totals',
-                'status': 200,
-                'totals': {
-                    'compiled': create_files_result.status == 0,
-                    'compilation_details': create_files_result.description,
-                    'correct_score': correct_score,
-                    'total_score': total_score,
-                    'total_verdict': total_verdict[1]
-                }
-            }))
-            realtime_testings[submission_id].finished = True
-            if not realtime_testings[submission_id].opened_websocket:
-                del realtime_testings[submission_id]
+def enqueue_submission(submission_id: int, no_realtime: bool, user_id: int, loop: AbstractEventLoop) -> None:
+    start_updates_listener()
+    testing_users[user_id] = True
+    if not no_realtime:
+        realtime_testings[submission_id] = RealtimeTesting()
+    else:
+        # The waiter is registered before the job is queued, so the done message cannot be missed
+        submission_waiters[submission_id] = (loop, Event())
+    judge_queue.enqueue(submission_id, no_realtime, user_id)
 
-@app.post("/submissions", tags=["Submissions"], description="Create a new submission", responses={
-    200: { 'model': SubmissionId | SubmissionFull, 'description': "All good (reponse schema depends on the value of no_realtime (false or true))"},
-    400: { 'model': Error, 'description': "Invalid data"},
-    401: { 'model': Error, 'description': "Invalid token"},
-    403: { 'model': Error, 'description': "Submissions are blocked or you already have a testing submission or debug"},
-    404: { 'model': Error, 'description': "Problem or language does not exist"}
-})
-def post_submission(submission: SubmissionCreate, authorization: Annotated[str | None, Header()], no_realtime:  bool = False) -> JSONResponse:
-    if cache.get('block_submit') == 'True':
+async def wait_submission(submission_id: int, user_id: int) -> None:
+    judged: Event = submission_waiters[submission_id][1]
+    while not judged.is_set():
+        try:
+            await wait_for(judged.wait(), 5)
+        except TimeoutError:
+            # The done message is lost if the listener was reconnecting, so the job state is checked as well
+            job: dict[str, str] = await run_in_threadpool(judge_queue.get_job, submission_id)
+            if job.get('state', 'done') == 'done':
+                break
+    submission_waiters.pop(submission_id, None)
+    testing_users.pop(user_id, None)
+
+def select_checked_submission(cursor: MySQLCursorAbstract, submission_id: int) -> Any:
+    cursor.execute("""
+        SELECT
+            submissions.id AS id,
+            users.username AS author_user_username,
+            submissions.problem_id AS problem_id,
+            problems.name AS problem_name,
+            submissions.code AS code,
+            languages.name AS language_name,
+            languages.version AS language_version,
+            submissions.time_sent AS time_sent,
+            submissions.checked AS checked,
+            submissions.compiled AS compiled,
+            submissions.compilation_details AS compilation_details,
+            submissions.correct_score AS correct_score,
+            submissions.total_score AS total_score,
+            verdicts.text AS total_verdict,
+            submissions.problem_edition AS problem_edition,
+            problems.edition - submissions.problem_edition AS edition_difference
+        FROM submissions
+        INNER JOIN users ON submissions.author_user_id = users.id
+        INNER JOIN problems ON submissions.problem_id = problems.id
+        INNER JOIN languages ON submissions.language_id = languages.id
+        INNER JOIN verdicts ON submissions.total_verdict_id = verdicts.id
+        WHERE submissions.id = %(submission_id)s
+        LIMIT 1
+    """, {'submission_id': submission_id})
+    submission_db: Any = cursor.fetchone()
+    cursor.execute("""
+        SELECT
+            submission_results.test_case_id AS test_case_id,
+            test_cases.score AS test_case_score,
+            test_cases.opened AS test_case_opened,
+            verdicts.text AS verdict_text,
+            submission_results.time_taken AS time_taken,
+            submission_results.cpu_time_taken AS cpu_time_taken,
+            submission_results.physical_memory_taken AS physical_memory_taken
+        FROM submission_results
+        INNER JOIN test_cases ON submission_results.test_case_id = test_cases.id
+        INNER JOIN verdicts ON submission_results.verdict_id = verdicts.id
+        WHERE submission_results.submission_id = %(submission_id)s
+    """, {'submission_id': submission_id})
+    submission_db['results'] = cursor.fetchall()
+    return submission_db
+
+def get_checked_submission(submission_id: int) -> Any:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        return select_checked_submission(cursor, submission_id)
+
+def create_submission(submission: SubmissionCreate, authorization: str | None, no_realtime: bool, loop: AbstractEventLoop) -> tuple[int, int]:
+    if feature_flags.get('block_submit') == 'True':
         raise HTTPException(status_code=403, detail="Submissions are blocked")
     if submission.code == "":
         raise HTTPException(status_code=400, detail="Code cannot be empty")
@@ -1813,8 +1938,7 @@ def post_submission(submission: SubmissionCreate, authorization: Annotated[str |
         problem: Any = cursor.fetchone()
         cursor.execute("SELECT SUM(score) as total_score FROM test_cases WHERE problem_id = %(problem_id)s", {'problem_id': submission.problem_id})
         total_score: int = cursor.fetchone()['total_score']
-        cursor.execute("SELECT id FROM languages WHERE name = %(name)s AND version = %(version)s AND supported = 1 LIMIT 1", {'name': submission.language_name, 'version': submission.language_version})
-        language: Any = cursor.fetchone()
+        language: dict[str, Any] | None = reference_data.get_language(submission.language_name, submission.language_version)
         if language is None:
             raise HTTPException(status_code=404, detail="Language does not exist")
         if testing_users.get(token.id) is not None:
@@ -1826,59 +1950,26 @@ def post_submission(submission: SubmissionCreate, authorization: Annotated[str |
         submission_id: int | None = cursor.lastrowid
         if submission_id is None:
             raise HTTPException(status_code=500, detail="Internal server error")
-        future: Future = checking_queue.submit(check_submission, submission_id, submission.problem_id, submission.code, f"{submission.language_name} ({submission.language_version})", no_realtime, token.id)
-        checking_queue_futures.append(future)
-        testing_users[token.id] = True
-        if not no_realtime:
-            realtime_testings[submission_id] = RealtimeTesting()
-            return JSONResponse({
-                'submission_id': submission_id
-            })
-        else:
-            future.result()
-            cursor.execute("""
-                SELECT
-                    submissions.id AS id,
-                    users.username AS author_user_username,
-                    submissions.problem_id AS problem_id,
-                    problems.name AS problem_name,
-                    submissions.code AS code,
-                    languages.name AS language_name,
-                    languages.version AS language_version,
-                    submissions.time_sent AS time_sent,
-                    submissions.checked AS checked,
-                    submissions.compiled AS compiled,
-                    submissions.compilation_details AS compilation_details,
-                    submissions.correct_score AS correct_score,
-                    submissions.total_score AS total_score,
-                    verdicts.text AS total_verdict,
-                    submissions.problem_edition AS problem_edition,
-                    problems.edition - submissions.problem_edition AS edition_difference
-                FROM submissions
-                INNER JOIN users ON submissions.author_user_id = users.id
-                INNER JOIN problems ON submissions.problem_id = problems.id
-                INNER JOIN languages ON submissions.language_id = languages.id
-                INNER JOIN verdicts ON submissions.total_verdict_id = verdicts.id
-                WHERE submissions.id = %(submission_id)s
-                LIMIT 1
-            """, {'submission_id': submission_id})
-            submission_db: Any = cursor.fetchone()
-            cursor.execute("""
-                SELECT
-                    submission_results.test_case_id AS test_case_id,
-                    test_cases.score AS test_case_score,
-                    test_cases.opened AS test_case_opened,
-                    verdicts.text AS verdict_text,
-                    submission_results.time_taken AS time_taken,
-                    submission_results.cpu_time_taken AS cpu_time_taken,
-                    submission_results.physical_memory_taken AS physical_memory_taken
-                FROM submission_results
-                INNER JOIN test_cases ON submission_results.test_case_id = test_cases.id
-                INNER JOIN verdicts ON submission_results.verdict_id = verdicts.id
-                WHERE submission_results.submission_id = %(submission_id)s
-            """, {'submission_id': submission_id})
-            submission_db['results'] = cursor.fetchall()
-            return JSONResponse(submission_db)
+        enqueue_submission(submission_id, no_realtime, token.id, loop)
+        return submission_id, token.id
+
+@app.post("/submissions", tags=["Submissions"], description="Create a new submission", responses={
+    200: { 'model': SubmissionId | SubmissionFull, 'description': "All good (reponse schema depends on the value of no_realtime (false or true))"},
+    400: { 'model': Error, 'description': "Invalid data"},
+    401: { 'model': Error, 'description': "Invalid token"},
+    403: { 'model': Error, 'description': "Submissions are blocked or you already have a testing submission or debug"},
+    404: { 'model': Error, 'description': "Problem or language does not exist"}
+})
+async def post_submission(submission: SubmissionCreate, authorization: Annotated[str | None, Header()], no_realtime:  bool = False) -> JSONResponse:
+    submission_id: int
+    user_id: int
+    submission_id, user_id = await run_in_threadpool(create_submission, submission, authorization, no_realtime, get_running_loop())
+    if not no_realtime:
+        return JSONResponse({
+            'submission_id': submission_id
+        })
+    await wait_submission(submission_id, user_id)
+    return JSONResponse(await run_in_threadpool(get_checked_submission, submission_id))
 
 @app.get("/submissions/{submission_id}", tags=["Submissions"], description="Get a submission", responses={
     200: { 'model': SubmissionFull, 'description': "All good"},
@@ -1898,49 +1989,7 @@ def get_submission(submission_id: int, authorization: Annotated[str | None, Head
                 raise HTTPException(status_code=404, detail="Submission does not exist")
             raise HTTPException(status_code=403, detail="You are not the author of this submission")
         if submission_first['checked']:
-            cursor.execute("""
-                SELECT
-                    submissions.id AS id,
-                    users.username AS author_user_username,
-                    submissions.problem_id AS problem_id,
-                    problems.name AS problem_name,
-                    submissions.code AS code,
-                    languages.name AS language_name,
-                    languages.version AS language_version,
-                    submissions.time_sent AS time_sent,
-                    submissions.checked AS checked,
-                    submissions.compiled AS compiled,
-                    submissions.compilation_details AS compilation_details,
-                    submissions.correct_score AS correct_score,
-                    submissions.total_score AS total_score,
-                    verdicts.text AS total_verdict,
-                    submissions.problem_edition AS problem_edition,
-                    problems.edition - submissions.problem_edition AS edition_difference
-                FROM submissions
-                INNER JOIN users ON submissions.author_user_id = users.id
-                INNER JOIN problems ON submissions.problem_id = problems.id
-                INNER JOIN languages ON submissions.language_id = languages.id
-                INNER JOIN verdicts ON submissions.total_verdict_id = verdicts.id
-                WHERE submissions.id = %(submission_id)s
-                LIMIT 1
-            """, {'submission_id': submission_id})
-            submission: Any = cursor.fetchone()
-            cursor.execute("""
-                SELECT
-                    submission_results.test_case_id AS test_case_id,
-                    test_cases.score AS test_case_score,
-                    test_cases.opened AS test_case_opened,
-                    verdicts.text AS verdict_text,
-                    submission_results.time_taken AS time_taken,
-                    submission_results.cpu_time_taken AS cpu_time_taken,
-                    submission_results.physical_memory_taken AS physical_memory_taken
-                FROM submission_results
-                INNER JOIN test_cases ON submission_results.test_case_id = test_cases.id
-                INNER JOIN verdicts ON submission_results.verdict_id = verdicts.id
-                WHERE submission_results.submission_id = %(submission_id)s
-            """, {'submission_id': submission_id})
-            submission['results'] = cursor.fetchall()
-            return JSONResponse(submission)
+            return JSONResponse(select_checked_submission(cursor, submission_id))
         else:
             cursor.execute("""
                 SELECT
@@ -2042,111 +2091,93 @@ def get_submission_public(submission_id: int)-> JSONResponse:
 
 @app.get("/users/{username}/submissions/public", tags=["Submissions", "Users"], description="Get user's submissions", responses={
     200: { 'model': SubmissionsPublic, 'description': "All good" },
+    400: { 'model': Error, 'description': "Invalid data" },
     404: { 'model': Error, 'description': "User does not exist" }
 })
-def get_submissions_public_by_user(username: str)-> JSONResponse:
-    cursor: MySQLCursorAbstract
-    with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT 1 FROM users WHERE username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': username})
-        if cursor.fetchone() is None:
+async def get_submissions_public_by_user(username: str, page: str | None = None, limit: int = pagination_config['default_limit'], if_none_match: Annotated[str | None, Header()] = None)-> Response:
+    check_limit(limit)
+    page_key: dict[str, Any] | None = decode_page(page, ('time_sent', 'id'))
+    cursor: Cursor
+    async with AsyncConnectionCursor(db_config) as cursor:
+        await cursor.execute(verified_user_id_by_username_query, {'username': username})
+        user: Any = await cursor.fetchone()
+        if user is None:
             raise HTTPException(status_code=404, detail="User does not exist")
-        cursor.execute("""
-            SELECT 
-                submissions.id AS id,
-                users.username AS author_user_username,
-                problems.id AS problem_id,
-                problems.name AS problem_name,
-                languages.name AS language_name,
-                languages.version AS language_version,
-                submissions.time_sent AS time_sent,
-                verdicts.text AS total_verdict,
-                submissions.problem_edition AS problem_edition,
-                problems.edition - submissions.problem_edition AS edition_difference
-            FROM submissions
-            INNER JOIN users ON submissions.author_user_id = users.id
-            INNER JOIN problems ON submissions.problem_id = problems.id
-            INNER JOIN languages ON submissions.language_id = languages.id
-            INNER JOIN verdicts ON submissions.total_verdict_id = verdicts.id
-            WHERE users.username = BINARY %(username)s AND users.verified = 1 AND submissions.checked = 1
-        """, {'username': username})
-        return JSONResponse({
-            'submissions': cursor.fetchall()
+        cached: CachedResponse = CachedResponse(f"submissions:user:{user['id']}:{page}:{limit}", [f"submissions:user:{user['id']}", 'problems', 'users'], if_none_match)
+        response: Response | None = await cached.get_async()
+        if response is not None:
+            return response
+        await cursor.execute(get_submissions_public_query(user_submissions_condition, page_key is not None), {'username': username, 'limit': limit + 1, **(page_key or {})})
+        submissions: list[Any]
+        next_page: str | None
+        submissions, next_page = get_page(list(await cursor.fetchall()), limit, ('time_sent', 'id'))
+        return await cached.set_async({
+            'submissions': submissions,
+            'next_page': next_page
         })
 
 @app.get("/users/{username}/submissions/public/problems/{problem_id}", tags=["Submissions", "Users", "Problems"], description="Get user's submissions by problem", responses={
     200: { 'model': SubmissionsPublic, 'description': "All good" },
+    400: { 'model': Error, 'description': "Invalid data" },
     404: { 'model': Error, 'description': "User or problem does not exist" }
 })
-def get_submissions_public_by_user_and_problem(username: str, problem_id: int)-> JSONResponse:
-    cursor: MySQLCursorAbstract
-    with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT 1 FROM users WHERE username = BINARY %(username)s AND verified = 1 LIMIT 1", {'username': username})
-        if cursor.fetchone() is None:
+async def get_submissions_public_by_user_and_problem(username: str, problem_id: int, page: str | None = None, limit: int = pagination_config['default_limit'], if_none_match: Annotated[str | None, Header()] = None)-> Response:
+    check_limit(limit)
+    page_key: dict[str, Any] | None = decode_page(page, ('time_sent', 'id'))
+    cursor: Cursor
+    async with AsyncConnectionCursor(db_config) as cursor:
+        await cursor.execute(verified_user_id_by_username_query, {'username': username})
+        user: Any = await cursor.fetchone()
+        if user is None:
             raise HTTPException(status_code=404, detail="User does not exist")
-        cursor.execute("SELECT 1 FROM problems WHERE id = %(id)s LIMIT 1", {'id': problem_id})
-        if cursor.fetchone() is None:
+        cached: CachedResponse = CachedResponse(f"submissions:user:{user['id']}:problem:{problem_id}:{page}:{limit}", [f"submissions:user:{user['id']}", f"problem:{problem_id}", 'users'], if_none_match)
+        response: Response | None = await cached.get_async()
+        if response is not None:
+            return response
+        await cursor.execute("SELECT 1 FROM problems WHERE id = %(id)s LIMIT 1", {'id': problem_id})
+        if await cursor.fetchone() is None:
             raise HTTPException(status_code=404, detail="Problem does not exist")
-        cursor.execute("""
-            SELECT 
-                submissions.id AS id,
-                users.username AS author_user_username,
-                problems.id AS problem_id,
-                problems.name AS problem_name,
-                languages.name AS language_name,
-                languages.version AS language_version,
-                submissions.time_sent AS time_sent,
-                verdicts.text AS total_verdict,
-                submissions.problem_edition AS problem_edition,
-                problems.edition - submissions.problem_edition AS edition_difference
-            FROM submissions
-            INNER JOIN users ON submissions.author_user_id = users.id
-            INNER JOIN problems ON submissions.problem_id = problems.id
-            INNER JOIN languages ON submissions.language_id = languages.id
-            INNER JOIN verdicts ON submissions.total_verdict_id = verdicts.id
-            WHERE users.username = BINARY %(username)s AND users.verified = 1 AND problems.id = %(problem_id)s AND submissions.checked = 1
-        """, {'username': username, 'problem_id': problem_id})
-        return JSONResponse({
-            'submissions': cursor.fetchall()
+        await cursor.execute(get_submissions_public_query(user_submissions_condition + " AND " + problem_submissions_condition, page_key is not None), {'username': username, 'problem_id': problem_id, 'limit': limit + 1, **(page_key or {})})
+        submissions: list[Any]
+        next_page: str | None
+        submissions, next_page = get_page(list(await cursor.fetchall()), limit, ('time_sent', 'id'))
+        return await cached.set_async({
+            'submissions': submissions,
+            'next_page': next_page
         })
 
 @app.get("/problems/{problem_id}/submissions/public", tags=["Submissions", "Problems"], description="Get problem's submissions", responses={
     200: { 'model': SubmissionsPublic, 'description': "All good" },
+    400: { 'model': Error, 'description': "Invalid data" },
     401: { 'model': Error, 'description': "Invalid token (required for private problems)" },
     403: { 'model': Error, 'description': "You are not the author of the private problem" },
     404: { 'model': Error, 'description': "Problem does not exist" }
 })
-def get_submissions_by_problem(problem_id: int, authorization: Annotated[str | None, Header()] = None)-> JSONResponse:
-    cursor: MySQLCursorAbstract
-    with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT private, author_user_id FROM problems WHERE id = %(id)s LIMIT 1", {'id': problem_id})
-        problem: Any = cursor.fetchone()
+async def get_submissions_by_problem(problem_id: int, page: str | None = None, limit: int = pagination_config['default_limit'], authorization: Annotated[str | None, Header()] = None, if_none_match: Annotated[str | None, Header()] = None)-> Response:
+    check_limit(limit)
+    page_key: dict[str, Any] | None = decode_page(page, ('time_sent', 'id'))
+    cursor: Cursor
+    async with AsyncConnectionCursor(db_config) as cursor:
+        await cursor.execute("SELECT private, author_user_id FROM problems WHERE id = %(id)s LIMIT 1", {'id': problem_id})
+        problem: Any = await cursor.fetchone()
         if problem is None:
             raise HTTPException(status_code=404, detail="Problem does not exist")
         if problem['private']:
-            token: Token = decode_token(authorization)
+            # A token might need the secret reloaded from Redis, which would block the event loop
+            token: Token = await run_in_threadpool(decode_token, authorization)
             if problem['author_user_id'] != token.id:
                 raise HTTPException(status_code=403, detail="You are not the author of this private problem")
-        cursor.execute("""
-            SELECT 
-                submissions.id AS id,
-                users.username AS author_user_username,
-                problems.id AS problem_id,
-                problems.name AS problem_name,
-                languages.name AS language_name,
-                languages.version AS language_version,
-                submissions.time_sent AS time_sent,
-                verdicts.text AS total_verdict,
-                submissions.problem_edition AS problem_edition,
-                problems.edition - submissions.problem_edition AS edition_difference
-            FROM submissions
-            INNER JOIN users ON submissions.author_user_id = users.id
-            INNER JOIN problems ON submissions.problem_id = problems.id
-            INNER JOIN languages ON submissions.language_id = languages.id
-            INNER JOIN verdicts ON submissions.total_verdict_id = verdicts.id
-            WHERE problems.id = %(problem_id)s AND submissions.checked = 1
-        """, {'problem_id': problem_id})
-        return JSONResponse({
-            'submissions': cursor.fetchall()
+        cached: CachedResponse = CachedResponse(f"submissions:problem:{problem_id}:{page}:{limit}", [f"submissions:problem:{problem_id}", f"problem:{problem_id}", 'users'], if_none_match, not problem['private'])
+        response: Response | None = await cached.get_async()
+        if response is not None:
+            return response
+        await cursor.execute(get_submissions_public_query(problem_submissions_condition, page_key is not None), {'problem_id': problem_id, 'limit': limit + 1, **(page_key or {})})
+        submissions: list[Any]
+        next_page: str | None
+        submissions, next_page = get_page(list(await cursor.fetchall()), limit, ('time_sent', 'id'))
+        return await cached.set_async({
+            'submissions': submissions,
+            'next_page': next_page
         })
 
 @app.delete("/problems/{problem_id}/submissions/authors", tags=["Submissions", "Problems"], description="Delete problem's submissions by the author", responses={
@@ -2176,75 +2207,26 @@ def delete_problem_submissions_authors(problem_id: int, authorization: Annotated
             FROM submissions
             WHERE problem_id = %(problem_id)s AND author_user_id = %(author_user_id)s
         """, {'problem_id': problem_id, 'author_user_id': token.id})
+        invalidate_scoreboards_by_problem(cursor, problem_id)
+        invalidate_responses(f"submissions:problem:{problem_id}", f"submissions:user:{token.id}")
+        remove_solved_problem(token.id, problem_id)
     return JSONResponse({})
 
-def run_debug(debug_submission_id: int, debug_language: str, debug_code: str, debug_inputs: list[str], user_id: int) -> list[dict[str, str | int]]:
-    create_files_result: CreateFilesResultLib = lib.create_files(debug_submission_id, debug_code, debug_language, 0, 0, "", "")
-    results: list[dict[str, str | int]] = []
-    for index, debug_input in enumerate(debug_inputs):
-        if create_files_result.status == 0:
-            debug_result: DebugResultLib = lib.debug(debug_submission_id, index + 1, debug_language, debug_input)
-            if debug_result.status == 0:
-                results.append({
-                    'verdict_text': 'OK',
-                    'time_taken': debug_result.time,
-                    'cpu_time_taken': debug_result.cpu_time,
-                    'physical_memory_taken': debug_result.physical_memory,
-                    'output': debug_result.output
-                })
-            else:
-                verdict: str = ''
-                match debug_result.status:
-                    case 2:
-                        verdict = 'Time limit exceeded (10s)'
-                    case 3:
-                        verdict = 'Memory limit exceeded (1024MB)'
-                    case 4:
-                        verdict = 'Runtime Error'
-                    case _:
-                        verdict = 'Internal Server Error'
-                results.append({
-                    'verdict_text': verdict,
-                    'time_taken': debug_result.time,
-                    'cpu_time_taken': debug_result.cpu_time,
-                    'physical_memory_taken': debug_result.physical_memory,
-                    'output': debug_result.output
-                })
-        else:
-            results.append({
-                'verdict_text': 'Compilation Error',
-                'time_taken': 0,
-                'cpu_time_taken': 0,
-                'physical_memory_taken': 0,
-                'output': create_files_result.description
-            })
-    lib.delete_files(debug_submission_id, 0)
-    testing_users.pop(user_id, None)
-    return results
-
-@app.post("/debug", tags=["Debug", "Submissions"], description="Debug code", responses={
-    200: { 'model': DebugResult, 'description': "All good" },
-    400: { 'model': Error, 'description': "Invalid data" },
-    401: { 'model': Error, 'description': "Invalid token" },
-    403: { 'model': Error, 'description': "Debug is blocked or you already have a testing submission or debug" },
-    404: { 'model': Error, 'description': "Language does not exist" }
-})
-def post_debug(debug: Debug, authorization: Annotated[str | None, Header()]) -> JSONResponse:
-    if cache.get('block_debug') == 'True':
+def create_debug(code: str, language_name: str, language_version: str, inputs: list[str], authorization: str | None, loop: AbstractEventLoop) -> tuple[int, int]:
+    if feature_flags.get('block_debug') == 'True':
         raise HTTPException(status_code=403, detail="Debug is blocked")
-    if debug.code == "":
+    if code == "":
         raise HTTPException(status_code=400, detail="Code cannot be empty")
-    if len(debug.code) > text_max_length['text']:
+    if len(code) > text_max_length['text']:
         raise HTTPException(status_code=400, detail="Code is too long")
-    if debug.language_name == "":
+    if language_name == "":
         raise HTTPException(status_code=400, detail="Language name cannot be empty")
-    if debug.language_version == "":
+    if language_version == "":
         raise HTTPException(status_code=400, detail="Language version cannot be empty")
     token: Token = decode_token(authorization)
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT id FROM languages WHERE name = %(name)s AND version = %(version)s AND supported = 1 LIMIT 1", {'name': debug.language_name, 'version': debug.language_version})
-        language: Any = cursor.fetchone()
+        language: dict[str, Any] | None = reference_data.get_language(language_name, language_version)
         if language is None:
             raise HTTPException(status_code=404, detail="Language does not exist")
         if testing_users.get(token.id) is not None:
@@ -2252,14 +2234,64 @@ def post_debug(debug: Debug, authorization: Annotated[str | None, Header()]) ->
         testing_users[token.id] = True
         cursor.execute("""
             INSERT INTO debug (author_user_id, code, number_of_inputs, time_sent)
-            VALUES (%(author_user_id)s, %(code)s, 1, %(now)s)
-        """, {'author_user_id': token.id, 'code': debug.code, 'now': get_current_utc_datetime()})
+            VALUES (%(author_user_id)s, %(code)s, %(number_of_inputs)s, %(now)s)
+        """, {'author_user_id': token.id, 'number_of_inputs': len(inputs), 'code': code, 'now': get_current_utc_datetime()})
         debug_submission_id: int | None = cursor.lastrowid
         if debug_submission_id is None:
+            testing_users.pop(token.id, None)
             raise HTTPException(status_code=500, detail="Internal server error")
-        future: Future = debugging_queue.submit(run_debug, debug_submission_id, f"{debug.language_name} ({debug.language_version})", debug.code, [debug.input], token.id)
-        debugging_queue_futures.append(future)
-        return JSONResponse(future.result()[0])
+        start_updates_listener()
+        # The waiter is registered before the job is queued, so no result can be missed
+        debug_waiters[debug_submission_id] = (loop, Queue())
+        judge_queue.enqueue_debug(debug_submission_id, token.id, dumps({'code': code, 'language': language['full_name'], 'inputs': inputs}))
+        return debug_submission_id, token.id
+
+async def iterate_debug_results(debug_submission_id: int, user_id: int, number_of_inputs: int) -> AsyncIterator[tuple[int, dict[str, str | int]]]:
+    updates: Queue = debug_waiters[debug_submission_id][1]
+    sent: set[int] = set()
+    # Every attempt of the job ends within its lease, so results that have not come by then never come
+    deadline: float = get_running_loop().time() + judge_config['maximum_attempts'] * judge_config['visibility_timeout']
+    try:
+        while len(sent) < number_of_inputs and get_running_loop().time() < deadline:
+            messages: list[str]
+            try:
+                messages = [await wait_for(updates.get(), max(0, min(5, deadline - get_running_loop().time())))]
+            except TimeoutError:
+                # Updates are lost if the listener was reconnecting, so the kept ones are read as well
+                messages = await run_in_threadpool(judge_queue.get_updates, judge_queue.get_debug_job_id(debug_submission_id))
+            for message in messages:
+                update: Any = loads(message)
+                if update['type'] == 'result' and update['index'] not in sent:
+                    sent.add(update['index'])
+                    yield update['index'], update['result']
+                elif update['type'] == 'done':
+                    # A debug that ran out of attempts finishes without results for some inputs
+                    deadline = 0
+        for index in range(number_of_inputs):
+            if index not in sent:
+                yield index, {'verdict_text': 'Internal Server Error', 'time_taken': 0, 'cpu_time_taken': 0, 'physical_memory_taken': 0, 'output': ''}
+    finally:
+        debug_waiters.pop(debug_submission_id, None)
+        testing_users.pop(user_id, None)
+
+async def get_debug_results(debug_submission_id: int, user_id: int, number_of_inputs: int) -> list[dict[str, str | int]]:
+    results: list[dict[str, str | int]] = [{}] * number_of_inputs
+    async for index, result in iterate_debug_results(debug_submission_id, user_id, number_of_inputs):
+        results[index] = result
+    return results
+
+@app.post("/debug", tags=["Debug", "Submissions"], description="Debug code", responses={
+    200: { 'model': DebugResult, 'description': "All good" },
+    400: { 'model': Error, 'description': "Invalid data" },
+    401: { 'model': Error, 'description': "Invalid token" },
+    403: { 'model': Error, 'description': "Debug is blocked or you already have a testing submission or debug" },
+    404: { 'model': Error, 'description': "Language does not exist" }
+})
+async def post_debug(debug: Debug, authorization: Annotated[str | None, Header()]) -> JSONResponse:
+    debug_submission_id: int
+    user_id: int
+    debug_submission_id, user_id = await run_in_threadpool(create_debug, debug.code, debug.language_name, debug.language_version, [debug.input], authorization, get_running_loop())
+    return JSONResponse((await get_debug_results(debug_submission_id, user_id, 1))[0])
 
 @app.post("/debug/many", tags=["Debug", "Submissions"], description="Debug code on multiple test cases", responses={
     200: { 'model': DebugResults, 'description': "All good" },
@@ -2268,39 +2300,29 @@ def post_debug(debug: Debug, authorization: Annotated[str | None, Header()]) ->
     403: { 'model': Error, 'description': "Debug is blocked or you already have a testing submission or debug" },
     404: { 'model': Error, 'description': "Language does not exist" }
 })
-def post_debug_many(debug: DebugMany, authorization: Annotated[str | None, Header()]) -> JSONResponse:
-    if cache.get('block_debug') == 'True':
-        raise HTTPException(status_code=403, detail="Debug is blocked")
-    if debug.code == "":
-        raise HTTPException(status_code=400, detail="Code cannot be empty")
-    if len(debug.code) > text_max_length['text']:
-        raise HTTPException(status_code=400, detail="Code is too long")
-    if debug.language_name == "":
-        raise HTTPException(status_code=400, detail="Language name cannot be empty")
-    if debug.language_version == "":
-        raise HTTPException(status_code=400, detail="Language version cannot be empty")
-    token: Token = decode_token(authorization)
-    cursor: MySQLCursorAbstract
-    with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT id FROM languages WHERE name = %(name)s AND version = %(version)s AND supported = 1 LIMIT 1", {'name': debug.language_name, 'version': debug.language_version})
-        language: Any = cursor.fetchone()
-        if language is None:
-            raise HTTPException(status_code=404, detail="Language does not exist")
-        if testing_users.get(token.id) is not None:
-            raise HTTPException(status_code=403, detail="You already have a testing submission or debug")
-        testing_users[token.id] = True
-        cursor.execute("""
-            INSERT INTO debug (author_user_id, code, number_of_inputs, time_sent)
-            VALUES (%(author_user_id)s, %(code)s, %(number_of_inputs)s, %(now)s)
-        """, {'author_user_id': token.id, 'number_of_inputs': len(debug.inputs), 'code': debug.code, 'now': get_current_utc_datetime()})
-        debug_submission_id: int | None = cursor.lastrowid
-        if debug_submission_id is None:
-            raise HTTPException(status_code=500, detail="Internal server error")
-        future: Future = debugging_queue.submit(run_debug, debug_submission_id, f"{debug.language_name} ({debug.language_version})", debug.code, debug.inputs, token.id)
-        debugging_queue_futures.append(future)
-        return JSONResponse({
-            'results': future.result()
-        })
+async def post_debug_many(debug: DebugMany, authorization: Annotated[str | None, Header()]) -> JSONResponse:
+    debug_submission_id: int
+    user_id: int
+    debug_submission_id, user_id = await run_in_threadpool(create_debug, debug.code, debug.language_name, debug.language_version, debug.inputs, authorization, get_running_loop())
+    return JSONResponse({
+        'results': await get_debug_results(debug_submission_id, user_id, len(debug.inputs))
+    })
+
+@app.post("/debug/many/stream", tags=["Debug", "Submissions"], description="Debug code on multiple test cases, streaming each result as newline delimited JSON as soon as it is ready", responses={
+    200: { 'model': DebugResultIndexed, 'description': "All good (one line per input, in the order they finish)" },
+    400: { 'model': Error, 'description': "Invalid data" },
+    401: { 'model': Error, 'description': "Invalid token" },
+    403: { 'model': Error, 'description': "Debug is blocked or you already have a testing submission or debug" },
+    404: { 'model': Error, 'description': "Language does not exist" }
+})
+async def post_debug_many_stream(debug: DebugMany, authorization: Annotated[str | None, Header()]) -> StreamingResponse:
+    debug_submission_id: int
+    user_id: int
+    debug_submission_id, user_id = await run_in_threadpool(create_debug, debug.code, debug.language_name, debug.language_version, debug.inputs, authorization, get_running_loop())
+    async def stream_debug_results() -> AsyncIterator[str]:
+        async for index, result in iterate_debug_results(debug_submission_id, user_id, len(debug.inputs)):
+            yield dumps({'index': index, **result}) + '\n'
+    return StreamingResponse(stream_debug_results(), media_type='application/x-ndjson')
 
 @app.post("/competitions", tags=["Competitions"], description="Create a new competition", responses={
     200: { 'model': CompetitionId, 'description': "All good" },
@@ -2309,7 +2331,7 @@ def post_debug_many(debug: DebugMany, authorization: Annotated[str | None, Heade
     403: { 'model': Error, 'description': "Competition creation is blocked or you have used all your competitions creation quota" }
 })
 def post_competition(competition: CompetitionCreate, authorization: Annotated[str | None, Header()], past_times: bool = False) -> JSONResponse:
-    if cache.get('block_competition_creation') == 'True':
+    if feature_flags.get('block_competition_creation') == 'True':
         raise HTTPException(status_code=403, detail="Competition creation is blocked")
     token: Token = decode_token(authorization)
     if competition.name == "":
@@ -2338,24 +2360,40 @@ def post_competition(competition: CompetitionCreate, authorization: Annotated[st
         if cursor.fetchone()['competitions_quota'] <= 0:
             raise HTTPException(status_code=403, detail="You have used all your competitions creation quota")
         cursor.execute("""
-            INSERT INTO competitions (author_user_id, name, description, start_time, end_time, private, maximum_team_members_number, auto_confirm_participants, approved, only_count_submissions_with_zero_edition_difference, only_count_solved_or_not, count_scores_as_percentages, time_penalty_coefficient, wrong_attempt_penalty)
-            VALUES (%(author_user_id)s, %(name)s, %(description)s, %(start_time)s, %(end_time)s, %(private)s, %(maximum_team_members_number)s, %(auto_confirm_participants)s, 0, %(only_count_submissions_with_zero_edition_difference)s, %(only_count_solved_or_not)s, %(count_scores_as_percentages)s, %(time_penalty_coefficient)s, %(wrong_attempt_penalty)s)
-        """, {'author_user_id': token.id, 'name': competition.name, 'description': competition.description, 'start_time': convert_and_validate_datetime(competition.start_time, 'start_time'), 'end_time': convert_and_validate_datetime(competition.end_time, 'end_time'), 'private': competition.private, 'maximum_team_members_number': competition.maximum_team_members_number, 'auto_confirm_participants': competition.auto_confirm_participants, 'only_count_submissions_with_zero_edition_difference': competition.only_count_submissions_with_zero_edition_difference, 'only_count_solved_or_not': competition.only_count_solved_or_not, 'count_scores_as_percentages': competition.count_scores_as_percentages, 'time_penalty_coefficient': competition.time_penalty_coefficient, 'wrong_attempt_penalty': competition.wrong_attempt_penalty})
+            INSERT INTO competitions (author_user_id, name, description, start_time, end_time, private, maximum_team_members_number, auto_confirm_participants, approved, only_count_submissions_with_zero_edition_difference, only_count_solved_or_not, count_scores_as_percentages, time_penalty_coefficient, wrong_attempt_penalty, stop_on_first_failure)
+            VALUES (%(author_user_id)s, %(name)s, %(description)s, %(start_time)s, %(end_time)s, %(private)s, %(maximum_team_members_number)s, %(auto_confirm_participants)s, 0, %(only_count_submissions_with_zero_edition_difference)s, %(only_count_solved_or_not)s, %(count_scores_as_percentages)s, %(time_penalty_coefficient)s, %(wrong_attempt_penalty)s, %(stop_on_first_failure)s)
+        """, {'author_user_id': token.id, 'name': competition.name, 'description': competition.description, 'start_time': convert_and_validate_datetime(competition.start_time, 'start_time'), 'end_time': convert_and_validate_datetime(competition.end_time, 'end_time'), 'private': competition.private, 'maximum_team_members_number': competition.maximum_team_members_number, 'auto_confirm_participants': competition.auto_confirm_participants, 'only_count_submissions_with_zero_edition_difference': competition.only_count_submissions_with_zero_edition_difference, 'only_count_solved_or_not': competition.only_count_solved_or_not, 'count_scores_as_percentages': competition.count_scores_as_percentages, 'time_penalty_coefficient': competition.time_penalty_coefficient, 'wrong_attempt_penalty': competition.wrong_attempt_penalty, 'stop_on_first_failure': competition.stop_on_first_failure})
         competition_id: int | None = cursor.lastrowid
         if competition_id is None:
             raise HTTPException(status_code=500, detail="Internal server error")
         cursor.execute("UPDATE users SET competitions_quota = competitions_quota - 1 WHERE id = %(id)s", {'id': token.id})
+        invalidate_responses('competitions', f"user:{token.username}")
         return JSONResponse({
             'competition_id': competition_id
         })
 
+# The status is computed from the current time, so a cached competition must not outlive its next start or end
+def get_competitions_ttl(competitions: list[Any]) -> int:
+    now: datetime = get_current_utc_datetime()
+    ttl: int = response_cache_config['ttl']
+    for competition in competitions:
+        for moment in (competition['start_time'], competition['end_time']):
+            seconds: float = (datetime.strptime(moment, "%Y-%m-%d %H:%M:%S") - now).total_seconds()
+            if seconds > 0:
+                ttl = min(ttl, int(seconds) + 1)
+    return ttl
+
 @app.get("/competitions/{competition_id}", tags=["Competitions"], description="Get a competition", responses={
     200: { 'model': CompetitionFull, 'description': "All good" },
     401: { 'model': Error, 'description': "Invalid token (required for private competitions)" },
     403: { 'model': Error, 'description': "You do not have a permission to view this competition" },
     404: { 'model': Error, 'description': "Competition does not exist" }
 })
-def get_competition(competition_id: int, authorization: Annotated[str | None, Header()] = None) -> JSONResponse:
+def get_competition(competition_id: int, authorization: Annotated[str | None, Header()] = None, if_none_match: Annotated[str | None, Header()] = None) -> Response:
+    cached: CachedResponse = CachedResponse(f"competition:{competition_id}", [f"competition:{competition_id}", 'users'], if_none_match)
+    response: Response | None = cached.get()
+    if response is not None:
+        return response
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
         cursor.execute("""
@@ -2377,7 +2415,8 @@ def get_competition(competition_id: int, authorization: Annotated[str | None, He
                 competitions.only_count_solved_or_not AS only_count_solved_or_not,
                 competitions.count_scores_as_percentages AS count_scores_as_percentages,
                 competitions.time_penalty_coefficient AS time_penalty_coefficient,
-                competitions.wrong_attempt_penalty AS wrong_attempt_penalty
+                competitions.wrong_attempt_penalty AS wrong_attempt_penalty,
+                competitions.stop_on_first_failure AS stop_on_first_failure
             FROM competitions
             INNER JOIN users ON competitions.author_user_id = users.id
             WHERE competitions.id = %(id)s
@@ -2398,18 +2437,26 @@ def get_competition(competition_id: int, authorization: Annotated[str | None, He
                 """, {'id': competition_id, 'user_id': token.id})
                 if cursor.fetchone() is None:
                     raise HTTPException(status_code=403, detail="You do not have a permission to view this competition")
-        return JSONResponse(competition)
+        # Private competitions depend on who asks, so they are never stored
+        return cached.set(competition, 0 if competition['private'] else get_competitions_ttl([competition]))
 
 @app.get("/competitions", tags=["Competitions"], description="Get all public competitions", responses={
     200: { 'model': CompetitionsFull, 'description': "All good" },
     400: { 'model': Error, 'description': "Invalid data" }
 })
-def get_competitions(status: str | None = None, start: int = 1, limit: int = 100, unapproved: bool = False) -> JSONResponse:
+async def get_competitions(status: str | None = None, page: str | None = None, limit: int = pagination_config['default_limit'], unapproved: bool = False, if_none_match: Annotated[str | None, Header()] = None, start: Annotated[int | None, Query(deprecated=True)] = None) -> Response:
     if status not in ["ongoing", "unstarted", "ended", None]:
         raise HTTPException(status_code=400, detail="Invalid status")
-    cursor: MySQLCursorAbstract
-    with ConnectionCursor(db_config) as cursor:
-        cursor.execute("""
+    check_start(start)
+    check_limit(limit)
+    page_key: dict[str, Any] | None = decode_page(page, ('id',))
+    cached: CachedResponse = CachedResponse(f"competitions:{status}:{page}:{limit}:{unapproved}", ['competitions', 'users'], if_none_match)
+    response: Response | None = await cached.get_async()
+    if response is not None:
+        return response
+    cursor: Cursor
+    async with AsyncConnectionCursor(db_config) as cursor:
+        await cursor.execute("""
             SELECT
                 competitions.id AS id,
                 users.username AS author_user_username, 
@@ -2428,25 +2475,33 @@ def get_competitions(status: str | None = None, start: int = 1, limit: int = 100
                 competitions.only_count_solved_or_not AS only_count_solved_or_not,
                 competitions.count_scores_as_percentages AS count_scores_as_percentages,
                 competitions.time_penalty_coefficient AS time_penalty_coefficient,
-                competitions.wrong_attempt_penalty AS wrong_attempt_penalty
+                competitions.wrong_attempt_penalty AS wrong_attempt_penalty,
+                competitions.stop_on_first_failure AS stop_on_first_failure
             FROM competitions
             INNER JOIN users ON competitions.author_user_id = users.id
-            WHERE competitions.private = 0 """ + ("AND competitions.status = %(status)s " if status is not None else "") + ("" if unapproved else "AND competitions.approved = 1 ") + """
-            LIMIT %(limit)s OFFSET %(start)s
-        """, {'status': status, 'limit': limit, 'start': start - 1, 'now': get_current_utc_datetime()})
-        return JSONResponse({
-            'competitions': cursor.fetchall()
-        })
+            WHERE competitions.private = 0 """ + ("AND competitions.status = %(status)s " if status is not None else "") + ("" if unapproved else "AND competitions.approved = 1 ") + ("" if page_key is None else "AND competitions.id > %(page_id)s ") + """
+            ORDER BY competitions.id
+            LIMIT %(limit)s
+        """, {'status': status, 'limit': limit + 1, 'now': get_current_utc_datetime(), **(page_key or {})})
+        competitions: list[Any]
+        next_page: str | None
+        competitions, next_page = get_page(list(await cursor.fetchall()), limit, ('id',))
+        return await cached.set_async({
+            'competitions': competitions,
+            'next_page': next_page
+        }, get_competitions_ttl(competitions))
 
 @app.get("/users/me/competitions/{authored_or_participated}", tags=["Competitions", "Users"], description="Get all competitions you authored or participated in", responses={
     200: { 'model': CompetitionsFull, 'description': "All good" },
     400: { 'model': Error, 'description': "Invalid data" },
     401: { 'model': Error, 'description': "Invalid token" }
 })
-def get_users_competitions_authored(authored_or_participated: AuthoredOrParticipated, authorization: Annotated[str | None, Header()] = None, status: str | None = None, only_public: bool = False, only_private: bool = False, only_approved: bool = False, only_unapproved: bool = False) -> JSONResponse:
+def get_users_competitions_authored(authored_or_participated: AuthoredOrParticipated, authorization: Annotated[str | None, Header()] = None, status: str | None = None, only_public: bool = False, only_private: bool = False, only_approved: bool = False, only_unapproved: bool = False, page: str | None = None, limit: int = pagination_config['default_limit']) -> JSONResponse:
     token: Token = decode_token(authorization)
     if status not in ["ongoing", "unstarted", "ended", None]:
         raise HTTPException(status_code=400, detail="Invalid status")
+    check_limit(limit)
+    page_key: dict[str, Any] | None = decode_page(page, ('id',))
     filter_conditions: str = ""
     if status is not None:
         filter_conditions += " AND status = %(status)s"
@@ -2458,6 +2513,10 @@ def get_users_competitions_authored(authored_or_participated: AuthoredOrParticip
         filter_conditions += " AND competitions.approved = 1"
     if only_unapproved:
         filter_conditions += " AND competitions.approved = 0"
+    if page_key is not None:
+        filter_conditions += " AND competitions.id > %(page_id)s"
+    # Both listings are paged by the competition id
+    page_order: str = " ORDER BY competitions.id LIMIT %(limit)s"
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
         if authored_or_participated is AuthoredOrParticipated.authored:
@@ -2480,11 +2539,12 @@ def get_users_competitions_authored(authored_or_participated: AuthoredOrParticip
                     competitions.only_count_solved_or_not AS only_count_solved_or_not,
                     competitions.count_scores_as_percentages AS count_scores_as_percentages,
                     competitions.time_penalty_coefficient AS time_penalty_coefficient,
-                    competitions.wrong_attempt_penalty AS wrong_attempt_penalty
+                    competitions.wrong_attempt_penalty AS wrong_attempt_penalty,
+                    competitions.stop_on_first_failure AS stop_on_first_failure
                 FROM competitions
                 INNER JOIN users ON competitions.author_user_id = users.id
                 WHERE competitions.author_user_id = %(user_id)s
-            """ + filter_conditions, {'user_id': token.id, 'status': status, 'now': get_current_utc_datetime()})
+            """ + filter_conditions + page_order, {'user_id': token.id, 'status': status, 'now': get_current_utc_datetime(), 'limit': limit + 1, **(page_key or {})})
         else:
             cursor.execute("""
             SELECT
@@ -2506,6 +2566,7 @@ def get_users_competitions_authored(authored_or_participated: AuthoredOrParticip
                 competitions.count_scores_as_percentages AS count_scores_as_percentages,
                 competitions.time_penalty_coefficient AS time_penalty_coefficient,
                 competitions.wrong_attempt_penalty AS wrong_attempt_penalty,
+                competitions.stop_on_first_failure AS stop_on_first_failure,
                 teams.name AS username_or_team_name,
                 teams.individual AS individual,
                 competition_participants.author_confirmed AS author_confirmed,
@@ -2518,9 +2579,13 @@ def get_users_competitions_authored(authored_or_participated: AuthoredOrParticip
             INNER JOIN teams ON competition_participants.team_id = teams.id
             INNER JOIN team_members ON competition_participants.team_id = team_members.team_id
             WHERE team_members.member_user_id = %(user_id)s
-        """ + filter_conditions, {'user_id': token.id, 'status': status, 'now': get_current_utc_datetime()})
+        """ + filter_conditions + page_order, {'user_id': token.id, 'status': status, 'now': get_current_utc_datetime(), 'limit': limit + 1, **(page_key or {})})
+        competitions: list[Any]
+        next_page: str | None
+        competitions, next_page = get_page(list(cursor.fetchall()), limit, ('id',))
         return JSONResponse({
-            'competitions': cursor.fetchall()
+            'competitions': competitions,
+            'next_page': next_page
         })
 
 def detect_error_competitions(cursor: MySQLCursorAbstract, competition_id: int, author_user_id: int, ignore_ownership_if_private: bool, ignore_ownership_if_public: bool, ignore_internal_server_error: bool) -> None:
@@ -2550,6 +2615,7 @@ def put_competition_make_private_or_public(competition_id: int, private_or_publi
         """, {'competition_id': competition_id, 'author_user_id': token.id, 'private_or_public': private_or_public is PrivateOrPublic.private})
         if cursor.rowcount == 0:
             detect_error_competitions(cursor, competition_id, token.id, False, False, True)
+        invalidate_responses('competitions', f"competition:{competition_id}")
     return JSONResponse({})
 
 def check_if_competition_can_be_edited(cursor: MySQLCursorAbstract, competition_id: int, authorization: str | None) -> bool:
@@ -2647,6 +2713,9 @@ def put_competition(competition_id: int, competition: CompetitionUpdate, authori
                 raise HTTPException(status_code=400, detail="Wrong attempt penalty cannot be less than 0")
             update_set += "wrong_attempt_penalty = %(wrong_attempt_penalty)s, "
             update_dict['wrong_attempt_penalty'] = competition.wrong_attempt_penalty
+        if competition.stop_on_first_failure is not None:
+            update_set += "stop_on_first_failure = %(stop_on_first_failure)s, "
+            update_dict['stop_on_first_failure'] = competition.stop_on_first_failure
         if update_set == "":
             return JSONResponse({})
         if not check_if_competition_can_be_edited(cursor, competition_id, authorization):
@@ -2654,6 +2723,8 @@ def put_competition(competition_id: int, competition: CompetitionUpdate, authori
         cursor.execute("UPDATE competitions SET " + update_set[:-2] + " WHERE id = %(competition_id)s AND author_user_id = %(author_user_id)s", update_dict)
         if cursor.rowcount == 0:
             detect_error_competitions(cursor, competition_id, token.id, False, False, True)
+        invalidate_scoreboard(competition_id)
+        invalidate_responses('competitions', f"competition:{competition_id}")
     return JSONResponse({})
 
 @app.delete("/competitions/{competition_id}", tags=["Competitions"], description="Delete a competition", responses={
@@ -2693,7 +2764,9 @@ def delete_competition(competition_id: int, authorization: Annotated[str | None,
         """, {'competition_id': competition_id, 'author_user_id': token.id})
         if cursor.rowcount == 0:
             detect_error_competitions(cursor, competition_id, token.id, False, False, False)
+        invalidate_scoreboard(competition_id)
         cursor.execute("UPDATE users SET competitions_quota = competitions_quota + 1 WHERE id = %(id)s", {'id': token.id})
+        invalidate_responses('competitions', f"competition:{competition_id}", f"user:{token.username}")
     return JSONResponse({})
 
 @app.post("/competitions/{competition_id}/participants", tags=["Competitions", "CompetitionParticipants", "Users", "Teams"], description="Add a participant to a competition", responses={
@@ -2719,7 +2792,7 @@ def post_competition_participant(competition_id: int, participant: CompetitionPa
         competition: Any = cursor.fetchone()
         if competition['author_user_id'] == token.id or competition['auto_confirm_participants']:
             author_confirmed = True
-        cursor.execute("SELECT id, owner_user_id FROM teams WHERE name = BINARY %(name)s AND individual = %(individual)s AND active = 1 LIMIT 1", {'name': participant.username_or_team_name, 'individual': participant.individual})
+        cursor.execute("SELECT id, owner_user_id FROM teams WHERE name = %(name)s AND name = BINARY %(name)s AND individual = %(individual)s AND active = 1 LIMIT 1", {'name': participant.username_or_team_name, 'individual': participant.individual})
         team: Any = cursor.fetchone()
         if team is None:
             raise HTTPException(status_code=404, detail="User or team does not exist or is team is inactive")
@@ -2746,6 +2819,7 @@ def post_competition_participant(competition_id: int, participant: CompetitionPa
             cursor.execute("INSERT INTO competition_participants (competition_id, team_id, author_confirmed, author_declined, participant_confirmed, participant_declined) VALUES (%(competition_id)s, %(team_id)s, %(author_confirmed)s, 0, %(participant_confirmed)s, 0)",  {'competition_id': competition_id, 'team_id': user_or_team_id, 'author_confirmed': author_confirmed, 'participant_confirmed': participant_confirmed})
         except IntegrityError:
             raise HTTPException(status_code=409, detail="This user or team is already a participant of this competition")
+        update_scoreboard_team(cursor, competition_id, user_or_team_id)
     return JSONResponse({})
 
 @app.get("/competitions/{competition_id}/participants", tags=["Competitions", "CompetitionParticipants", "Users", "Teams"], description="Get a competition participants", responses={
@@ -2754,7 +2828,9 @@ def post_competition_participant(competition_id: int, participant: CompetitionPa
     403: { 'model': Error, 'description': "You do not have a permission to view this competition" },
     404: { 'model': Error, 'description': "Competition does not exist" }
 })
-def get_competition_participants(competition_id: int, authorization: Annotated[str | None, Header()] = None, only_author_confirmed: bool = False, only_author_unconfirmed: bool = False, only_author_declined: bool = False, only_author_undeclined: bool = False, only_participant_confirmed: bool = False, only_team_unconfirmed: bool = False, only_participant_declined: bool = False, only_team_undeclined: bool = False, only_individuals: bool = False, only_teams: bool = False) -> JSONResponse:
+def get_competition_participants(competition_id: int, authorization: Annotated[str | None, Header()] = None, only_author_confirmed: bool = False, only_author_unconfirmed: bool = False, only_author_declined: bool = False, only_author_undeclined: bool = False, only_participant_confirmed: bool = False, only_team_unconfirmed: bool = False, only_participant_declined: bool = False, only_team_undeclined: bool = False, only_individuals: bool = False, only_teams: bool = False, page: str | None = None, limit: int = pagination_config['default_limit']) -> JSONResponse:
+    check_limit(limit)
+    page_key: dict[str, Any] | None = decode_page(page, ('team_id',))
     filter_conditions: str = ""
     if only_author_confirmed:
         filter_conditions += " AND competition_participants.author_confirmed = 1"
@@ -2776,6 +2852,8 @@ def get_competition_participants(competition_id: int, authorization: Annotated[s
         filter_conditions += " AND teams.individual = 1"
     if only_teams:
         filter_conditions += " AND teams.individual = 0"
+    if page_key is not None:
+        filter_conditions += " AND competition_participants.team_id > %(page_team_id)s"
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
         cursor.execute("SELECT author_user_id, private FROM competitions WHERE id = %(competition_id)s LIMIT 1", {'competition_id': competition_id})
@@ -2797,6 +2875,7 @@ def get_competition_participants(competition_id: int, authorization: Annotated[s
         cursor.execute("""
             SELECT
                 competition_participants.competition_id AS competition_id,
+                competition_participants.team_id AS team_id,
                 teams.name AS username_or_team_name,
                 teams.individual AS individual,
                 competition_participants.author_confirmed AS author_confirmed,
@@ -2806,9 +2885,19 @@ def get_competition_participants(competition_id: int, authorization: Annotated[s
             FROM competition_participants
             INNER JOIN teams ON competition_participants.team_id = teams.id
             WHERE competition_participants.competition_id = %(competition_id)s
-        """ + filter_conditions, {'competition_id': competition_id})
+        """ + filter_conditions + """
+            ORDER BY competition_participants.team_id
+            LIMIT %(limit)s
+        """, {'competition_id': competition_id, 'limit': limit + 1, **(page_key or {})})
+        participants: list[Any]
+        next_page: str | None
+        participants, next_page = get_page(list(cursor.fetchall()), limit, ('team_id',))
+        # Team ids only key the pages
+        for participant in participants:
+            participant.pop('team_id')
         return JSONResponse({
-            'participants': list(cursor.fetchall())
+            'participants': participants,
+            'next_page': next_page
         })
 
 @app.get("/competitions/{competition_id}/participants/users/{username}", tags=["Competitions", "CompetitionParticipants", "Users"], description="Get a competition participant by username", responses={
@@ -2836,7 +2925,7 @@ def get_competition_participant_by_username(competition_id: int, username: str,
                 """, {'id': competition_id, 'user_id': token.id})
                 if cursor.fetchone() is None:
                     raise HTTPException(status_code=403, detail="You do not have a permission to view this competition")
-        cursor.execute("SELECT id FROM users WHERE username = BINARY %(username)s LIMIT 1", {'username': username})
+        cursor.execute("SELECT id FROM users WHERE username = %(username)s AND username = BINARY %(username)s LIMIT 1", {'username': username})
         user: Any = cursor.fetchone()
         if user is None:
             raise HTTPException(status_code=404, detail="User does not exist")
@@ -2882,7 +2971,7 @@ def put_competition_participant_confirm_or_decline(competition_id: int, individu
             else:
                 update_set += "author_confirmed = 0, "
                 update_set += "author_declined = 1, "
-        cursor.execute("SELECT id, owner_user_id FROM teams WHERE name = BINARY %(name)s AND individual = %(individual)s LIMIT 1", {'name': username_or_team_name, 'individual': individuals_or_teams is IndividualsOrTeams.individuals})
+        cursor.execute(team_by_name_query, {'name': username_or_team_name, 'individual': individuals_or_teams is IndividualsOrTeams.individuals})
         team: Any = cursor.fetchone()
         if team is None:
             raise HTTPException(status_code=404, detail="User or team does not exist")
@@ -2900,6 +2989,7 @@ def put_competition_participant_confirm_or_decline(competition_id: int, individu
             cursor.execute("SELECT id FROM competition_participants WHERE competition_id = %(competition_id)s AND team_id = %(team_id)s LIMIT 1", {'competition_id': competition_id, 'team_id': team['id']})
             if cursor.fetchone() is None:
                 raise HTTPException(status_code=404, detail="User or team is not a participant of this competition")
+        update_scoreboard_team(cursor, competition_id, team['id'])
     return JSONResponse({})
 
 @app.delete("/competitions/{competition_id}/participants/{individuals_or_teams}/{username_or_team_name}", tags=["Competitions", "CompetitionParticipants", "Users", "Teams"], description="Delete a competition participant", responses={
@@ -2917,7 +3007,7 @@ def delete_competition_participant(competition_id: int, individuals_or_teams: In
             FROM competition_participants
             INNER JOIN competitions ON competition_participants.competition_id = competitions.id
             INNER JOIN teams ON competition_participants.team_id = teams.id
-            WHERE competition_participants.competition_id = %(competition_id)s AND competitions.author_user_id = %(author_user_id)s AND teams.name = BINARY %(team_name)s AND teams.individual = %(individual)s
+            WHERE competition_participants.competition_id = %(competition_id)s AND competitions.author_user_id = %(author_user_id)s AND teams.name = %(team_name)s AND teams.name = BINARY %(team_name)s AND teams.individual = %(individual)s
         """, {'competition_id': competition_id, 'author_user_id': token.id, 'team_name': username_or_team_name, 'individual': individuals_or_teams is IndividualsOrTeams.individuals})
         if cursor.rowcount == 0:
             cursor.execute("SELECT author_user_id FROM competitions WHERE id = %(competition_id)s LIMIT 1", {'competition_id': competition_id})
@@ -2926,7 +3016,7 @@ def delete_competition_participant(competition_id: int, individuals_or_teams: In
                 raise HTTPException(status_code=404, detail="Competition does not exist")
             if competition['author_user_id'] != token.id:
                 raise HTTPException(status_code=403, detail="You are not the author of this competition")
-            cursor.execute("SELECT id FROM teams WHERE name = BINARY %(name)s AND individual = %(individual)s LIMIT 1", {'name': username_or_team_name, 'individual': individuals_or_teams is IndividualsOrTeams.individuals})
+            cursor.execute("SELECT id FROM teams WHERE name = %(name)s AND name = BINARY %(name)s AND individual = %(individual)s LIMIT 1", {'name': username_or_team_name, 'individual': individuals_or_teams is IndividualsOrTeams.individuals})
             team: Any = cursor.fetchone()
             if team is None:
                 raise HTTPException(status_code=404, detail="User or team does not exist")
@@ -2934,6 +3024,7 @@ def delete_competition_participant(competition_id: int, individuals_or_teams: In
             if cursor.fetchone() is None:
                 raise HTTPException(status_code=404, detail="User or team is not a participant of this competition")
             raise HTTPException(status_code=500, detail="Internal Server Error")
+        invalidate_scoreboard(competition_id)
     return JSONResponse({})
 
 @app.post("/competitions/{competition_id}/problems", tags=["Competitions", "CompetitionProblems", "Problems"], description="Add a problem to a competition", responses={
@@ -2963,6 +3054,7 @@ def post_competition_problem(competition_id: int, problem: CompetitionProblemsCr
             cursor.execute("INSERT INTO competition_problems (competition_id, problem_id, problem_edition) VALUES (%(competition_id)s, %(problem_id)s, %(problem_edition)s)", {'competition_id': competition_id, 'problem_id': problem.problem_id, 'problem_edition': problem_db['edition']})
         except IntegrityError:
             raise HTTPException(status_code=409, detail="This problem is already added to this competition")
+        invalidate_scoreboard(competition_id)
     return JSONResponse({})
 
 @app.get("/competitions/{competition_id}/problems/{problem_id}", tags=["Competitions", "CompetitionProblems", "Problems"], description="Get a problem of a competition", responses={
@@ -3007,7 +3099,8 @@ def get_competition_problem(competition_id: int, problem_id: int, authorization:
                 problems.time_restriction AS time_restriction,
                 problems.memory_restriction AS memory_restriction,
                 problems.private AS private,
-                problems.approved AS approved
+                problems.approved AS approved,
+                problems.stop_on_first_failure AS stop_on_first_failure
             FROM problems
             INNER JOIN users ON problems.author_user_id = users.id
             WHERE problems.id = %(problem_id)s
@@ -3170,17 +3263,11 @@ def delete_competition_problem(competition_id: int, problem_id: int, authorizati
             if cursor.fetchone() is None:
                 raise HTTPException(status_code=404, detail="Problem is not added to this competition")
             raise HTTPException(status_code=500, detail="Internal Server Error")
+        invalidate_scoreboard(competition_id)
     return JSONResponse({})
 
-@app.post("/competitions/{competition_id}/submissions", tags=["Competitions", "CompetitionSubmissions", "Submissions"], description="Create a competition submission", responses={
-    200: { 'model': SubmissionId | SubmissionFull, 'description': "All good (reponse schema depends on the value of no_realtime (false or true))"},
-    400: { 'model': Error, 'description': "Invalid data"},
-    401: { 'model': Error, 'description': "Invalid token"},
-    403: { 'model': Error, 'description': "Submissions are blocked or you already have a testing submission or debug or the competition is not ongoing or you are not a confirmed member of the competition or the problem is not added to the competition"},
-    404: { 'model': Error, 'description': "Problem, language or competition does not exist"}
-})
-def post_competition_submission(competition_id: int, submission: SubmissionCreate, authorization: Annotated[str | None, Header()], no_realtime:  bool = False) -> JSONResponse:
-    if cache.get('block_submit') == 'True':
+def create_competition_submission(competition_id: int, submission: SubmissionCreate, authorization: str | None, no_realtime: bool, loop: AbstractEventLoop) -> tuple[int, int]:
+    if feature_flags.get('block_submit') == 'True':
         raise HTTPException(status_code=403, detail="Submissions are blocked")
     if submission.code == "":
         raise HTTPException(status_code=400, detail="Code cannot be empty")
@@ -3198,8 +3285,7 @@ def post_competition_submission(competition_id: int, submission: SubmissionCreat
         problem: Any = cursor.fetchone()
         cursor.execute("SELECT SUM(score) as total_score FROM test_cases WHERE problem_id = %(problem_id)s", {'problem_id': submission.problem_id})
         total_score: int = cursor.fetchone()['total_score']
-        cursor.execute("SELECT id FROM languages WHERE name = %(name)s AND version = %(version)s AND supported = 1 LIMIT 1", {'name': submission.language_name, 'version': submission.language_version})
-        language: Any = cursor.fetchone()
+        language: dict[str, Any] | None = reference_data.get_language(submission.language_name, submission.language_version)
         if language is None:
             raise HTTPException(status_code=404, detail="Language does not exist")
         cursor.execute("""
@@ -3243,59 +3329,26 @@ def post_competition_submission(competition_id: int, submission: SubmissionCreat
             INSERT INTO competition_submissions (competition_id, submission_id, team_id)
             VALUES (%(competition_id)s, %(submission_id)s, %(team_id)s)
         """, {'competition_id': competition_id, 'submission_id': submission_id, 'team_id': team['id']})
-        future: Future = checking_queue.submit(check_submission, submission_id, submission.problem_id, submission.code, f"{submission.language_name} ({submission.language_version})", no_realtime, token.id)
-        checking_queue_futures.append(future)
-        testing_users[token.id] = True
-        if not no_realtime:
-            realtime_testings[submission_id] = RealtimeTesting()
-            return JSONResponse({
-                'submission_id': submission_id
-            })
-        else:
-            future.result()
-            cursor.execute("""
-                SELECT
-                    submissions.id AS id,
-                    users.username AS author_user_username,
-                    submissions.problem_id AS problem_id,
-                    problems.name AS problem_name,
-                    submissions.code AS code,
-                    languages.name AS language_name,
-                    languages.version AS language_version,
-                    submissions.time_sent AS time_sent,
-                    submissions.checked AS checked,
-                    submissions.compiled AS compiled,
-                    submissions.compilation_details AS compilation_details,
-                    submissions.correct_score AS correct_score,
-                    submissions.total_score AS total_score,
-                    verdicts.text AS total_verdict,
-                    submissions.problem_edition AS problem_edition,
-                    problems.edition - submissions.problem_edition AS edition_difference
-                FROM submissions
-                INNER JOIN users ON submissions.author_user_id = users.id
-                INNER JOIN problems ON submissions.problem_id = problems.id
-                INNER JOIN languages ON submissions.language_id = languages.id
-                INNER JOIN verdicts ON submissions.total_verdict_id = verdicts.id
-                WHERE submissions.id = %(submission_id)s
-                LIMIT 1
-            """, {'submission_id': submission_id})
-            submission_db: Any = cursor.fetchone()
-            cursor.execute("""
-                SELECT
-                    submission_results.test_case_id AS test_case_id,
-                    test_cases.score AS test_case_score,
-                    test_cases.opened AS test_case_opened,
-                    verdicts.text AS verdict_text,
-                    submission_results.time_taken AS time_taken,
-                    submission_results.cpu_time_taken AS cpu_time_taken,
-                    submission_results.physical_memory_taken AS physical_memory_taken
-                FROM submission_results
-                INNER JOIN test_cases ON submission_results.test_case_id = test_cases.id
-                INNER JOIN verdicts ON submission_results.verdict_id = verdicts.id
-                WHERE submission_results.submission_id = %(submission_id)s
-            """, {'submission_id': submission_id})
-            submission_db['results'] = cursor.fetchall()
-            return JSONResponse(submission_db)
+        enqueue_submission(submission_id, no_realtime, token.id, loop)
+        return submission_id, token.id
+
+@app.post("/competitions/{competition_id}/submissions", tags=["Competitions", "CompetitionSubmissions", "Submissions"], description="Create a competition submission", responses={
+    200: { 'model': SubmissionId | SubmissionFull, 'description': "All good (reponse schema depends on the value of no_realtime (false or true))"},
+    400: { 'model': Error, 'description': "Invalid data"},
+    401: { 'model': Error, 'description': "Invalid token"},
+    403: { 'model': Error, 'description': "Submissions are blocked or you already have a testing submission or debug or the competition is not ongoing or you are not a confirmed member of the competition or the problem is not added to the competition"},
+    404: { 'model': Error, 'description': "Problem, language or competition does not exist"}
+})
+async def post_competition_submission(competition_id: int, submission: SubmissionCreate, authorization: Annotated[str | None, Header()], no_realtime:  bool = False) -> JSONResponse:
+    submission_id: int
+    user_id: int
+    submission_id, user_id = await run_in_threadpool(create_competition_submission, competition_id, submission, authorization, no_realtime, get_running_loop())
+    if not no_realtime:
+        return JSONResponse({
+            'submission_id': submission_id
+        })
+    await wait_submission(submission_id, user_id)
+    return JSONResponse(await run_in_threadpool(get_checked_submission, submission_id))
 
 @app.get("/competitions/{competition_id}/submissions/{submission_id}", tags=["Competitions", "CompetitionSubmissions", "Submissions"], description="Get a competition submission", responses={
     200: { 'model': SubmissionFull, 'description': "All good"},
@@ -3397,11 +3450,14 @@ def get_competition_submission(competition_id: int, submission_id: int, authoriz
 
 @app.get("/competitions/{competition_id}/participants/{individuals_or_teams}/{username_or_team_name}/submissions/public", tags=["Competitions", "CompetitionSubmissions", "Submissions", "CompetitionParticipants", "Users", "Teams"], description="Get public data of all submissions of a participant in a competition", responses={
     200: { 'model': SubmissionsPublic, 'description': "All good" },
+    400: { 'model': Error, 'description': "Invalid data" },
     401: { 'model': Error, 'description': "Invalid token" },
     403: { 'model': Error, 'description': "You or team is not a participant of this competition or you are not a member of the team" },
     404: { 'model': Error, 'description': "Competition does not exist" }
 })
-def get_competition_submissions_by_participant(competition_id: int, individuals_or_teams: IndividualsOrTeams, username_or_team_name: str, authorization: Annotated[str | None, Header()])-> JSONResponse:
+def get_competition_submissions_by_participant(competition_id: int, individuals_or_teams: IndividualsOrTeams, username_or_team_name: str, authorization: Annotated[str | None, Header()], page: str | None = None, limit: int = pagination_config['default_limit'])-> JSONResponse:
+    check_limit(limit)
+    page_key: dict[str, Any] | None = decode_page(page, ('time_sent', 'id'))
     token: Token = decode_token(authorization)
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
@@ -3414,7 +3470,7 @@ def get_competition_submissions_by_participant(competition_id: int, individuals_
                 teams.id AS id
             FROM teams
             INNER JOIN competition_participants ON teams.id = competition_participants.team_id
-            WHERE competition_participants.competition_id = %(competition_id)s AND teams.name = BINARY %(team_name)s AND competition_participants.author_confirmed = 1 AND teams.individual = %(individual)s
+            WHERE competition_participants.competition_id = %(competition_id)s AND teams.name = %(team_name)s AND teams.name = BINARY %(team_name)s AND competition_participants.author_confirmed = 1 AND teams.individual = %(individual)s
             LIMIT 1
         """, {'competition_id': competition_id, 'team_name': username_or_team_name, 'individual': individuals_or_teams is IndividualsOrTeams.individuals})
         team: Any = cursor.fetchone()
@@ -3423,35 +3479,25 @@ def get_competition_submissions_by_participant(competition_id: int, individuals_
         cursor.execute("SELECT 1 FROM team_members WHERE team_id = %(team_id)s AND member_user_id = %(user_id)s AND confirmed = 1 LIMIT 1", {'team_id': team['id'], 'user_id': token.id})
         if cursor.fetchone() is None:
             raise HTTPException(status_code=403, detail="You are not a member of this team")
-        cursor.execute("""
-            SELECT 
-                submissions.id AS id,
-                users.username AS author_user_username,
-                problems.id AS problem_id,
-                problems.name AS problem_name,
-                languages.name AS language_name,
-                languages.version AS language_version,
-                submissions.time_sent AS time_sent,
-                verdicts.text AS total_verdict
-            FROM submissions
-            INNER JOIN users ON submissions.author_user_id = users.id
-            INNER JOIN problems ON submissions.problem_id = problems.id
-            INNER JOIN languages ON submissions.language_id = languages.id
-            INNER JOIN verdicts ON submissions.total_verdict_id = verdicts.id
-            INNER JOIN competition_submissions ON submissions.id = competition_submissions.submission_id
-            WHERE competition_submissions.competition_id = %(competition_id)s AND competition_submissions.team_id = %(team_id)s AND submissions.checked = 1
-        """, {'competition_id': competition_id, 'team_id': team['id']})
+        cursor.execute(get_competition_submissions_public_query(competition_team_submissions_condition, page_key is not None), {'competition_id': competition_id, 'team_id': team['id'], 'limit': limit + 1, **(page_key or {})})
+        submissions: list[Any]
+        next_page: str | None
+        submissions, next_page = get_page(list(cursor.fetchall()), limit, ('time_sent', 'id'))
         return JSONResponse({
-            'submissions': cursor.fetchall()
+            'submissions': submissions,
+            'next_page': next_page
         })
 
 @app.get("/competitions/{competition_id}/participants/{individuals_or_teams}/{username_or_team_name}/submissions/public/problems/{problem_id}", tags=["Competitions", "CompetitionSubmissions", "Submissions", "CompetitionParticipants", "Users", "Teams", "CompetitionProblems", "Problems"], description="Get public data of all submissions of a participant in a competition", responses={
     200: { 'model': SubmissionsPublic, 'description': "All good" },
+    400: { 'model': Error, 'description': "Invalid data" },
     401: { 'model': Error, 'description': "Invalid token" },
     403: { 'model': Error, 'description': "You or team is not a participant of this competition or you are not a member of the team or problem is not added to this competition" },
     404: { 'model': Error, 'description': "Competition does not exist" }
 })
-def get_competition_submissions_by_participant_and_problem(competition_id: int, individuals_or_teams: IndividualsOrTeams, username_or_team_name: str, problem_id: int, authorization: Annotated[str | None, Header()])-> JSONResponse:
+def get_competition_submissions_by_participant_and_problem(competition_id: int, individuals_or_teams: IndividualsOrTeams, username_or_team_name: str, problem_id: int, authorization: Annotated[str | None, Header()], page: str | None = None, limit: int = pagination_config['default_limit'])-> JSONResponse:
+    check_limit(limit)
+    page_key: dict[str, Any] | None = decode_page(page, ('time_sent', 'id'))
     token: Token = decode_token(authorization)
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
@@ -3464,7 +3510,7 @@ def get_competition_submissions_by_participant_and_problem(competition_id: int,
                 teams.id AS id
             FROM teams
             INNER JOIN competition_participants ON teams.id = competition_participants.team_id
-            WHERE competition_participants.competition_id = %(competition_id)s AND teams.name = BINARY %(team_name)s AND competition_participants.author_confirmed = 1 AND teams.individual = %(individual)s
+            WHERE competition_participants.competition_id = %(competition_id)s AND teams.name = %(team_name)s AND teams.name = BINARY %(team_name)s AND competition_participants.author_confirmed = 1 AND teams.individual = %(individual)s
             LIMIT 1
         """, {'competition_id': competition_id, 'team_name': username_or_team_name, 'individual': individuals_or_teams is IndividualsOrTeams.individuals})
         team: Any = cursor.fetchone()
@@ -3476,28 +3522,34 @@ def get_competition_submissions_by_participant_and_problem(competition_id: int,
         cursor.execute("SELECT 1 FROM competition_problems WHERE competition_id = %(competition_id)s AND problem_id = %(problem_id)s LIMIT 1", {'competition_id': competition_id, 'problem_id': problem_id})
         if cursor.fetchone() is None:
             raise HTTPException(status_code=403, detail="Problem is not added to this competition")
-        cursor.execute("""
-            SELECT 
-                submissions.id AS id,
-                users.username AS author_user_username,
-                problems.id AS problem_id,
-                problems.name AS problem_name,
-                languages.name AS language_name,
-                languages.version AS language_version,
-                submissions.time_sent AS time_sent,
-                verdicts.text AS total_verdict
-            FROM submissions
-            INNER JOIN users ON submissions.author_user_id = users.id
-            INNER JOIN problems ON submissions.problem_id = problems.id
-            INNER JOIN languages ON submissions.language_id = languages.id
-            INNER JOIN verdicts ON submissions.total_verdict_id = verdicts.id
-            INNER JOIN competition_submissions ON submissions.id = competition_submissions.submission_id
-            WHERE competition_submissions.competition_id = %(competition_id)s AND competition_submissions.team_id = %(team_id)s AND problems.id = %(problem_id)s AND submissions.checked = 1
-        """, {'competition_id': competition_id, 'team_id': team['id'], 'problem_id': problem_id})
+        cursor.execute(get_competition_submissions_public_query(competition_team_submissions_condition + " AND " + problem_submissions_condition, page_key is not None), {'competition_id': competition_id, 'team_id': team['id'], 'problem_id': problem_id, 'limit': limit + 1, **(page_key or {})})
+        submissions: list[Any]
+        next_page: str | None
+        submissions, next_page = get_page(list(cursor.fetchall()), limit, ('time_sent', 'id'))
         return JSONResponse({
-            'submissions': cursor.fetchall()
+            'submissions': submissions,
+            'next_page': next_page
         })
 
+def get_competition_for_scoreboard(cursor: MySQLCursorAbstract, competition_id: int, authorization: str | None) -> Any:
+    cursor.execute("SELECT author_user_id, start_time, private, only_count_submissions_with_zero_edition_difference, only_count_solved_or_not, count_scores_as_percentages, time_penalty_coefficient, wrong_attempt_penalty FROM competitions WHERE id = %(id)s LIMIT 1", {'id': competition_id})
+    competition: Any = cursor.fetchone()
+    if competition is None:
+        raise HTTPException(status_code=404, detail="Competition does not exist")
+    if competition['private']:
+        token: Token = decode_token(authorization)
+        if competition['author_user_id'] != token.id:
+            cursor.execute("""
+                SELECT 1
+                FROM team_members
+                INNER JOIN competition_participants ON team_members.team_id = competition_participants.team_id
+                WHERE competition_participants.competition_id = %(id)s AND competition_participants.author_confirmed = 1 AND team_members.member_user_id = %(user_id)s AND team_members.confirmed = 1
+                LIMIT 1
+            """, {'id': competition_id, 'user_id': token.id})
+            if cursor.fetchone() is None:
+                raise HTTPException(status_code=403, detail="You do not have a permission to view this competition")
+    return competition
+
 @app.get("/competitions/{competition_id}/scoreboard", tags=["Competitions", "CompetitionScoreboard", "CompetitionSubmissions", "Submissions"], description="Get scoreboard of a competition", responses={
     200: { 'model': CompetitionScoreboard, 'description': "All good" },
     401: { 'model': Error, 'description': "Invalid token (required for private competitions)" },
@@ -3507,121 +3559,70 @@ def get_competition_submissions_by_participant_and_problem(competition_id: int,
 def get_competition_scoreboard(competition_id: int, authorization: Annotated[str | None, Header()] = None) -> JSONResponse:
     cursor: MySQLCursorAbstract
     with ConnectionCursor(db_config) as cursor:
-        cursor.execute("SELECT author_user_id, start_time, private, only_count_submissions_with_zero_edition_difference, only_count_solved_or_not, count_scores_as_percentages, time_penalty_coefficient, wrong_attempt_penalty FROM competitions WHERE id = %(id)s LIMIT 1", {'id': competition_id})
-        competition: Any = cursor.fetchone()
+        return JSONResponse(get_scoreboard(cursor, competition_id, get_competition_for_scoreboard(cursor, competition_id, authorization)))
+
+def get_realtime_scoreboard_message(competition_id: int) -> str:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        competition: Any = get_scoreboard_competition(cursor, competition_id)
         if competition is None:
-            raise HTTPException(status_code=404, detail="Competition does not exist")
-        if competition['private']:
-            token: Token = decode_token(authorization)
-            if competition['author_user_id'] != token.id:
-                cursor.execute("""
-                    SELECT 1
-                    FROM team_members
-                    INNER JOIN competition_participants ON team_members.team_id = competition_participants.team_id
-                    WHERE competition_participants.competition_id = %(id)s AND competition_participants.author_confirmed = 1 AND team_members.member_user_id = %(user_id)s AND team_members.confirmed = 1
-                    LIMIT 1
-                """, {'id': competition_id, 'user_id': token.id})
-                if cursor.fetchone() is None:
-                    raise HTTPException(status_code=403, detail="You do not have a permission to view this competition")
-        results: list[dict[str, Any]] = []
-        cursor.execute("""
-            SELECT 
-                teams.id AS id,
-                teams.name AS name,
-                teams.individual AS individual
-            FROM teams
-            INNER JOIN competition_participants ON teams.id = competition_participants.team_id
-            WHERE competition_participants.competition_id = %(id)s AND competition_participants.author_confirmed = 1
-        """, {'id': competition_id})
-        teams: list[Any] = list(cursor.fetchall())
-        cursor.execute("""
-            SELECT 
-                problems.id AS id,
-                problems.name AS name,
-                competition_problems.problem_edition AS edition
-            FROM problems
-            INNER JOIN competition_problems ON problems.id = competition_problems.problem_id
-            WHERE competition_problems.competition_id = %(id)s
-        """, {'id': competition_id})
-        problems: list[Any] = list(cursor.fetchall())
-        for team in teams:
-            results.append({
-                'username_or_team_name': team['name'],
-                'individual': team['individual'],
-                'problems': []
-            })
-            total_score: int = 0
-            total_penalty_score: int = 0
-            only_none: bool = True
-            for problem in problems:
-                score: int | None = None
-                solved: bool = False
-                penalty_minutes: int = 0
-                penalty_score: int = 0
-                attempts: int = 0
-                cursor.execute("""
-                    SELECT
-                        MAX(submissions.correct_score) AS score
-                    FROM submissions
-                    INNER JOIN competition_submissions ON submissions.id = competition_submissions.submission_id
-                    INNER JOIN competitions ON competition_submissions.competition_id = competitions.id
-                    WHERE competitions.id = %(competition_id)s AND competition_submissions.team_id = %(team_id)s AND submissions.problem_id = %(problem_id)s AND submissions.time_sent BETWEEN competitions.start_time AND competitions.end_time
-                """ + (" AND submissions.problem_edition = %(problem_edition)s" if competition['only_count_submissions_with_zero_edition_difference'] else '') + " LIMIT 1", {'competition_id': competition_id, 'team_id': team['id'], 'problem_id': problem['id'], 'problem_edition': problem['edition']})
-                score = cursor.fetchone()['score']
-                if score is not None:
-                    attempts += 1
-                    cursor.execute("""
-                        SELECT
-                            submissions.total_score AS total_score,
-                            submissions.time_sent AS time_sent
-                        FROM submissions
-                        INNER JOIN competition_submissions ON submissions.id = competition_submissions.submission_id
-                        INNER JOIN competitions ON competition_submissions.competition_id = competitions.id
-                        WHERE competitions.id = %(competition_id)s AND competition_submissions.team_id = %(team_id)s AND submissions.problem_id = %(problem_id)s AND submissions.time_sent BETWEEN competitions.start_time AND competitions.end_time AND submissions.correct_score = %(maximum_score)s
-                    """ + (" AND submissions.problem_edition = %(problem_edition)s" if competition['only_count_submissions_with_zero_edition_difference'] else '') + " LIMIT 1", {'competition_id': competition_id, 'team_id': team['id'], 'problem_id': problem['id'], 'problem_edition': problem['edition'], 'maximum_score': score})
-                    total_score_time_sent: Any = cursor.fetchone()
-                    if score == total_score_time_sent['total_score']:
-                        solved = True
-                    if competition['only_count_solved_or_not'] and competition['count_scores_as_percentages']:
-                        score = 100 if score == total_score_time_sent['total_score'] else 0
-                    elif competition['only_count_solved_or_not']:
-                        score = 1 if score == total_score_time_sent['total_score'] else 0
-                    elif competition['count_scores_as_percentages']:
-                        value: float = (score / total_score_time_sent['total_score']) * 100
-                        score = int(value) if value - int(value) < 0.5 else int(value) + 1
-                    else:
-                        score = score
-                    cursor.execute("""
-                        SELECT
-                            COUNT(1) AS wrong_attempts
-                        FROM submissions
-                        INNER JOIN competition_submissions ON submissions.id = competition_submissions.submission_id
-                        INNER JOIN competitions ON competition_submissions.competition_id = competitions.id
-                        WHERE competitions.id = %(competition_id)s AND competition_submissions.team_id = %(team_id)s AND submissions.problem_id = %(problem_id)s AND submissions.time_sent >= competitions.start_time AND submissions.time_sent < %(correct_submission_time)s
-                    """ + (" AND submissions.problem_edition = %(problem_edition)s" if competition['only_count_submissions_with_zero_edition_difference'] else '') + " LIMIT 1", {'competition_id': competition_id, 'team_id': team['id'], 'problem_id': problem['id'], 'problem_edition': problem['edition'], 'correct_submission_time': datetime.strptime(total_score_time_sent['time_sent'], "%Y-%m-%d %H:%M:%S")})
-                    wrong_attempts: Any = cursor.fetchone()
-                    attempts += wrong_attempts['wrong_attempts']
-                    if solved:
-                        penalty_minutes = (datetime.strptime(total_score_time_sent['time_sent'], "%Y-%m-%d %H:%M:%S") - datetime.strptime(competition['start_time'], "%Y-%m-%d %H:%M:%S")).seconds // 60
-                        penalty_score = int(penalty_minutes * competition['time_penalty_coefficient'])
-                        penalty_score += wrong_attempts['wrong_attempts'] * competition['wrong_attempt_penalty']
-                results[-1]['problems'].append({
-                    'id': problem['id'],
-                    'name': problem['name'],
-                    'edition': problem['edition'],
-                    'best_score': score,
-                    'solved': solved,
-                    'penalty_minutes': penalty_minutes,
-                    'penalty_score': penalty_score,
-                    'attempts': attempts
-                })
-                total_score += 0 if score is None else score
-                total_penalty_score += penalty_score
-                only_none = only_none and score is None
-            results[-1]['total_score'] = None if only_none else total_score
-            results[-1]['total_penalty_score'] = total_penalty_score
-        return JSONResponse({
-            'time_penalty_coefficient': competition['time_penalty_coefficient'],
-            'wrong_attempt_penalty': competition['wrong_attempt_penalty'],
-            'participants': sorted(results, key=lambda x: (-1 if x['total_score'] is None else x['total_score'], -x['total_penalty_score']), reverse=True)
-        })
\ No newline at end of file
+            return dumps({'type': 'message', 'status': 404, 'message': "Competition does not exist"})
+        return dumps({'type': 'scoreboard', 'status': 200, 'scoreboard': get_scoreboard(cursor, competition_id, competition)})
+
+def get_realtime_scoreboard(competition_id: int, authorization: str | None) -> dict[str, Any]:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        return get_scoreboard(cursor, competition_id, get_competition_for_scoreboard(cursor, competition_id, authorization))
+
+@app.get("/ws/competitions/{competition_id}/scoreboard", tags=["Competitions", "CompetitionScoreboard", "WebSockets"], description="Dummy for the same URI websocket edndpoint. Each response describe possible message from the socket. The authorization query parameter is required for private competitions", responses={
+    200: { 'model': WebcoketScoreboardFull, 'description': "Full scoreboard (sent on connect and whenever the scoreboard is rebuilt)" },
+    202: { 'model': WebcoketScoreboardDiff, 'description': "Changed participants with only their changed problems" },
+    401: { 'model': WebcoketScoreboardMessage, 'description': "Invalid token (required for private competitions)" },
+    403: { 'model': WebcoketScoreboardMessage, 'description': "You do not have a permission to view this competition" },
+    404: { 'model': WebcoketScoreboardMessage, 'description': "Competition does not exist" }
+})
+def websocket_competition_scoreboard_dummy(competition_id: int) -> JSONResponse:
+    return JSONResponse({})
+
+@app.websocket("/ws/competitions/{competition_id}/scoreboard")
+async def websocket_endpoint_competition_scoreboard(websocket: WebSocket, competition_id: int, authorization: str | None = None):
+    try:
+        await websocket.accept()
+        start_updates_listener()
+        if competition_id not in realtime_scoreboards:
+            realtime_scoreboards[competition_id] = RealtimeScoreboard(get_running_loop(), partial(get_realtime_scoreboard_message, competition_id))
+        realtime_scoreboard: RealtimeScoreboard = realtime_scoreboards[competition_id]
+        realtime_scoreboard.subscribers += 1
+        try:
+            index: int = realtime_scoreboard.get_messages_end()
+            await websocket.send_text(dumps({'type': 'scoreboard', 'status': 200, 'scoreboard': await run_in_threadpool(get_realtime_scoreboard, competition_id, authorization)}))
+            receiving: Any = create_task(websocket.receive())
+            try:
+                while True:
+                    new_messages_flag: Any = realtime_scoreboard.new_messages_flag
+                    messages: list[str] | None = realtime_scoreboard.get_unsent_messages(index)
+                    index = realtime_scoreboard.get_messages_end()
+                    if messages is None:
+                        messages = [dumps({'type': 'scoreboard', 'status': 200, 'scoreboard': await run_in_threadpool(get_realtime_scoreboard, competition_id, authorization)})]
+                    for message in messages:
+                        await websocket.send_text(message)
+                    if len(messages) > 0:
+                        continue
+                    waiting: Any = create_task(new_messages_flag.wait())
+                    await wait([receiving, waiting], return_when=FIRST_COMPLETED)
+                    if receiving.done():
+                        waiting.cancel()
+                        if receiving.result()['type'] == 'websocket.disconnect':
+                            break
+                        receiving = create_task(websocket.receive())
+            finally:
+                receiving.cancel()
+        except HTTPException as e:
+            await websocket.send_text(dumps({'type': 'message', 'status': e.status_code, 'message': e.detail}))
+            await websocket.close()
+        finally:
+            realtime_scoreboard.subscribers -= 1
+            if realtime_scoreboard.subscribers == 0 and realtime_scoreboards.get(competition_id) is realtime_scoreboard:
+                del realtime_scoreboards[competition_id]
+    except (ConnectionClosed, WebSocketDisconnect):
+        pass
@@ -0,0 +1 @@
+/back-end-venv/bin/python database_scripts/migrate.py
\ No newline at end of file
@@ -94,23 +94,26 @@ class ProblemBase(BaseModel):
 
 class ProblemCreate(ProblemBase):
     private: bool
+    stop_on_first_failure: bool = Field(default=False, description="Skip the remaining test cases after the first failed one")
 
 class ProblemId(BaseModel):
     problem_id: int
 
 @all_optional()
 class ProblemUpdate(ProblemBase):
-    pass
+    stop_on_first_failure: bool | None = None
 
 class ProblemFull(ProblemBase):
     id: int
     author_user_username: str
     private: bool
     approved: bool
+    stop_on_first_failure: bool
     solved: bool
 
 class ProblemsFull(BaseModel):
     problems: list[ProblemFull]
+    next_page: str | None = None
 
 class TestCaseBase(BaseModel):
     input: str
@@ -168,6 +171,7 @@ class VerdictSubmission(Enum):
     compilation_error = "Compilation Error"
     custom_checker_error = "Custom Checker Error"
     internal_server_error = "Internal Server Error"
+    skipped = "Skipped"
 
 class SubmissionCreate(BaseModel):
     problem_id: int
@@ -194,6 +198,7 @@ class SubmissionPublic(SubmissionBase):
 
 class SubmissionsPublic(BaseModel):
     submissions: list[SubmissionPublic]
+    next_page: str | None = None
 
 class SubmissionResult(BaseModel):
     test_case_id: int
@@ -273,6 +278,9 @@ class DebugResult(BaseModel):
 class DebugResults(BaseModel):
     results: list[DebugResult]
 
+class DebugResultIndexed(DebugResult):
+    index: int
+
 class CompetitionBase(BaseModel):
     name: str
     description: str
@@ -288,13 +296,14 @@ class CompetitionBase(BaseModel):
 
 class CompetitionCreate(CompetitionBase):
     private: bool
+    stop_on_first_failure: bool = Field(default=False, description="Skip the remaining test cases of a submission after the first failed one")
 
 class CompetitionId(BaseModel):
     competition_id: int
 
 @all_optional()
 class CompetitionUpdate(CompetitionBase):
-    pass
+    stop_on_first_failure: bool | None = None
 
 class CompetitionStatus(Enum):
     unstarted = "unstarted"
@@ -309,9 +318,11 @@ class CompetitionFull(CompetitionBase):
     status: CompetitionStatus
     private: bool
     approved: bool
+    stop_on_first_failure: bool
 
 class CompetitionsFull(BaseModel):
     competitions: list[CompetitionFull]
+    next_page: str | None = None
 
 class CompetitionParticipantCreate(BaseModel):
     username_or_team_name: str
@@ -326,6 +337,7 @@ class CompetitionParticipantFull(CompetitionParticipantCreate):
 
 class CompetitionParticipantsFull(BaseModel):
     participants: list[CompetitionParticipantFull]
+    next_page: str | None = None
 
 class CompetitionProblemsCreate(BaseModel):
     problem_id: int
@@ -352,6 +364,20 @@ class CompetitionScoreboard(BaseModel):
     wrong_attempt_penalty: int
     participants: list[CompetitionScoreboardParticipant]
 
+class WebcoketScoreboardFull(WebcoketSubmissionsBase):
+    type: str = "scoreboard"
+    status: int = 200
+    scoreboard: CompetitionScoreboard
+
+class WebcoketScoreboardDiff(WebcoketSubmissionsBase):
+    type: str = "diff"
+    status: int = 202
+    participants: list[CompetitionScoreboardParticipant] = Field(description="Only changed participants, each with only its changed problems")
+
+class WebcoketScoreboardMessage(WebcoketSubmissionsBase):
+    type: str = "message"
+    message: str
+
 class DbOrCache(Enum):
     db = "db"
     cache = "cache"
@@ -394,4 +420,7 @@ class IndividualsOrTeams(str, Enum):
 
 class AuthoredOrParticipated(str, Enum):
     authored = "authored"
-    participated = "participated"
\ No newline at end of file
+    participated = "participated"
+class JsonOrNdjson(str, Enum):
+    json = "json"
+    ndjson = "ndjson"
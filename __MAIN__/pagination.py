@@ -0,0 +1,40 @@
+from fastapi import HTTPException
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from json import dumps, loads
+from config import pagination_config
+from typing import Any
+
+# A page continues after the key of the last row sent instead of skipping rows with OFFSET, the token only hides that key
+def encode_page(row: dict[str, Any], fields: tuple[str, ...]) -> str:
+    return urlsafe_b64encode(dumps([row[field] for field in fields]).encode('utf-8')).decode('utf-8')
+
+def decode_page(page: str | None, fields: tuple[str, ...]) -> dict[str, Any] | None:
+    if page is None or page == '':
+        return None
+    try:
+        values: Any = loads(urlsafe_b64decode(page.encode('utf-8')))
+    except:
+        raise HTTPException(status_code=400, detail="Invalid page")
+    if type(values) is not list or len(values) != len(fields) or any(type(value) not in (int, str) for value in values):
+        raise HTTPException(status_code=400, detail="Invalid page")
+    return {f"page_{field}": value for field, value in zip(fields, values)}
+
+# Submissions are paged newest first by (time_sent, id), MySQL only range scans the key written out, not compared as a row
+submissions_page_condition: str = "(submissions.time_sent < %(page_time_sent)s OR (submissions.time_sent = %(page_time_sent)s AND submissions.id < %(page_id)s))"
+
+# Offsets are no longer accepted, a client still sending them is told to follow next_page instead of silently getting the first page again
+def check_start(start: int | None) -> None:
+    if start is not None:
+        raise HTTPException(status_code=400, detail="Start is no longer supported, pass next_page of the previous response as page")
+
+def check_limit(limit: int) -> None:
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="Limit must be greater than or equal 1")
+    if limit > pagination_config['maximum_limit']:
+        raise HTTPException(status_code=400, detail=f"Limit must be less than or equal {pagination_config['maximum_limit']}")
+
+# One row more than the limit is fetched, so the next page is only offered when it is not empty
+def get_page(rows: list[Any], limit: int, fields: tuple[str, ...]) -> tuple[list[Any], str | None]:
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], encode_page(rows[limit - 1], fields)
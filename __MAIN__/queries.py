@@ -0,0 +1,62 @@
+from pagination import submissions_page_condition
+
+# Queries of hot paths are kept here and shared with the index tests, so the tests explain the same SQL the handlers run
+
+verified_user_id_by_username_query: str = "SELECT id FROM users WHERE username = %(username)s AND username = BINARY %(username)s AND verified = 1 LIMIT 1"
+
+verified_user_by_email_query: str = "SELECT id, username FROM users WHERE email = %(email)s AND email = BINARY %(email)s AND verified = 1 LIMIT 1"
+
+team_by_name_query: str = "SELECT id, owner_user_id FROM teams WHERE name = %(name)s AND name = BINARY %(name)s AND individual = %(individual)s LIMIT 1"
+
+solved_problem_query: str = "SELECT 1 FROM submissions WHERE problem_id = %(problem_id)s AND author_user_id = %(author_user_id)s AND problem_edition = %(problem_edition)s AND correct_score = total_score LIMIT 1"
+
+user_submissions_condition: str = "users.username = %(username)s AND users.username = BINARY %(username)s AND users.verified = 1"
+
+problem_submissions_condition: str = "problems.id = %(problem_id)s"
+
+competition_team_submissions_condition: str = "competition_submissions.competition_id = %(competition_id)s AND competition_submissions.team_id = %(team_id)s"
+
+def get_submissions_public_query(condition: str, paged: bool) -> str:
+    return """
+        SELECT 
+            submissions.id AS id,
+            users.username AS author_user_username,
+            problems.id AS problem_id,
+            problems.name AS problem_name,
+            languages.name AS language_name,
+            languages.version AS language_version,
+            submissions.time_sent AS time_sent,
+            verdicts.text AS total_verdict,
+            submissions.problem_edition AS problem_edition,
+            problems.edition - submissions.problem_edition AS edition_difference
+        FROM submissions
+        INNER JOIN users ON submissions.author_user_id = users.id
+        INNER JOIN problems ON submissions.problem_id = problems.id
+        INNER JOIN languages ON submissions.language_id = languages.id
+        INNER JOIN verdicts ON submissions.total_verdict_id = verdicts.id
+        WHERE """ + condition + " AND submissions.checked = 1" + (" AND " + submissions_page_condition if paged else "") + """
+        ORDER BY submissions.time_sent DESC, submissions.id DESC
+        LIMIT %(limit)s
+    """
+
+def get_competition_submissions_public_query(condition: str, paged: bool) -> str:
+    return """
+        SELECT 
+            submissions.id AS id,
+            users.username AS author_user_username,
+            problems.id AS problem_id,
+            problems.name AS problem_name,
+            languages.name AS language_name,
+            languages.version AS language_version,
+            submissions.time_sent AS time_sent,
+            verdicts.text AS total_verdict
+        FROM submissions
+        INNER JOIN users ON submissions.author_user_id = users.id
+        INNER JOIN problems ON submissions.problem_id = problems.id
+        INNER JOIN languages ON submissions.language_id = languages.id
+        INNER JOIN verdicts ON submissions.total_verdict_id = verdicts.id
+        INNER JOIN competition_submissions ON submissions.id = competition_submissions.submission_id
+        WHERE """ + condition + " AND submissions.checked = 1" + (" AND " + submissions_page_condition if paged else "") + """
+        ORDER BY submissions.time_sent DESC, submissions.id DESC
+        LIMIT %(limit)s
+    """
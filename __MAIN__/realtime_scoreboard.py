@@ -0,0 +1,86 @@
+from asyncio import Event, AbstractEventLoop, Task
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Callable
+
+class RealtimeScoreboard():
+
+    def __init__(self, loop: AbstractEventLoop, get_scoreboard_message: Callable[[], str], maximum_messages: int = 100) -> None:
+        self.loop = loop
+        self.get_scoreboard_message = get_scoreboard_message
+        self.maximum_messages = maximum_messages
+        self.new_messages_flag = Event()
+        self.messages: list[str] = []
+        self.messages_offset = 0
+        self.subscribers = 0
+        self.rebuilding: Task | None = None
+        self.rebuild_again = False
+        self.rebuilds = 0
+        self.pending_messages: list[str] = []
+
+    def add_message(self, message: str) -> None:
+        # Diffs published while the scoreboard is rebuilt are sent after it, applying a diff over a scoreboard that already has it changes nothing
+        if self.rebuilding is not None:
+            self.pending_messages.append(message)
+            return
+        self.messages.append(message)
+        if len(self.messages) > self.maximum_messages:
+            dropped: int = len(self.messages) - self.maximum_messages
+            del self.messages[:dropped]
+            self.messages_offset += dropped
+        self.notify()
+
+    def add_message_threadsafe(self, message: str) -> None:
+        self.loop.call_soon_threadsafe(self.add_message, message)
+
+    def reset(self) -> None:
+        # The scoreboard is rebuilt once and the same message is sent to every subscriber, resets during a rebuild are folded into one more rebuild
+        if self.rebuilding is not None:
+            self.rebuild_again = True
+            return
+        self.rebuilding = self.loop.create_task(self.rebuild())
+
+    async def rebuild(self) -> None:
+        message: str | None = None
+        try:
+            while message is None or self.rebuild_again:
+                self.rebuild_again = False
+                self.rebuilds += 1
+                message = await run_in_threadpool(self.get_scoreboard_message)
+        except Exception:
+            message = None
+        self.rebuilding = None
+        pending_messages: list[str] = self.pending_messages
+        self.pending_messages = []
+        if message is None:
+            # Subscribers fall behind the kept messages and fetch the scoreboard on their own, which includes the pending diffs
+            self.messages_offset = self.get_messages_end() + 1
+            self.messages.clear()
+            self.notify()
+            return
+        for pending_message in [message] + pending_messages:
+            self.add_message(pending_message)
+
+    def reset_threadsafe(self) -> None:
+        self.loop.call_soon_threadsafe(self.reset)
+
+    def notify(self) -> None:
+        # Every subscriber waits on the current flag, so it is replaced instead of cleared to wake all of them exactly once
+        self.new_messages_flag.set()
+        self.new_messages_flag = Event()
+
+    def get_messages_end(self) -> int:
+        return self.messages_offset + len(self.messages)
+
+    def get_unsent_messages(self, index: int) -> list[str] | None:
+        # None means the subscriber fell behind the kept messages and has to start over from a full scoreboard
+        if index < self.messages_offset:
+            return None
+        return self.messages[index - self.messages_offset:]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            'messages': self.messages,
+            'messages_offset': self.messages_offset,
+            'subscribers': self.subscribers,
+            'rebuilds': self.rebuilds
+        }
@@ -0,0 +1,63 @@
+from mysql.connector.abstracts import MySQLCursorAbstract
+from config import db_config, reference_data_config
+from connection_cursor import ConnectionCursor
+from threading import Lock
+from time import time
+from typing import Any
+
+reference_data_channel: str = 'reference_data_updates'
+
+class ReferenceData():
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.loaded_at = 0.0
+        self.languages_by_id: dict[int, dict[str, Any]] = {}
+        self.languages_by_name: dict[tuple[str, str], dict[str, Any]] = {}
+        self.verdicts: dict[int, str] = {}
+        self.lock = Lock()
+
+    def refresh(self) -> None:
+        with self.lock:
+            cursor: MySQLCursorAbstract
+            with ConnectionCursor(db_config) as cursor:
+                cursor.execute("SELECT id, name, version, supported FROM languages")
+                languages: list[Any] = list(cursor.fetchall())
+                cursor.execute("SELECT id, text FROM verdicts")
+                verdicts: list[Any] = list(cursor.fetchall())
+            for language in languages:
+                # This is the language string the checker library expects
+                language['full_name'] = f"{language['name']} ({language['version']})"
+            # New dictionaries are swapped in whole, so readers never see a half loaded registry
+            self.languages_by_id = {language['id']: language for language in languages}
+            self.languages_by_name = {(language['name'], language['version']): language for language in languages if language['supported']}
+            self.verdicts = {verdict['id']: verdict['text'] for verdict in verdicts}
+            self.loaded_at = time()
+
+    def refresh_if_expired(self) -> None:
+        if time() - self.loaded_at > self.ttl:
+            self.refresh()
+
+    def get_language(self, name: str, version: str) -> dict[str, Any] | None:
+        self.refresh_if_expired()
+        return self.languages_by_name.get((name, version))
+
+    def get_language_by_id(self, id: int) -> dict[str, Any] | None:
+        self.refresh_if_expired()
+        # Ids come from foreign keys, so a miss means the language was added after the last refresh
+        if id not in self.languages_by_id:
+            self.refresh()
+        return self.languages_by_id.get(id)
+
+    def get_verdict_text(self, id: int) -> str:
+        self.refresh_if_expired()
+        return self.verdicts[id]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            'languages': len(self.languages_by_id),
+            'verdicts': len(self.verdicts),
+            'loaded_at': self.loaded_at
+        }
+
+reference_data: ReferenceData = ReferenceData(reference_data_config['ttl'])
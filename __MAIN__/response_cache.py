@@ -0,0 +1,92 @@
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from cache import cache, get_async_cache
+from config import response_cache_config
+from hashlib import sha256
+from json import dumps, loads
+from typing import Any
+
+key_prefix: str = 'response_cache:'
+tag_prefix: str = 'response_cache_tag:'
+
+def get_tag_key(tag: str) -> str:
+    return f"{tag_prefix}{tag}"
+
+# Invalidating a tag bumps its version instead of finding the responses that carry it, so writes stay O(1)
+# Tag versions outlive every response stored with them, so an expired tag can never make an old response valid again
+def invalidate_responses(*tags: str) -> None:
+    pipeline: Any = cache.pipeline()
+    for tag in tags:
+        pipeline.incr(get_tag_key(tag))
+        pipeline.expire(get_tag_key(tag), 2 * response_cache_config['ttl'])
+    pipeline.execute()
+
+def clear_responses() -> None:
+    for key in cache.scan_iter(f"{key_prefix}*"):
+        cache.delete(key)
+    for key in cache.scan_iter(f"{tag_prefix}*"):
+        cache.delete(key)
+
+class CachedResponse():
+
+    # Tag versions are read before the database, so a response built from data older than a write is stored already stale
+    def __init__(self, key: str, tags: list[str], if_none_match: str | None, cacheable: bool = True) -> None:
+        self.key = f"{key_prefix}{key}"
+        self.tags = tags
+        self.if_none_match = if_none_match
+        self.cacheable = cacheable and response_cache_config['ttl'] > 0
+        self.content: Any = None
+        self.etag: str | None = None
+        self.versions: list[str | None] = []
+
+    def get_keys(self) -> list[str]:
+        return [get_tag_key(tag) for tag in self.tags] + [self.key]
+
+    def load(self, values: list[str | None]) -> Response | None:
+        self.versions = values[:-1]
+        if values[-1] is not None:
+            entry: Any = loads(values[-1])
+            if entry['versions'] == self.versions:
+                self.content = entry['content']
+                self.etag = entry['etag']
+        if self.etag is None:
+            return None
+        return self.to_response()
+
+    def to_response(self) -> Response:
+        if self.if_none_match is not None and (self.if_none_match.strip() == '*' or self.etag in [etag.strip().removeprefix('W/') for etag in self.if_none_match.split(',')]):
+            return Response(status_code=304, headers={'ETag': str(self.etag)})
+        return JSONResponse(self.content, headers={'ETag': str(self.etag), 'Cache-Control': 'no-cache'})
+
+    def get(self) -> Response | None:
+        if not self.cacheable:
+            return None
+        return self.load(cache.mget(self.get_keys()))
+
+    async def get_async(self) -> Response | None:
+        if not self.cacheable:
+            return None
+        return self.load(await get_async_cache().mget(self.get_keys()))
+
+    def store(self, content: Any, ttl: int | None) -> tuple[str, int]:
+        self.content = content
+        self.etag = f"\"{sha256(dumps(content, sort_keys=True).encode('utf-8')).hexdigest()[:32]}\""
+        return dumps({'versions': self.versions, 'content': content, 'etag': self.etag}), response_cache_config['ttl'] if ttl is None else min(ttl, response_cache_config['ttl'])
+
+    def set(self, content: Any, ttl: int | None = None) -> Response:
+        if not self.cacheable:
+            return JSONResponse(content)
+        entry: str
+        entry, ttl = self.store(content, ttl)
+        if ttl > 0:
+            cache.set(self.key, entry, ex=ttl)
+        return self.to_response()
+
+    async def set_async(self, content: Any, ttl: int | None = None) -> Response:
+        if not self.cacheable:
+            return JSONResponse(content)
+        entry: str
+        entry, ttl = self.store(content, ttl)
+        if ttl > 0:
+            await get_async_cache().set(self.key, entry, ex=ttl)
+        return self.to_response()
@@ -0,0 +1,248 @@
+from mysql.connector.abstracts import MySQLCursorAbstract
+from datetime import datetime
+from json import dumps, loads
+from cache import cache
+from config import scoreboard_config
+from typing import Any
+
+def get_scoreboard_teams(cursor: MySQLCursorAbstract, competition_id: int) -> list[Any]:
+    cursor.execute("""
+        SELECT
+            teams.id AS id,
+            teams.name AS name,
+            teams.individual AS individual
+        FROM teams
+        INNER JOIN competition_participants ON teams.id = competition_participants.team_id
+        WHERE competition_participants.competition_id = %(id)s AND competition_participants.author_confirmed = 1
+    """, {'id': competition_id})
+    return list(cursor.fetchall())
+
+def get_scoreboard_problems(cursor: MySQLCursorAbstract, competition_id: int) -> list[Any]:
+    cursor.execute("""
+        SELECT
+            problems.id AS id,
+            problems.name AS name,
+            competition_problems.problem_edition AS edition
+        FROM problems
+        INNER JOIN competition_problems ON problems.id = competition_problems.problem_id
+        WHERE competition_problems.competition_id = %(id)s
+    """, {'id': competition_id})
+    return list(cursor.fetchall())
+
+def get_scoreboard_submissions(cursor: MySQLCursorAbstract, competition_id: int, competition: Any, team_id: int | None = None) -> dict[tuple[int, int], list[Any]]:
+    cursor.execute("""
+        SELECT
+            competition_submissions.team_id AS team_id,
+            submissions.problem_id AS problem_id,
+            submissions.correct_score AS correct_score,
+            submissions.total_score AS total_score,
+            submissions.time_sent AS time_sent
+        FROM submissions
+        INNER JOIN competition_submissions ON submissions.id = competition_submissions.submission_id
+        INNER JOIN competitions ON competition_submissions.competition_id = competitions.id
+        INNER JOIN competition_problems ON competition_problems.competition_id = competitions.id AND competition_problems.problem_id = submissions.problem_id
+        WHERE competitions.id = %(competition_id)s AND submissions.time_sent BETWEEN competitions.start_time AND competitions.end_time
+    """ + (" AND submissions.problem_edition = competition_problems.problem_edition" if competition['only_count_submissions_with_zero_edition_difference'] else '') + (" AND competition_submissions.team_id = %(team_id)s" if team_id is not None else '') + """
+        ORDER BY submissions.id
+    """, {'competition_id': competition_id, 'team_id': team_id})
+    submissions: dict[tuple[int, int], list[Any]] = {}
+    for submission in cursor.fetchall():
+        submissions.setdefault((submission['team_id'], submission['problem_id']), []).append(submission)
+    return submissions
+
+def get_scoreboard_problem(problem: Any, submissions: list[Any], competition: Any) -> dict[str, Any]:
+    score: int | None = None
+    solved: bool = False
+    penalty_minutes: int = 0
+    penalty_score: int = 0
+    attempts: int = 0
+    if len(submissions) > 0:
+        score = max(submission['correct_score'] for submission in submissions)
+        best: Any = next(submission for submission in submissions if submission['correct_score'] == score)
+        if score == best['total_score']:
+            solved = True
+        if competition['only_count_solved_or_not'] and competition['count_scores_as_percentages']:
+            score = 100 if score == best['total_score'] else 0
+        elif competition['only_count_solved_or_not']:
+            score = 1 if score == best['total_score'] else 0
+        elif competition['count_scores_as_percentages']:
+            value: float = (score / best['total_score']) * 100
+            score = int(value) if value - int(value) < 0.5 else int(value) + 1
+        wrong_attempts: int = sum(1 for submission in submissions if submission['time_sent'] < best['time_sent'])
+        attempts = 1 + wrong_attempts
+        if solved:
+            penalty_minutes = (datetime.strptime(best['time_sent'], "%Y-%m-%d %H:%M:%S") - datetime.strptime(competition['start_time'], "%Y-%m-%d %H:%M:%S")).seconds // 60
+            penalty_score = int(penalty_minutes * competition['time_penalty_coefficient'])
+            penalty_score += wrong_attempts * competition['wrong_attempt_penalty']
+    return {
+        'id': problem['id'],
+        'name': problem['name'],
+        'edition': problem['edition'],
+        'best_score': score,
+        'solved': solved,
+        'penalty_minutes': penalty_minutes,
+        'penalty_score': penalty_score,
+        'attempts': attempts
+    }
+
+def get_scoreboard_participant(team: Any, problems: list[Any], submissions: dict[tuple[int, int], list[Any]], competition: Any) -> dict[str, Any]:
+    participant: dict[str, Any] = {
+        'username_or_team_name': team['name'],
+        'individual': team['individual'],
+        'problems': [get_scoreboard_problem(problem, submissions.get((team['id'], problem['id']), []), competition) for problem in problems]
+    }
+    only_none: bool = all(problem['best_score'] is None for problem in participant['problems'])
+    participant['total_score'] = None if only_none else sum(0 if problem['best_score'] is None else problem['best_score'] for problem in participant['problems'])
+    participant['total_penalty_score'] = sum(problem['penalty_score'] for problem in participant['problems'])
+    return participant
+
+def sort_scoreboard_participants(participants: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return sorted(participants, key=lambda x: (-1 if x['total_score'] is None else x['total_score'], -x['total_penalty_score']), reverse=True)
+
+def get_scoreboard_key(competition_id: int) -> str:
+    return f"scoreboard:{competition_id}"
+
+def get_scoreboard_version_key(competition_id: int) -> str:
+    return f"scoreboard_version:{competition_id}"
+
+def get_scoreboard_channel(competition_id: int) -> str:
+    return f"scoreboard_updates:{competition_id}"
+
+def get_scoreboard_participant_diff(old_participant: dict[str, Any] | None, new_participant: dict[str, Any]) -> dict[str, Any]:
+    old_problems: dict[int, dict[str, Any]] = {} if old_participant is None else {problem['id']: problem for problem in old_participant['problems']}
+    return {
+        **{key: value for key, value in new_participant.items() if key != 'problems'},
+        'problems': [problem for problem in new_participant['problems'] if old_problems.get(problem['id']) != problem]
+    }
+
+def get_scoreboard_competition(cursor: MySQLCursorAbstract, competition_id: int) -> Any:
+    cursor.execute("SELECT start_time, only_count_submissions_with_zero_edition_difference, only_count_solved_or_not, count_scores_as_percentages, time_penalty_coefficient, wrong_attempt_penalty FROM competitions WHERE id = %(id)s LIMIT 1", {'id': competition_id})
+    return cursor.fetchone()
+
+# The version is bumped by every invalidation and team update before the database is read, so a rebuild that read older data is not stored
+# The version field of a stored scoreboard also marks a competition without participants as built
+store_scoreboard_script: Any = cache.register_script("""
+    if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+        return 0
+    end
+    redis.call('DEL', KEYS[1])
+    redis.call('HSET', KEYS[1], 'version', ARGV[1])
+    for index = 3, #ARGV, 2 do
+        redis.call('HSET', KEYS[1], ARGV[index], ARGV[index + 1])
+    end
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    redis.call('SET', KEYS[2], ARGV[1], 'EX', 2 * tonumber(ARGV[2]))
+    return 1
+""")
+
+# A team row is only written into a scoreboard that still exists and only over a row computed at an older version, an empty row removes the team
+update_scoreboard_team_script: Any = cache.register_script("""
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return false
+    end
+    local version = redis.call('HGET', KEYS[1], 'version:' .. ARGV[1]) or redis.call('HGET', KEYS[1], 'version')
+    if tonumber(version or '0') >= tonumber(ARGV[3]) then
+        return false
+    end
+    local old_row = redis.call('HGET', KEYS[1], ARGV[1]) or ''
+    if ARGV[2] == '' then
+        redis.call('HDEL', KEYS[1], ARGV[1])
+    else
+        redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    end
+    redis.call('HSET', KEYS[1], 'version:' .. ARGV[1], ARGV[3])
+    return old_row
+""")
+
+def bump_scoreboard_version(competition_id: int) -> int:
+    pipeline: Any = cache.pipeline()
+    pipeline.incr(get_scoreboard_version_key(competition_id))
+    # The version outlives the scoreboard stored with it, so an expired version can never make an older team row win
+    pipeline.expire(get_scoreboard_version_key(competition_id), 2 * scoreboard_config['ttl'])
+    return pipeline.execute()[0]
+
+def rebuild_scoreboard(cursor: MySQLCursorAbstract, competition_id: int, competition: Any) -> list[dict[str, Any]]:
+    version: str = cache.get(get_scoreboard_version_key(competition_id)) or '0'
+    teams: list[Any] = get_scoreboard_teams(cursor, competition_id)
+    problems: list[Any] = get_scoreboard_problems(cursor, competition_id)
+    submissions: dict[tuple[int, int], list[Any]] = get_scoreboard_submissions(cursor, competition_id, competition)
+    participants: dict[int, dict[str, Any]] = {team['id']: get_scoreboard_participant(team, problems, submissions, competition) for team in teams}
+    rows: list[str] = [value for team_id, participant in participants.items() for value in (str(team_id), dumps(participant))]
+    store_scoreboard_script(keys=[get_scoreboard_key(competition_id), get_scoreboard_version_key(competition_id)], args=[version, scoreboard_config['ttl'], *rows])
+    return list(participants.values())
+
+def update_scoreboard_team(cursor: MySQLCursorAbstract, competition_id: int, team_id: int) -> None:
+    # The version is bumped even when no scoreboard is stored, so a rebuild running concurrently does not store rows without this update
+    version: int = bump_scoreboard_version(competition_id)
+    if not cache.exists(get_scoreboard_key(competition_id)):
+        return
+    competition: Any = get_scoreboard_competition(cursor, competition_id)
+    if competition is None:
+        return
+    cursor.execute("""
+        SELECT
+            teams.id AS id,
+            teams.name AS name,
+            teams.individual AS individual
+        FROM teams
+        INNER JOIN competition_participants ON teams.id = competition_participants.team_id
+        WHERE competition_participants.competition_id = %(competition_id)s AND competition_participants.team_id = %(team_id)s AND competition_participants.author_confirmed = 1
+        LIMIT 1
+    """, {'competition_id': competition_id, 'team_id': team_id})
+    team: Any = cursor.fetchone()
+    if team is None:
+        if update_scoreboard_team_script(keys=[get_scoreboard_key(competition_id)], args=[team_id, '', version]):
+            cache.publish(get_scoreboard_channel(competition_id), dumps({'type': 'reset'}))
+        return
+    problems: list[Any] = get_scoreboard_problems(cursor, competition_id)
+    submissions: dict[tuple[int, int], list[Any]] = get_scoreboard_submissions(cursor, competition_id, competition, team_id)
+    participant: dict[str, Any] = get_scoreboard_participant(team, problems, submissions, competition)
+    new_row: str = dumps(participant)
+    old_row: str | None = update_scoreboard_team_script(keys=[get_scoreboard_key(competition_id)], args=[team_id, new_row, version])
+    if old_row is not None and old_row != new_row:
+        cache.publish(get_scoreboard_channel(competition_id), dumps({
+            'type': 'diff',
+            'status': 202,
+            'participants': [get_scoreboard_participant_diff(None if old_row == '' else loads(old_row), participant)]
+        }))
+
+def update_scoreboard_submission(cursor: MySQLCursorAbstract, submission_id: int) -> None:
+    cursor.execute("SELECT competition_id, team_id FROM competition_submissions WHERE submission_id = %(submission_id)s LIMIT 1", {'submission_id': submission_id})
+    competition_submission: Any = cursor.fetchone()
+    if competition_submission is not None:
+        update_scoreboard_team(cursor, competition_submission['competition_id'], competition_submission['team_id'])
+
+def invalidate_scoreboard(competition_id: int) -> None:
+    bump_scoreboard_version(competition_id)
+    cache.delete(get_scoreboard_key(competition_id))
+    cache.publish(get_scoreboard_channel(competition_id), dumps({'type': 'reset'}))
+
+def invalidate_scoreboards() -> None:
+    for key in cache.scan_iter(get_scoreboard_key('*')):
+        cache.delete(key)
+    for key in cache.scan_iter(get_scoreboard_version_key('*')):
+        cache.delete(key)
+
+def invalidate_scoreboards_by_problem(cursor: MySQLCursorAbstract, problem_id: int) -> None:
+    cursor.execute("SELECT competition_id FROM competition_problems WHERE problem_id = %(problem_id)s", {'problem_id': problem_id})
+    for competition_problem in cursor.fetchall():
+        invalidate_scoreboard(competition_problem['competition_id'])
+
+def invalidate_scoreboards_by_team(cursor: MySQLCursorAbstract, team_name: str, individual: bool) -> None:
+    cursor.execute("""
+        SELECT competition_participants.competition_id AS competition_id
+        FROM competition_participants
+        INNER JOIN teams ON competition_participants.team_id = teams.id
+        WHERE teams.name = %(name)s AND teams.name = BINARY %(name)s AND teams.individual = %(individual)s
+    """, {'name': team_name, 'individual': individual})
+    for competition_participant in cursor.fetchall():
+        invalidate_scoreboard(competition_participant['competition_id'])
+
+def get_scoreboard(cursor: MySQLCursorAbstract, competition_id: int, competition: Any) -> dict[str, Any]:
+    rows: dict[str, str] = cache.hgetall(get_scoreboard_key(competition_id))
+    participants: list[dict[str, Any]] = [loads(row) for team_id, row in rows.items() if team_id.isdigit()] if 'version' in rows else rebuild_scoreboard(cursor, competition_id, competition)
+    return {
+        'time_penalty_coefficient': competition['time_penalty_coefficient'],
+        'wrong_attempt_penalty': competition['wrong_attempt_penalty'],
+        'participants': sort_scoreboard_participants(participants)
+    }
@@ -4,17 +4,42 @@ sys.path.insert(0, os.path.dirname(__file__).replace('\\', '/') + '/../')
 
 import jwt
 from datetime import datetime, timedelta
-from config import config
+from config import config, jwt_config
 from fastapi import HTTPException
 from pydantic import BaseModel
 from cache import cache
+from collections import OrderedDict
+from threading import Lock
+from time import time
+
+jwt_secret_channel: str = 'jwt_secret_updates'
+
+# The secret is kept in process, rotations are pushed through jwt_secret_channel and otherwise seen after the ttl
+jwt_secret: str | None = None
+jwt_secret_loaded_at: float = 0.0
+
+def reload_jwt_secret() -> None:
+    global jwt_secret, jwt_secret_loaded_at
+    new_jwt_secret: str | None = cache.get('jwt_secret')
+    if new_jwt_secret != jwt_secret:
+        # Tokens verified with the previous secret are not valid anymore
+        with verified_tokens_lock:
+            verified_tokens.clear()
+    jwt_secret = new_jwt_secret
+    jwt_secret_loaded_at = time()
+
+def get_jwt_secret() -> str | None:
+    if jwt_secret is None or time() - jwt_secret_loaded_at > jwt_config['secret_ttl']:
+        reload_jwt_secret()
+    return jwt_secret
 
 def encode_token(id: int, username: str, use: str = 'authorization', exp_delta: timedelta = timedelta(days=365)) -> str:
-    if cache.get('jwt_secret') is None:
+    secret: str | None = get_jwt_secret()
+    if secret is None:
         raise HTTPException(status_code=500, detail="Internal Server Error")
     else:
         try:
-            return jwt.encode({'id': id, 'username': username, 'use': use, 'exp': datetime.utcnow() + exp_delta}, cache.get('jwt_secret'), algorithm='HS256')
+            return jwt.encode({'id': id, 'username': username, 'use': use, 'exp': datetime.utcnow() + exp_delta}, secret, algorithm='HS256')
         except:
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
@@ -23,16 +48,49 @@ class Token(BaseModel):
     username: str
     use: str
 
+# Recently verified tokens with their expiration time, so polling clients are not verified on every request
+verified_tokens: OrderedDict[str, tuple[Token, float]] = OrderedDict()
+verified_tokens_lock: Lock = Lock()
+
+def get_verified_token(token: str) -> Token | None:
+    with verified_tokens_lock:
+        verified_token: tuple[Token, float] | None = verified_tokens.get(token)
+        if verified_token is None:
+            return None
+        if verified_token[1] <= time():
+            del verified_tokens[token]
+            return None
+        verified_tokens.move_to_end(token)
+        return verified_token[0]
+
+def add_verified_token(token: str, secret: str, decoded_token_obj: Token, exp: float) -> None:
+    with verified_tokens_lock:
+        # The secret might have been rotated while the token was being verified
+        if secret != jwt_secret:
+            return
+        verified_tokens[token] = (decoded_token_obj, exp)
+        verified_tokens.move_to_end(token)
+        while len(verified_tokens) > jwt_config['verified_tokens_size']:
+            verified_tokens.popitem(last=False)
+
 def decode_token(token: str | None, use: str = 'authorization') -> Token:
-    if cache.get('jwt_secret') is None:
+    secret: str | None = get_jwt_secret()
+    if secret is None:
         raise HTTPException(status_code=401, detail="You didn't provide a token")
     if token is None or token == '':
         raise HTTPException(status_code=401, detail="Invalid token")
+    verified_token: Token | None = get_verified_token(token)
+    if verified_token is not None:
+        if use != verified_token.use:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return verified_token
     try:
-        decoded_token: dict[str, int | str] = jwt.decode(token, cache.get('jwt_secret'), algorithms=['HS256'])
+        decoded_token: dict[str, int | str] = jwt.decode(token, secret, algorithms=['HS256'])
         decoded_token_obj: Token = Token(id=int(decoded_token['id']), username=str(decoded_token['username']), use=str(decoded_token['use']))
+        if 'exp' in decoded_token:
+            add_verified_token(token, secret, decoded_token_obj, float(decoded_token['exp']))
         if use != decoded_token_obj.use:
             raise HTTPException(status_code=401, detail="Invalid token")
         return decoded_token_obj
     except:
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid token")
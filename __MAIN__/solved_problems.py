@@ -0,0 +1,71 @@
+from mysql.connector.abstracts import MySQLCursorAbstract
+from cache import cache, get_async_cache
+from feature_flags import feature_flags
+from queries import solved_problem_query
+from typing import Any
+
+# The sets are only trusted once they were backfilled, until then the solved flag is read from submissions
+solved_problems_ready_flag: str = 'solved_problems_ready'
+backfill_batch_size: int = 10000
+
+def get_solved_problems_key(user_id: int) -> str:
+    return f"solved_problems:{user_id}"
+
+def get_solved_problem_member(problem_id: int, edition: int) -> str:
+    return f"{problem_id}:{edition}"
+
+def solved_problems_ready() -> bool:
+    return feature_flags.get(solved_problems_ready_flag) == 'True'
+
+def add_solved_problem(user_id: int, problem_id: int, edition: int) -> None:
+    cache.sadd(get_solved_problems_key(user_id), get_solved_problem_member(problem_id, edition))
+
+def remove_solved_problem(user_id: int, problem_id: int) -> None:
+    members: list[str] = list(cache.sscan_iter(get_solved_problems_key(user_id), match=f"{problem_id}:*"))
+    if len(members) > 0:
+        cache.srem(get_solved_problems_key(user_id), *members)
+
+def get_solved(user_id: int, problems: list[tuple[int, int]]) -> list[bool]:
+    pipeline: Any = cache.pipeline()
+    for problem_id, edition in problems:
+        pipeline.sismember(get_solved_problems_key(user_id), get_solved_problem_member(problem_id, edition))
+    return [bool(solved) for solved in pipeline.execute()]
+
+async def get_solved_async(user_id: int, problems: list[tuple[int, int]]) -> list[bool]:
+    pipeline: Any = get_async_cache().pipeline()
+    for problem_id, edition in problems:
+        pipeline.sismember(get_solved_problems_key(user_id), get_solved_problem_member(problem_id, edition))
+    return [bool(solved) for solved in await pipeline.execute()]
+
+def is_solved(cursor: MySQLCursorAbstract, user_id: int, problem_id: int, edition: int) -> bool:
+    if solved_problems_ready():
+        return cache.sismember(get_solved_problems_key(user_id), get_solved_problem_member(problem_id, edition))
+    cursor.execute(solved_problem_query, {'problem_id': problem_id, 'author_user_id': user_id, 'problem_edition': edition})
+    return cursor.fetchone() is not None
+
+# Submissions judged while the backfill runs are added by the judge worker as well, so both only ever add members
+def backfill_solved_problems(cursor: MySQLCursorAbstract) -> None:
+    last_id: int = 0
+    while True:
+        cursor.execute("""
+            SELECT id, author_user_id, problem_id, problem_edition
+            FROM submissions
+            WHERE id > %(last_id)s AND checked = 1 AND correct_score = total_score
+            ORDER BY id
+            LIMIT %(limit)s
+        """, {'last_id': last_id, 'limit': backfill_batch_size})
+        submissions: list[Any] = list(cursor.fetchall())
+        if len(submissions) == 0:
+            break
+        pipeline: Any = cache.pipeline()
+        for submission in submissions:
+            pipeline.sadd(get_solved_problems_key(submission['author_user_id']), get_solved_problem_member(submission['problem_id'], submission['problem_edition']))
+        pipeline.execute()
+        last_id = submissions[-1]['id']
+    feature_flags.set(solved_problems_ready_flag, 'True')
+
+# An empty database has nothing to backfill, so the sets are ready right away
+def clear_solved_problems() -> None:
+    for key in cache.scan_iter(get_solved_problems_key('*')):
+        cache.delete(key)
+    feature_flags.set(solved_problems_ready_flag, 'True')
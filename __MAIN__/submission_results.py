@@ -0,0 +1,18 @@
+from mysql.connector.abstracts import MySQLCursorAbstract
+from config import judge_config
+
+def insert_submission_results(cursor: MySQLCursorAbstract, submission_results: list[dict[str, int]]) -> None:
+    if len(submission_results) == 0:
+        return
+    # executemany sends the rows as one multi-row insert
+    cursor.executemany("""
+        INSERT INTO submission_results (submission_id, test_case_id, verdict_id, time_taken, cpu_time_taken, physical_memory_taken)
+        VALUES (%(submission_id)s, %(test_case_id)s, %(verdict_id)s, %(time_taken)s, %(cpu_time_taken)s, %(physical_memory_taken)s)
+    """, submission_results)
+    submission_results.clear()
+
+# A full batch is written as soon as it is reached, the rest is left for the caller to write when judging ends
+def add_submission_result(cursor: MySQLCursorAbstract, submission_results: list[dict[str, int]], submission_result: dict[str, int]) -> None:
+    submission_results.append(submission_result)
+    if judge_config['results_flush_size'] > 0 and len(submission_results) >= judge_config['results_flush_size']:
+        insert_submission_results(cursor, submission_results)
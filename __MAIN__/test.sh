@@ -1,3 +1,6 @@
 . /back-end-venv/bin/activate
+python judge_worker.py &
+judge_worker_pid=$!
 pytest
+kill $judge_worker_pid
 sh clear_db.sh
\ No newline at end of file
@@ -0,0 +1,38 @@
+from checker_connection import Library, TestResultLib, DebugResultLib
+from compile_cache import lock_run
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Generator
+
+# Verdict id 10 (Skipped) is never returned by the checker and does not count towards the total verdict
+skipped_status: int = 8
+
+# The checker keeps the files of a run under the files id and the run id, so runs of different test cases on the same files never share a file.
+# Runs of the same test case on the same files only meet when workers judge identical code from one compile cache slot, so those are serialized
+def check_test_case(lib: Library, files_id: int, test_case: dict[str, Any], language: str, time_restriction: int, memory_restriction: int, custom_check: int, custom_check_language: str) -> TestResultLib:
+    with lock_run(files_id, test_case['id']):
+        return lib.check_test_case(files_id, test_case['id'], language, test_case['input'], test_case['solution'], time_restriction, memory_restriction, custom_check, custom_check_language)
+
+def debug(lib: Library, files_id: int, debug_test_id: int, language: str, input: str) -> DebugResultLib:
+    with lock_run(files_id, debug_test_id):
+        return lib.debug(files_id, debug_test_id, language, input)
+
+# Test cases run concurrently, but their results are yielded in test order, so the verdicts are the same as of a run one at a time
+def run_test_cases(lib: Library, files_id: int, test_cases: list[dict[str, Any]], language: str, time_restriction: int, memory_restriction: int, custom_check: int, custom_check_language: str, stop_on_first_failure: bool, parallelism: int) -> Generator[TestResultLib, None, None]:
+    test_cases_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(1, min(parallelism, len(test_cases))))
+    try:
+        test_results: list[Future] = [test_cases_executor.submit(check_test_case, lib, files_id, test_case, language, time_restriction, memory_restriction, custom_check, custom_check_language) for test_case in test_cases]
+        failed: bool = False
+        for test_result_future in test_results:
+            if failed:
+                yield TestResultLib(status=skipped_status, time=0, cpu_time=0, physical_memory=0)
+                continue
+            test_result: TestResultLib = test_result_future.result()
+            if test_result.status != 0 and stop_on_first_failure:
+                # Test cases that have not started are reported as skipped, the results of the running ones are dropped
+                failed = True
+                for future in test_results:
+                    future.cancel()
+            yield test_result
+    finally:
+        # Test cases left of a job whose lease was lost are not started
+        test_cases_executor.shutdown(cancel_futures=True)
@@ -0,0 +1,22 @@
+Feature: Async connection cursor
+
+    Scenario: Init
+        Then clear the database
+        Then add the correct user to the database
+        Then add the correct public competition to the database
+
+    Scenario Outline: Convert a <type> value as the sync cursor
+        Given a <type> value <value>
+        When converts the value with both cursors
+        Then both cursors return the same value
+        Examples:
+            | type     | value               |
+            | TINY     | 0                   |
+            | TINY     | 1                   |
+            | DATETIME | 2022-01-01 00:00:00 |
+
+    Scenario: Get competitions as the sync cursor
+        When makes GET request /competitions?unapproved=true
+        Then gets status 200
+        And competitions length is 1
+        And every row of competitions equals to GET /competitions/{id}
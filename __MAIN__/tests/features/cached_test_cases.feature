@@ -0,0 +1,28 @@
+Feature: Cached test cases
+
+    Scenario: Evict the least recently read test cases over the budget
+        Given a test cases cache of 100 bytes
+        When puts 40 bytes of test cases of the problem 1 edition 1
+        And puts 40 bytes of test cases of the problem 2 edition 1
+        And reads the test cases of the problem 1 edition 1
+        And puts 40 bytes of test cases of the problem 3 edition 1
+        Then the test cases of the problem 2 edition 1 are not cached
+        And the test cases of the problem 1 edition 1 are cached
+        And the test cases of the problem 3 edition 1 are cached
+        And the test cases cache uses 80 bytes
+
+    Scenario: Drop older editions of the same problem
+        Given a test cases cache of 100 bytes
+        When puts 40 bytes of test cases of the problem 1 edition 1
+        And puts 30 bytes of test cases of the problem 1 edition 2
+        Then the test cases of the problem 1 edition 1 are not cached
+        And the test cases of the problem 1 edition 2 are cached
+        And the test cases cache uses 30 bytes
+
+    Scenario: Skip test cases larger than the budget
+        Given a test cases cache of 100 bytes
+        When puts 40 bytes of test cases of the problem 1 edition 1
+        And puts 120 bytes of test cases of the problem 2 edition 1
+        Then the test cases of the problem 2 edition 1 are not cached
+        And the test cases of the problem 1 edition 1 are cached
+        And the test cases cache uses 40 bytes
@@ -52,6 +52,10 @@ Feature: Competitions
         When makes GET request /competitions/{id}
         Then gets status 404
 
+    Scenario: Get competitions with the removed start
+        When makes GET request /competitions?start=0
+        Then gets status 400
+
     Scenario: Get a public competition
         Given id of the correct public competition
         And put into params
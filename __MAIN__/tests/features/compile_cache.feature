@@ -0,0 +1,47 @@
+Feature: Compile cache
+
+    Scenario: Compile the same code twice
+        Given an empty compile cache of 2 entries
+        When compiles the code A
+        And compiles the code A
+        Then the checker compiles 1 times
+        And every compilation of the code A gets the same files
+        And the files of the code A are cached
+
+    Scenario: Compile different code
+        Given an empty compile cache of 2 entries
+        When compiles the code A
+        And compiles the code B
+        Then the checker compiles 2 times
+        And the files of the code A are cached
+        And the files of the code B are cached
+
+    Scenario: Cache a compilation error
+        Given an empty compile cache of 2 entries
+        And compilations end with the status 5
+        When compiles the code A
+        And compiles the code A
+        Then the checker compiles 1 times
+        And every compilation ends with the status 5
+        And the files of the code A are cached
+
+    Scenario: Compile again after an internal error
+        Given an empty compile cache of 2 entries
+        And compilations end with the status 7
+        When compiles the code A
+        And compiles the code A
+        Then the checker compiles 2 times
+        And the files of every compilation of the code A are deleted
+
+    Scenario: Evict the least recently used files
+        Given an empty compile cache of 1 entries
+        When compiles the code A
+        And compiles the code B
+        Then the files of the code A are evicted under an exclusive lock
+        And the files of the code B are cached
+
+    Scenario: Keep the files that are being judged
+        Given an empty compile cache of 1 entries
+        When compiles the code A
+        And judges the code A while compiling the code B
+        Then the files of the code A are cached
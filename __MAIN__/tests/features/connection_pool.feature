@@ -0,0 +1,55 @@
+Feature: Connection pool
+
+    Scenario: Reject a checkout when the pool is exhausted
+        Given a connection pool of 1 connections
+        When acquires 1 connections from the pool
+        Then acquiring a connection fails with 503 after the pool timeout
+        And the pool metric exhausted is 1
+        And the pool has 1 connections in use and 0 idle
+
+    Scenario: Reuse a released connection
+        Given a connection pool of 2 connections
+        When acquires 2 connections from the pool
+        And releases the connections to the pool
+        And acquires 1 connections from the pool
+        Then the pool has 1 connections in use and 1 idle
+        And the pool metric created is 2
+        And the pool metric reused is 1
+
+    Scenario: Reap idle connections
+        Given a connection pool of 2 connections
+        And a stopped pool clock
+        When acquires 2 connections from the pool
+        And releases the connections to the pool
+        And 11 seconds pass on the pool clock
+        And acquires 1 connections from the pool
+        Then the pool metric reaped is 2
+        And the pool metric created is 3
+        And the pool has 1 connections in use and 0 idle
+
+    Scenario: Ping only connections idle past the ping interval
+        Given a stopped pool clock
+        When acquires 1 connections from the pool
+        And releases the connections to the pool
+        And watches the pings of the idle connections
+        And 4 seconds pass on the pool clock
+        And acquires 1 connections from the pool
+        Then the idle connections are pinged 0 times
+
+        When releases the connections to the pool
+        And 6 seconds pass on the pool clock
+        And acquires 1 connections from the pool
+        Then the idle connections are pinged 1 times
+        And the pool metric reused is 2
+        And the pool metric created is 1
+
+    Scenario: Start over with an empty pool after a fork
+        Given a connection pool of 2 connections
+        When acquires 2 connections from the pool
+        And releases the connections to the pool
+        And acquires 1 connections from the pool
+        And the pool is inherited by a forked process
+        And acquires 1 connections from the pool
+        Then the pool has 1 connections in use and 0 idle
+        And the pool metric created is 3
+        And the last acquired connection is not one of the parent process
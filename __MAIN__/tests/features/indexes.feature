@@ -0,0 +1,29 @@
+Feature: Indexes
+
+    Scenario: Init
+        Then clear the database
+        Then add the correct user to the database
+        Then add the correct public problem to the database
+
+    Scenario Outline: Query the <query> by an index
+        Given the <query> query
+        When explains the query
+        Then the query uses the <index> index
+        Examples:
+            | query                        | index                                    |
+            | user by username             | username                                 |
+            | user by email                | email                                    |
+            | team by name                 | name                                     |
+            | solved problem               | submissions_author_problem_edition       |
+            | competition team submissions | competition_submissions_competition_team |
+            | user submissions             | submissions_author_time_sent             |
+            | problem submissions          | submissions_problem_time_sent            |
+
+    Scenario Outline: Page the <query> in index order
+        Given the <query> query
+        When explains the query
+        Then the query does not sort rows
+        Examples:
+            | query               |
+            | user submissions    |
+            | problem submissions |
@@ -0,0 +1,62 @@
+Feature: Judge queue
+
+    Scenario: Enqueue a submission twice
+        Given an empty judge queue
+        When enqueues the submission 1
+        Then the job is enqueued
+        When enqueues the submission 1
+        Then the job is not enqueued
+        And the judge queue has 1 pending jobs
+
+    Scenario: Claim a debug job first
+        Given an empty judge queue
+        When enqueues the submission 1
+        And enqueues the debug job 1
+        And claims a job
+        Then the claimed job is debug:1
+        When claims a job
+        Then the claimed job is 1
+
+    Scenario: Requeue a job after its deadline
+        Given an empty judge queue
+        And a visibility timeout of 0 seconds
+        When enqueues the submission 1
+        And claims a job
+        And requeues expired jobs
+        Then no job has failed
+        And the judge queue has 1 pending jobs
+        And the claimed job has lost its lease
+        When claims a job
+        Then the claimed job is 1
+        And the claimed job has its lease
+
+    Scenario: Fail a job after the maximum attempts
+        Given an empty judge queue
+        And a visibility timeout of 0 seconds
+        And a maximum of 1 attempts
+        When enqueues the submission 1
+        And claims a job
+        And requeues expired jobs
+        Then the job 1 has failed
+        And the claimed job has lost its lease
+        And the judge queue has 0 pending jobs
+
+    Scenario: Keep a job whose deadline is extended
+        Given an empty judge queue
+        And a visibility timeout of 0 seconds
+        When enqueues the submission 1
+        And claims a job
+        Given a visibility timeout of 60 seconds
+        When extends the lease of the claimed job
+        And requeues expired jobs
+        Then no job has failed
+        And the judge queue has 0 pending jobs
+        And the claimed job has its lease
+
+    Scenario: End a debug whose results never come
+        Given an empty judge queue
+        And a visibility timeout of 1 seconds
+        And a maximum of 1 attempts
+        When waits for the results of the debug 1 with 2 inputs that never come
+        Then every debug result is an internal server error
+        And the debug 1 no longer blocks its user
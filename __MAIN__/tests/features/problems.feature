@@ -60,6 +60,18 @@ Feature: Problems
         When makes GET request /problems/{id}
         Then gets status 200
 
+    Scenario: Get a public problem that is not modified
+        Given id of the correct public problem
+        And put into params
+        When makes GET request /problems/{id}
+        Then gets status 200
+        And saves the etag to headers
+
+        Given id of the correct public problem
+        And put into params
+        When makes GET request /problems/{id}
+        Then gets status 304
+
     Scenario: Get a private problem not being an author
         Given username and password of another user
         And put into body
@@ -89,6 +101,37 @@ Feature: Problems
         Then gets status 200
         And problems length is 1
 
+    Scenario: Get problems by pages
+        Then add a new problem to the database
+        When makes GET request /problems?unapproved=true&limit=1
+        Then gets status 200
+        And problems length is 1
+        And pages of /problems?unapproved=true by 1 have every row of problems once
+
+    Scenario: Get users public problems by pages
+        Then add a new problem to the database
+        And pages of /users/correct/problems?only_public=true by 1 have every row of problems once
+
+    Scenario: Get problems with the removed start
+        When makes GET request /problems?start=0
+        Then gets status 400
+
+    Scenario: Get problems that are not modified
+        When makes GET request /problems
+        Then gets status 200
+        And saves the etag to headers
+
+        When makes GET request /problems
+        Then gets status 304
+
+    Scenario: Get problems with an invalid page
+        When makes GET request /problems?page=invalid
+        Then gets status 400
+
+    Scenario: Get problems with a too big limit
+        When makes GET request /problems?limit=100000
+        Then gets status 400
+
     Scenario: Get users problems that you are not an author
         Given username and password of another user
         And put into body
@@ -257,6 +300,49 @@ Feature: Problems
         When makes PUT request /problems/{id}
         Then gets status 200
 
+    Scenario: Add a custom checker
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given a custom checker with the code print(1)
+        And put into body
+        Given id of the correct public problem
+        And put into params
+        When makes POST request /problems/{id}/custom-checker
+        Then gets status 200
+        And the custom checker artifact of the problem 2 has the code print(1)
+
+    Scenario: Update a custom checker
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given a custom checker with the code print(2)
+        And put into body
+        Given id of the correct public problem
+        And put into params
+        When makes PUT request /problems/{id}/custom-checker
+        Then gets status 200
+        And the custom checker artifact of the problem 2 has the code print(2)
+
+    Scenario: Delete a custom checker
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        When makes DELETE request /problems/{id}/custom-checker
+        Then gets status 200
+        And the custom checker artifact of the problem 2 has no custom checker
+
     Scenario: Delete a problem
         Given username and password of the correct user
         And put into body
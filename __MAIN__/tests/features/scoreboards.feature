@@ -0,0 +1,37 @@
+Feature: Scoreboards
+
+    Scenario: Init
+        Then clear the database
+        Then add the correct user to the database
+        Then add another user to the database
+        Then add the scoreboard competition to the database
+
+    Scenario: Get participants of the competition by pages
+        Then pages of /competitions/1/participants by 1 have every row of participants once
+
+    Scenario: Get the scoreboard
+        When makes GET request /competitions/1/scoreboard
+        Then gets status 200
+        And equals to the baseline scoreboard
+
+    Scenario: Rebuild the scoreboard once for every subscriber
+        When 2 subscribers watch the scoreboard of the competition 1 while it is reset
+        Then every subscriber gets the same rebuilt scoreboard
+        And the scoreboard is rebuilt 1 time per reset
+
+    Scenario: Update only the team of a judged submission
+        Given the stored scoreboard of the competition 1
+        When the competition 1 gets a judged submission of the team 3 for the problem 3
+        Then only the team 3 changed in the stored scoreboard of the competition 1
+
+    Scenario: Reject scoreboard writes with a stale version
+        Given the stored scoreboard of the competition 1
+        When the team 2 row of the competition 1 is written with a stale version
+        Then the stale writes are rejected
+        And the stored scoreboard of the competition 1 is unchanged
+
+    Scenario: Rebuild an invalidated scoreboard as a cold computation
+        When the scoreboard of the competition 1 is invalidated
+        And makes GET request /competitions/1/scoreboard
+        Then gets status 200
+        And equals to the cold scoreboard of the competition 1
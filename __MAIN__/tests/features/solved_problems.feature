@@ -0,0 +1,150 @@
+Feature: Solved problems
+
+    Scenario: Init
+        Then clear the database
+        Then add the correct user to the database
+        Then add the correct public problem to the database
+
+    Scenario: Get a problem that is not solved
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        When makes GET request /problems/{id}
+        Then gets status 200
+        And solved equals to False
+
+    Scenario: Solve a problem
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given all data of the correct submission
+        And put into body
+        When makes POST request /submissions?no_realtime=true
+        Then gets status 200
+
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        When makes GET request /problems/{id}
+        Then gets status 200
+        And solved equals to True
+
+    Scenario Outline: Get solved flags from submissions before the sets are ready
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given username of the correct user
+        And put into params
+        When makes GET request <uri>
+        Then gets status 200
+        And saves the response
+
+        Given the solved sets are not ready
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given username of the correct user
+        And put into params
+        When makes GET request <uri>
+        Then the solved sets are ready
+        And gets status 200
+        And equals to the saved response
+        And <field> with id 2 has solved equal to True
+        Examples:
+            | uri                          | field    |
+            | /problems?unapproved=true    | problems |
+            | /users/{username}/problems   | problems |
+
+    Scenario: Update a solved problem
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        Given name and statement of a new problem
+        And put into body
+        When makes PUT request /problems/{id}
+        Then gets status 200
+
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        When makes GET request /problems/{id}
+        Then gets status 200
+        And solved equals to False
+
+    Scenario: Delete submissions of a solved problem
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given all data of the correct submission
+        And put into body
+        When makes POST request /submissions?no_realtime=true
+        Then gets status 200
+
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        When makes DELETE request /problems/{id}/submissions/authors
+        Then gets status 200
+
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        When makes GET request /problems/{id}
+        Then gets status 200
+        And solved equals to False
+
+        Given the solved sets are not ready
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        When makes GET request /problems/{id}
+        Then the solved sets are ready
+        And gets status 200
+        And solved equals to False
@@ -0,0 +1,15 @@
+Feature: Submission results
+
+    Scenario: Init
+        Then clear the database
+
+    Scenario Outline: Write the results with a flush size of <size>
+        Given a results flush size of <size>
+        When writes the results with statuses 0,1,0,2,8,8 of a submission
+        Then the results are written by inserts of <inserts>
+        And the results are stored in test order with the verdicts 2,3,2,4,10,10
+        Examples:
+            | size | inserts     |
+            |    0 |           6 |
+            |    1 | 1,1,1,1,1,1 |
+            |    4 |         4,2 |
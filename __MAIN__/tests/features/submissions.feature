@@ -93,4 +93,123 @@ Feature: Submissions
         And put into params
         When makes GET request /users/{username}/submissions/public/problems/{problem_id}
         Then gets status 200
-        Then submissions length is 1
\ No newline at end of file
+        Then submissions length is 1
+
+    Scenario: Get problem's submissions by pages sent at the same time
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given all data of the correct submission
+        And put into body
+        When makes POST request /submissions?no_realtime=true
+        Then gets status 200
+
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given all data of the correct submission
+        And put into body
+        When makes POST request /submissions?no_realtime=true
+        Then gets status 200
+
+        Then submissions of the problem 2 are sent at the same time
+        And pages of /problems/2/submissions/public by 1 have every row of submissions once
+
+    Scenario Outline: Add the <name> test case
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And a field id is renamed to problem_id
+        And put into params
+        Given all data of <name> test case
+        And put into body
+        When makes POST request /problems/{problem_id}/test-cases
+        Then gets status 200
+        Examples:
+            | name               |
+            | another            |
+            | the correct opened |
+            | the correct closed |
+
+    Scenario: Get a submission judged through every test case
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given all data of the correct submission
+        And put into body
+        When makes POST request /submissions?no_realtime=true
+        Then gets status 200
+
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given a field id is set to 4
+        And put into params
+        When makes GET request /submissions/{id}
+        Then gets status 200
+        And total_verdict equals to Wrong Answer
+        And correct_score equals to 10
+        And results have verdicts Wrong Answer, Correct Answer, Correct Answer
+
+    Scenario: Make a problem stop on the first failure
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        Given a field stop_on_first_failure is set to True
+        And put into body
+        When makes PUT request /problems/{id}
+        Then gets status 200
+
+        Given id of the correct public problem
+        And put into params
+        When makes GET request /problems/{id}
+        Then gets status 200
+        And stop_on_first_failure equals to 1
+
+    Scenario: Get a submission with test cases after the first failure skipped
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given all data of the correct submission
+        And put into body
+        When makes POST request /submissions?no_realtime=true
+        Then gets status 200
+
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given a field id is set to 5
+        And put into params
+        When makes GET request /submissions/{id}
+        Then gets status 200
+        And total_verdict equals to Wrong Answer
+        And correct_score equals to 0
+        And total_score equals to 10
+        And results have verdicts Wrong Answer, Skipped, Skipped
@@ -0,0 +1,19 @@
+Feature: Test case runs
+
+    Scenario Outline: Run test cases <parallelism> at a time
+        Given test cases with statuses <statuses>
+        When runs the test cases 1 at a time with stop on first failure <stop_on_first_failure>
+        And runs the test cases <parallelism> at a time with stop on first failure <stop_on_first_failure>
+        Then runs <parallelism> at a time return the statuses <verdicts> as runs one at a time
+        And runs of the same test case on the same files never overlap
+        Examples:
+            | parallelism | statuses | stop_on_first_failure | verdicts |
+            |           4 |  0,0,0,0 |                 false |  0,0,0,0 |
+            |           4 |  0,1,0,2 |                 false |  0,1,0,2 |
+            |           4 |  0,1,0,0 |                  true |  0,1,8,8 |
+            |           2 |  1,0,0,0 |                  true |  1,8,8,8 |
+
+    Scenario: Run test cases of identical code on the same files
+        Given test cases with statuses 0,1,0,0
+        When runs the test cases 4 at a time on the same files from 2 workers
+        Then runs of the same test case on the same files never overlap
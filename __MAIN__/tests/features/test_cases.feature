@@ -113,6 +113,46 @@ Feature: Test cases
         When makes GET request /problems/{id}/with-test-cases
         Then gets status 200
 
+    Scenario: Get test cases as a JSON stream
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        When makes GET request /problems/{id}/test-cases?stream=json
+        Then gets status 200
+        Then test_cases length is 2
+
+    Scenario: Get test cases as an NDJSON stream
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        When makes GET request /problems/{id}/test-cases?stream=ndjson
+        Then gets status 200
+        Then has 2 lines
+
+    Scenario: Get a problem with test cases as a JSON stream
+        Given username and password of the correct user
+        And put into body
+        When makes POST request /token
+        Then gets status 200
+        And saves the token to headers
+
+        Given id of the correct public problem
+        And put into params
+        When makes GET request /problems/{id}/with-test-cases?stream=json
+        Then gets status 200
+        And has a field name
+        Then test_cases length is 2
+
     Scenario: Make a test case closed
         Given username and password of the correct user
         And put into body
@@ -4,13 +4,42 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(__file__).replace('\\', '/') + '/../../')
 
-from pytest import fixture
+from pytest import fixture, MonkeyPatch, raises
 from pytest_bdd import given, when, then, parsers
 from fastapi.testclient import TestClient
 from httpx import Response
-from main import app
+from main import app, realtime_scoreboards, debug_waiters, testing_users, get_debug_results
+from asyncio import run, get_running_loop, Queue
 from database_scripts.clear import clear
 from security.jwt import encode_token
+from connection_cursor import ConnectionCursor, ConnectionPool
+from fastapi import HTTPException
+import connection_cursor
+from config import db_config, judge_config, scoreboard_config, CustomConverter
+from async_connection_cursor import converters
+from pymysql.constants import FIELD_TYPE
+from mysql.connector.abstracts import MySQLCursorAbstract
+from feature_flags import feature_flags
+from solved_problems import solved_problems_ready_flag
+from response_cache import invalidate_responses
+from scoreboard import invalidate_scoreboard, update_scoreboard_submission, update_scoreboard_team_script, store_scoreboard_script, get_scoreboard_key, get_scoreboard_version_key, get_scoreboard_competition, get_scoreboard_teams, get_scoreboard_problems, get_scoreboard_submissions, get_scoreboard_participant, sort_scoreboard_participants
+from cache import cache
+from custom_checker_artifacts import get_custom_checker_artifact_key
+from urllib.parse import urlencode
+from queries import verified_user_id_by_username_query, verified_user_by_email_query, team_by_name_query, solved_problem_query, user_submissions_condition, problem_submissions_condition, competition_team_submissions_condition, get_submissions_public_query, get_competition_submissions_public_query
+from json import dumps, loads
+from checker_connection import Library, TestResultLib, CreateFilesResultLib
+from test_case_runs import run_test_cases
+from fcntl import flock, LOCK_SH, LOCK_NB, LOCK_UN
+import compile_cache
+from cached_test_cases import CachedTestCases
+import submission_results
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from threading import Lock
+from time import sleep, monotonic
+from typing import Any, Generator
+import judge_queue
 
 client: TestClient = TestClient(app)
 
@@ -100,6 +129,10 @@ def check_status_code(code: int, response: Response) -> None:
 def save_token(response: Response, headers: dict[str, str]) -> None:
     headers['Authorization'] = response.json()['token']
 
+@then("saves the etag to headers")
+def save_etag(response: Response, headers: dict[str, str]) -> None:
+    headers['If-None-Match'] = response.headers['ETag']
+
 @then(parsers.parse("has a field {field}"))
 def has_field(field: str, response: Response) -> None:
     assert field in response.json().keys()
@@ -114,6 +147,26 @@ def field_length_value(field: str, value: int, response: Response) -> None:
     assert field in response.json().keys()
     assert len(response.json()[field]) == value
 
+@then(parsers.parse("has {value:d} lines"))
+def lines_count(value: int, response: Response) -> None:
+    assert len(response.text.splitlines()) == value
+
+@then(parsers.parse("pages of {uri} by {limit:d} have every row of {field} once"))
+def every_row_once(uri: str, limit: int, field: str) -> None:
+    rows: list[Any] = client.get(uri).json()[field]
+    assert len(rows) > limit
+    paged_rows: list[Any] = []
+    page: str | None = None
+    while True:
+        response: Response = client.get(uri + ('&' if '?' in uri else '?') + urlencode({'limit': limit, **({} if page is None else {'page': page})}))
+        assert response.status_code == 200
+        assert len(response.json()[field]) <= limit
+        paged_rows += response.json()[field]
+        page = response.json()['next_page']
+        if page is None:
+            break
+    assert paged_rows == rows
+
 # Users -------------------------------------------------------------
 
 @given(parsers.parse("{fields} of {name} user"))
@@ -317,6 +370,33 @@ def problem_in_database(name: str, names_convert: dict[str, str]) -> None:
             }).json()['token']
         })
 
+# Custom checkers ---------------------------------------------------
+
+@given(parsers.parse("a custom checker with the code {code}"))
+def custom_checker(code: str, data: dict[str, str | int | bool]) -> None:
+    data['code'] = code
+    data['language_name'] = 'Python 3'
+    data['language_version'] = '3.10'
+
+def get_stored_custom_checker_artifact(problem_id: int) -> Any:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        cursor.execute("SELECT edition FROM problems WHERE id = %(problem_id)s LIMIT 1", {'problem_id': problem_id})
+        edition: int = cursor.fetchone()['edition']
+    artifact: str | None = cache.get(get_custom_checker_artifact_key(problem_id, edition))
+    assert artifact is not None
+    return loads(artifact)
+
+@then(parsers.parse("the custom checker artifact of the problem {problem_id:d} has the code {code}"))
+def custom_checker_artifact_code(problem_id: int, code: str) -> None:
+    artifact: Any = get_stored_custom_checker_artifact(problem_id)
+    assert artifact['custom_check'] == 1
+    assert artifact['code'] == code
+
+@then(parsers.parse("the custom checker artifact of the problem {problem_id:d} has no custom checker"))
+def custom_checker_artifact_removed(problem_id: int) -> None:
+    assert get_stored_custom_checker_artifact(problem_id) == {'custom_check': 0, 'language': '', 'code': ''}
+
 # Test cases --------------------------------------------------------
 
 @given(parsers.parse("{fields} of {name} test case"))
@@ -391,6 +471,17 @@ def submission(fields: str, name: str, names_convert: dict[str, str], data: dict
         if 'language_version' in fields_list:
             data['language_version'] = '3.10'
 
+@then(parsers.parse("results have verdicts {verdicts}"))
+def results_verdicts(verdicts: str, response: Response) -> None:
+    assert [result['verdict_text'] for result in sorted(response.json()['results'], key=lambda result: result['test_case_id'])] == verdicts.split(", ")
+
+@then(parsers.parse("submissions of the problem {problem_id:d} are sent at the same time"))
+def same_time_sent(problem_id: int) -> None:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        cursor.execute("UPDATE submissions SET time_sent = '2024-01-01 00:00:00' WHERE problem_id = %(problem_id)s", {'problem_id': problem_id})
+    invalidate_responses(f"submissions:problem:{problem_id}")
+
 # Competitions ----------------------------------------------------------
 
 @given(parsers.parse("{fields} of {name} competition"))
@@ -548,4 +639,603 @@ def competition_in_database(name: str, names_convert: dict[str, str]) -> None:
                 'username': "correct",
                 'password': "correct"
             }).json()['token']
-        })
\ No newline at end of file
+        })
+
+# Indexes -----------------------------------------------------------
+@fixture
+def queries() -> dict[str, tuple[str, dict[str, Any]]]:
+    page: dict[str, Any] = {'limit': 101, 'page_time_sent': '2024-01-01 00:00:00', 'page_id': 1}
+    return {
+        'user by username': (verified_user_id_by_username_query, {'username': 'correct'}),
+        'user by email': (verified_user_by_email_query, {'email': 'correct@test'}),
+        'team by name': (team_by_name_query, {'name': 'correct', 'individual': True}),
+        'solved problem': (solved_problem_query, {'problem_id': 2, 'author_user_id': 2, 'problem_edition': 1}),
+        'competition team submissions': (get_competition_submissions_public_query(competition_team_submissions_condition, True), {'competition_id': 1, 'team_id': 1, **page}),
+        'user submissions': (get_submissions_public_query(user_submissions_condition, True), {'username': 'correct', **page}),
+        'problem submissions': (get_submissions_public_query(problem_submissions_condition, True), {'problem_id': 2, **page})
+    }
+
+@given(parsers.parse("the {query} query"))
+def query(data: dict[str, str | int | bool], queries: dict[str, tuple[str, dict[str, Any]]], query: str) -> None:
+    data['query'], data['query_params'] = queries[query][0], dumps(queries[query][1])
+
+@when("explains the query")
+def explain_query(data: dict[str, str | int | bool]) -> None:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        cursor.execute(f"EXPLAIN {data['query']}", loads(str(data['query_params'])))
+        data['plan'] = dumps(cursor.fetchall())
+
+@then(parsers.parse("the query uses the {index} index"))
+def check_index(data: dict[str, str | int | bool], index: str) -> None:
+    assert any(row['key'] == index for row in loads(str(data['plan'])))
+
+@then("the query does not sort rows")
+def check_no_filesort(data: dict[str, str | int | bool]) -> None:
+    assert all('Using filesort' not in (row['Extra'] or '') for row in loads(str(data['plan'])))
+
+# Async connection cursor -------------------------------------------
+@given(parsers.parse("a {field_type} value {value}"))
+def field_type_value(data: dict[str, str | int | bool], field_type: str, value: str) -> None:
+    data['field_type'] = field_type
+    data['value'] = value
+
+@when("converts the value with both cursors")
+def convert_value(data: dict[str, str | int | bool]) -> None:
+    # PyMySQL passes decoded text to the converters, mysql-connector passes the raw bytes
+    data['async'] = converters[getattr(FIELD_TYPE, str(data['field_type']))](str(data['value']))
+    match data['field_type']:
+        case 'TINY':
+            data['sync'] = CustomConverter._tiny_to_python(str(data['value']).encode('utf-8'))
+        case 'DATETIME':
+            data['sync'] = CustomConverter._datetime_to_python(str(data['value']).encode('utf-8'))
+
+@then("both cursors return the same value")
+def same_value(data: dict[str, str | int | bool]) -> None:
+    assert type(data['async']) is type(data['sync'])
+    assert data['async'] == data['sync']
+
+@then(parsers.parse("every row of {field} equals to GET {uri}"))
+def rows_equal_response(field: str, uri: str, response: Response) -> None:
+    for row in response.json()[field]:
+        assert client.get(uri.format(**row)).json() == row
+
+# Solved problems ---------------------------------------------------
+@given("the solved sets are not ready")
+def solved_problems_not_ready() -> None:
+    feature_flags.set(solved_problems_ready_flag, 'False')
+
+@then("the solved sets are ready")
+def solved_problems_ready() -> None:
+    feature_flags.set(solved_problems_ready_flag, 'True')
+
+@then("saves the response")
+def save_response(data: dict[str, str | int | bool], response: Response) -> None:
+    data['response'] = dumps(response.json())
+
+@then("equals to the saved response")
+def equals_saved_response(data: dict[str, str | int | bool], response: Response) -> None:
+    assert response.json() == loads(str(data['response']))
+
+@then(parsers.parse("{field} with id {id:d} has {key} equal to {value}"))
+def row_field_equals_value(field: str, id: int, key: str, value: str, response: Response) -> None:
+    assert [str(row[key]) for row in response.json()[field] if row['id'] == id] == [value]
+
+# Judge queue -------------------------------------------------------
+@given("an empty judge queue")
+def empty_judge_queue(monkeypatch: MonkeyPatch) -> None:
+    # The queue gets its own keys, so running judge workers never claim the jobs of the tests
+    for key in ['pending_key', 'debug_pending_key', 'processing_key', 'sequence_key', 'wakeup_key', 'workers_key', 'requeue_lock_key', 'job_key_prefix']:
+        monkeypatch.setattr(judge_queue, key, 'test_' + getattr(judge_queue, key))
+    judge_queue.clear()
+
+@given(parsers.parse("a visibility timeout of {seconds:d} seconds"))
+def visibility_timeout(monkeypatch: MonkeyPatch, seconds: int) -> None:
+    monkeypatch.setitem(judge_config, 'visibility_timeout', seconds)
+
+@given(parsers.parse("a maximum of {attempts:d} attempts"))
+def maximum_attempts(monkeypatch: MonkeyPatch, attempts: int) -> None:
+    monkeypatch.setitem(judge_config, 'maximum_attempts', attempts)
+
+@when(parsers.parse("enqueues the submission {submission_id:d}"))
+def enqueue_submission(data: dict[str, str | int | bool], submission_id: int) -> None:
+    data['enqueued'] = judge_queue.enqueue(submission_id, True, 1)
+
+@when(parsers.parse("enqueues the debug job {debug_id:d}"))
+def enqueue_debug(data: dict[str, str | int | bool], debug_id: int) -> None:
+    data['enqueued'] = judge_queue.enqueue_debug(debug_id, 1, dumps({'code': '', 'language': '', 'inputs': []}))
+
+@when("claims a job")
+def claim_job(data: dict[str, str | int | bool]) -> None:
+    job: tuple[str, str] | None = judge_queue.claim(1)
+    assert job is not None
+    data['job_id'], data['lease'] = job
+
+@when("requeues expired jobs")
+def requeue_expired_jobs(data: dict[str, str | int | bool]) -> None:
+    data['failed'] = dumps([job_id for job_id, _ in judge_queue.requeue_expired()])
+
+@when("extends the lease of the claimed job")
+def extend_lease(data: dict[str, str | int | bool]) -> None:
+    assert judge_queue.extend(str(data['job_id']), str(data['lease']))
+
+@when(parsers.parse("waits for the results of the debug {debug_id:d} with {count:d} inputs that never come"))
+def wait_debug_results(data: dict[str, str | int | bool], debug_id: int, count: int) -> None:
+    async def wait_results() -> list[dict[str, str | int]]:
+        debug_waiters[debug_id] = (get_running_loop(), Queue())
+        testing_users[1] = True
+        return await get_debug_results(debug_id, 1, count)
+    data['debug_results'] = dumps(run(wait_results()))
+
+@then("every debug result is an internal server error")
+def debug_results_failed(data: dict[str, str | int | bool]) -> None:
+    assert all(result['verdict_text'] == 'Internal Server Error' for result in loads(str(data['debug_results'])))
+
+@then(parsers.parse("the debug {debug_id:d} no longer blocks its user"))
+def debug_released(debug_id: int) -> None:
+    assert debug_id not in debug_waiters
+    assert 1 not in testing_users
+
+@then("the job is enqueued")
+def job_enqueued(data: dict[str, str | int | bool]) -> None:
+    assert data['enqueued'] is True
+
+@then("the job is not enqueued")
+def job_not_enqueued(data: dict[str, str | int | bool]) -> None:
+    assert data['enqueued'] is False
+
+@then(parsers.parse("the judge queue has {count:d} pending jobs"))
+def pending_jobs(count: int) -> None:
+    assert judge_queue.to_json()['pending'] + judge_queue.to_json()['debug_pending'] == count
+
+@then(parsers.parse("the claimed job is {job_id}"))
+def claimed_job(data: dict[str, str | int | bool], job_id: str) -> None:
+    assert data['job_id'] == job_id
+
+@then("no job has failed")
+def no_failed_jobs(data: dict[str, str | int | bool]) -> None:
+    assert loads(str(data['failed'])) == []
+
+@then(parsers.parse("the job {job_id} has failed"))
+def failed_job(data: dict[str, str | int | bool], job_id: str) -> None:
+    assert loads(str(data['failed'])) == [job_id]
+
+@then("the claimed job has lost its lease")
+def lost_lease(data: dict[str, str | int | bool]) -> None:
+    with raises(judge_queue.LostLease):
+        judge_queue.set_state(str(data['job_id']), str(data['lease']), 'running')
+    with raises(judge_queue.LostLease):
+        judge_queue.done(str(data['job_id']), str(data['lease']))
+
+@then("the claimed job has its lease")
+def has_lease(data: dict[str, str | int | bool]) -> None:
+    judge_queue.set_state(str(data['job_id']), str(data['lease']), 'running')
+    judge_queue.done(str(data['job_id']), str(data['lease']))
+    assert judge_queue.get_job(str(data['job_id']))['state'] == 'done'
+
+# Test case runs ----------------------------------------------------
+# Stands in for the checker, later test cases finish first and runs of the same test case on the same files are recorded if they overlap.
+# Compilations are recorded, and so are deletions with whether the slot was locked exclusively at the time
+class ScriptedLibrary(Library):
+    def __init__(self) -> None:
+        self.statuses: list[int] = []
+        self.running: set[tuple[int, int]] = set()
+        self.overlapped: bool = False
+        self.lock: Lock = Lock()
+        self.compile_status: int = 0
+        self.created: list[int] = []
+        self.deleted: list[tuple[int, bool]] = []
+
+    def create_files(self, submission_id: int, code: str, language: str, submission: int, custom_check: int, custom_check_language: str, custom_check_code: str) -> CreateFilesResultLib:
+        self.created.append(submission_id)
+        return CreateFilesResultLib(self.compile_status, "")
+
+    def delete_files(self, submission_id: int, submission: int) -> int:
+        # A shared lock of another open file is only refused while the slot is locked exclusively
+        with open(f"{compile_cache.lock_path}/{-submission_id % compile_cache.compile_cache_config['locks']}.lock", 'w') as file:
+            try:
+                flock(file, LOCK_SH | LOCK_NB)
+                flock(file, LOCK_UN)
+                self.deleted.append((submission_id, False))
+            except BlockingIOError:
+                self.deleted.append((submission_id, True))
+        return 0
+
+    def check_test_case(self, submission_id: int, test_case_id: int, language: str, input: str | bytes, solution: str | bytes, time_limit: int, memory_limit: int, custom_check: int, custom_check_language: str) -> TestResultLib:
+        with self.lock:
+            self.overlapped = self.overlapped or (submission_id, test_case_id) in self.running
+            self.running.add((submission_id, test_case_id))
+        sleep((len(self.statuses) - test_case_id) * 0.01)
+        with self.lock:
+            self.running.discard((submission_id, test_case_id))
+        return TestResultLib(self.statuses[test_case_id - 1], 0, 0, 0)
+
+@fixture
+def scripted_library() -> ScriptedLibrary:
+    return ScriptedLibrary()
+
+@given(parsers.parse("test cases with statuses {statuses}"))
+def test_case_statuses(scripted_library: ScriptedLibrary, statuses: str) -> None:
+    scripted_library.statuses = [int(status) for status in statuses.split(',')]
+
+def run_scripted_test_cases(scripted_library: ScriptedLibrary, parallelism: int, stop_on_first_failure: bool) -> list[int]:
+    test_cases: list[dict[str, Any]] = [{'id': index + 1, 'input': b"", 'solution': b""} for index in range(len(scripted_library.statuses))]
+    return [test_result.status for test_result in run_test_cases(scripted_library, -1, test_cases, "Python 3", 1000, 64, 0, "", stop_on_first_failure, parallelism)]
+
+@when(parsers.parse("runs the test cases {parallelism:d} at a time with stop on first failure {stop_on_first_failure}"))
+def run_test_cases_at_a_time(data: dict[str, str | int | bool], scripted_library: ScriptedLibrary, parallelism: int, stop_on_first_failure: str) -> None:
+    data[f"statuses_{parallelism}"] = dumps(run_scripted_test_cases(scripted_library, parallelism, stop_on_first_failure == 'true'))
+
+@when(parsers.parse("runs the test cases {parallelism:d} at a time on the same files from {workers:d} workers"))
+def run_test_cases_from_workers(scripted_library: ScriptedLibrary, parallelism: int, workers: int) -> None:
+    with ThreadPoolExecutor(max_workers=workers) as workers_executor:
+        for worker in [workers_executor.submit(run_scripted_test_cases, scripted_library, parallelism, False) for _ in range(workers)]:
+            worker.result()
+
+@then(parsers.parse("runs {parallelism:d} at a time return the statuses {statuses} as runs one at a time"))
+def same_statuses(data: dict[str, str | int | bool], parallelism: int, statuses: str) -> None:
+    assert loads(str(data[f"statuses_{parallelism}"])) == loads(str(data['statuses_1'])) == [int(status) for status in statuses.split(',')]
+
+@then("runs of the same test case on the same files never overlap")
+def no_overlapping_runs(scripted_library: ScriptedLibrary) -> None:
+    assert not scripted_library.overlapped
+
+# Connection pool ---------------------------------------------------
+
+@fixture
+def connection_pool() -> Generator[ConnectionPool, None, None]:
+    pool: ConnectionPool = ConnectionPool(db_config, 1, 0.1, 10, 5)
+    yield pool
+    pool.reset()
+
+@fixture
+def pool_connections(connection_pool: ConnectionPool) -> Generator[list[Any], None, None]:
+    connections: list[Any] = []
+    yield connections
+    connection_pool.close_quietly(connections)
+
+@fixture
+def pool_clock() -> list[float]:
+    return [0]
+
+@fixture
+def pool_pings() -> list[Any]:
+    return []
+
+@given(parsers.parse("a connection pool of {size:d} connections"))
+def connection_pool_size(connection_pool: ConnectionPool, size: int) -> None:
+    connection_pool.size = size
+
+@given("a stopped pool clock")
+def stopped_pool_clock(monkeypatch: MonkeyPatch, pool_clock: list[float]) -> None:
+    monkeypatch.setattr(connection_cursor, 'monotonic', lambda: pool_clock[0])
+
+@when(parsers.parse("{seconds:d} seconds pass on the pool clock"))
+def pool_clock_passes(pool_clock: list[float], seconds: int) -> None:
+    pool_clock[0] += seconds
+
+@when(parsers.parse("acquires {count:d} connections from the pool"))
+def acquire_connections(connection_pool: ConnectionPool, pool_connections: list[Any], count: int) -> None:
+    for _ in range(count):
+        pool_connections.append(connection_pool.acquire())
+
+@when("releases the connections to the pool")
+def release_connections(connection_pool: ConnectionPool, pool_connections: list[Any]) -> None:
+    for connection in pool_connections:
+        connection_pool.release(connection)
+    pool_connections.clear()
+
+@when("watches the pings of the idle connections")
+def watch_pings(connection_pool: ConnectionPool, pool_pings: list[Any]) -> None:
+    for connection, _ in connection_pool.idle:
+        def is_connected(connection: Any = connection, is_connected: Any = connection.is_connected) -> bool:
+            pool_pings.append(connection)
+            return is_connected()
+        connection.is_connected = is_connected
+
+@when("the pool is inherited by a forked process")
+def fork_pool(data: dict[str, str | int | bool], connection_pool: ConnectionPool, pool_connections: list[Any]) -> None:
+    # The idle connections of the parent are dropped by the child without being closed, so they are closed with the rest of the test
+    pool_connections += [connection for connection, _ in connection_pool.idle]
+    data['parent_connections'] = dumps([id(connection) for connection in pool_connections])
+    # The pool only tells a child from its parent by the process id it was used in last
+    connection_pool.pid = os.getpid() + 1
+
+@then("acquiring a connection fails with 503 after the pool timeout")
+def acquire_exhausted(connection_pool: ConnectionPool) -> None:
+    started: float = monotonic()
+    with raises(HTTPException) as exception:
+        connection_pool.acquire()
+    assert exception.value.status_code == 503
+    assert monotonic() - started >= connection_pool.timeout
+
+@then(parsers.parse("the pool has {count:d} connections in use and {idle:d} idle"))
+def pool_connections_count(connection_pool: ConnectionPool, count: int, idle: int) -> None:
+    assert connection_pool.in_use == count
+    assert len(connection_pool.idle) == idle
+
+@then(parsers.parse("the pool metric {metric} is {value:d}"))
+def pool_metric(connection_pool: ConnectionPool, metric: str, value: int) -> None:
+    assert connection_pool.metrics[metric] == value
+
+@then(parsers.parse("the idle connections are pinged {count:d} times"))
+def pinged_times(pool_pings: list[Any], count: int) -> None:
+    assert len(pool_pings) == count
+
+@then("the last acquired connection is not one of the parent process")
+def parent_connections_not_reused(data: dict[str, str | int | bool], pool_connections: list[Any]) -> None:
+    assert id(pool_connections[-1]) not in loads(str(data['parent_connections']))
+
+# Submission results ------------------------------------------------
+
+@given(parsers.parse("a results flush size of {size:d}"))
+def results_flush_size(monkeypatch: MonkeyPatch, size: int) -> None:
+    monkeypatch.setitem(judge_config, 'results_flush_size', size)
+
+@when(parsers.parse("writes the results with statuses {statuses} of a submission"))
+def write_submission_results(monkeypatch: MonkeyPatch, data: dict[str, str | int | bool], statuses: str) -> None:
+    flushes: list[int] = []
+    insert_submission_results: Any = submission_results.insert_submission_results
+    def counted_insert_submission_results(cursor: MySQLCursorAbstract, results: list[dict[str, int]]) -> None:
+        if len(results) > 0:
+            flushes.append(len(results))
+        insert_submission_results(cursor, results)
+    monkeypatch.setattr(submission_results, 'insert_submission_results', counted_insert_submission_results)
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        cursor.execute("""
+            INSERT INTO submissions (author_user_id, problem_id, code, language_id, time_sent, checked, compiled, compilation_details, correct_score, total_score, total_verdict_id, problem_edition)
+            VALUES (1, 1, '', 1, '2024-01-01 00:00:00', 0, 1, '', 0, 0, 1, 1)
+        """)
+        submission_id: int = int(cursor.lastrowid or 0)
+        # Problem 1 has the test cases 1 to 6
+        results: list[dict[str, int]] = []
+        for index, status in enumerate(statuses.split(',')):
+            submission_results.add_submission_result(cursor, results, {'submission_id': submission_id, 'test_case_id': index + 1, 'verdict_id': int(status) + 2, 'time_taken': 0, 'cpu_time_taken': 0, 'physical_memory_taken': 0})
+        submission_results.insert_submission_results(cursor, results)
+    data['submission_id'] = submission_id
+    data['flushes'] = dumps(flushes)
+
+@then(parsers.parse("the results are written by inserts of {sizes}"))
+def results_flushes(data: dict[str, str | int | bool], sizes: str) -> None:
+    assert loads(str(data['flushes'])) == [int(size) for size in sizes.split(',')]
+
+@then(parsers.parse("the results are stored in test order with the verdicts {verdicts}"))
+def results_stored(data: dict[str, str | int | bool], verdicts: str) -> None:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        cursor.execute("SELECT test_case_id, verdict_id FROM submission_results WHERE submission_id = %(submission_id)s ORDER BY id", {'submission_id': data['submission_id']})
+        assert [(result['test_case_id'], result['verdict_id']) for result in cursor.fetchall()] == [(index + 1, int(verdict)) for index, verdict in enumerate(verdicts.split(','))]
+
+# Cached test cases -------------------------------------------------
+
+@fixture
+def cached_test_cases() -> CachedTestCases:
+    return CachedTestCases(0)
+
+@given(parsers.parse("a test cases cache of {size:d} bytes"))
+def test_cases_cache(cached_test_cases: CachedTestCases, size: int) -> None:
+    cached_test_cases.size = size
+
+@when(parsers.parse("puts {size:d} bytes of test cases of the problem {problem_id:d} edition {edition:d}"))
+def put_test_cases(cached_test_cases: CachedTestCases, size: int, problem_id: int, edition: int) -> None:
+    cached_test_cases.put(problem_id, edition, [{'input': b"0" * (size // 2), 'solution': b"0" * (size - size // 2)}])
+
+@when(parsers.parse("reads the test cases of the problem {problem_id:d} edition {edition:d}"))
+def read_test_cases(cached_test_cases: CachedTestCases, problem_id: int, edition: int) -> None:
+    assert cached_test_cases.get(problem_id, edition) is not None
+
+@then(parsers.parse("the test cases of the problem {problem_id:d} edition {edition:d} are cached"))
+def test_cases_cached(cached_test_cases: CachedTestCases, problem_id: int, edition: int) -> None:
+    assert (problem_id, edition) in cached_test_cases.entries
+
+@then(parsers.parse("the test cases of the problem {problem_id:d} edition {edition:d} are not cached"))
+def test_cases_not_cached(cached_test_cases: CachedTestCases, problem_id: int, edition: int) -> None:
+    assert (problem_id, edition) not in cached_test_cases.entries
+
+@then(parsers.parse("the test cases cache uses {used:d} bytes"))
+def test_cases_cache_used(cached_test_cases: CachedTestCases, used: int) -> None:
+    assert cached_test_cases.used == used == sum(size for _, size in cached_test_cases.entries.values())
+
+# Compile cache -----------------------------------------------------
+
+@given(parsers.parse("an empty compile cache of {size:d} entries"))
+def empty_compile_cache(monkeypatch: MonkeyPatch, tmp_path: Any, size: int) -> None:
+    # The cache gets its own keys and lock files, so running judge workers never share the entries of the tests
+    monkeypatch.setattr(compile_cache, 'entries_key', 'test_' + compile_cache.entries_key)
+    monkeypatch.setattr(compile_cache, 'lru_key', 'test_' + compile_cache.lru_key)
+    monkeypatch.setattr(compile_cache, 'lock_path', str(tmp_path))
+    monkeypatch.setitem(compile_cache.compile_cache_config, 'size', size)
+    cache.delete(compile_cache.entries_key, compile_cache.lru_key)
+
+@given(parsers.parse("compilations end with the status {status:d}"))
+def compilation_status(scripted_library: ScriptedLibrary, status: int) -> None:
+    scripted_library.compile_status = status
+
+def compile_code(scripted_library: ScriptedLibrary, data: dict[str, str | int | bool], code: str) -> None:
+    with compile_cache.compiled_files(scripted_library, 1, code, "Python 3", 0, 0, "", "") as (slot, create_files_result):
+        data['compilations'] = dumps(loads(str(data.get('compilations', '[]'))) + [{'code': code, 'slot': slot, 'status': create_files_result.status}])
+
+@when(parsers.parse("compiles the code {code}"))
+def compiles_code(scripted_library: ScriptedLibrary, data: dict[str, str | int | bool], code: str) -> None:
+    compile_code(scripted_library, data, code)
+
+@when(parsers.parse("judges the code {judged_code} while compiling the code {code}"))
+def compiles_code_while_judging(scripted_library: ScriptedLibrary, data: dict[str, str | int | bool], judged_code: str, code: str) -> None:
+    with compile_cache.compiled_files(scripted_library, 1, judged_code, "Python 3", 0, 0, "", "") as (slot, create_files_result):
+        data['compilations'] = dumps(loads(str(data.get('compilations', '[]'))) + [{'code': judged_code, 'slot': slot, 'status': create_files_result.status}])
+        compile_code(scripted_library, data, code)
+
+def get_compiled_slots(data: dict[str, str | int | bool], code: str) -> list[int]:
+    return [compilation['slot'] for compilation in loads(str(data['compilations'])) if compilation['code'] == code]
+
+@then(parsers.parse("the checker compiles {count:d} times"))
+def compiled_times(scripted_library: ScriptedLibrary, count: int) -> None:
+    assert len(scripted_library.created) == count
+
+@then(parsers.parse("every compilation of the code {code} gets the same files"))
+def same_compiled_files(data: dict[str, str | int | bool], code: str) -> None:
+    assert len(set(get_compiled_slots(data, code))) == 1
+
+@then(parsers.parse("every compilation ends with the status {status:d}"))
+def compilations_status(data: dict[str, str | int | bool], status: int) -> None:
+    assert all(compilation['status'] == status for compilation in loads(str(data['compilations'])))
+
+@then(parsers.parse("the files of the code {code} are cached"))
+def files_cached(scripted_library: ScriptedLibrary, data: dict[str, str | int | bool], code: str) -> None:
+    slot: int = get_compiled_slots(data, code)[-1]
+    assert cache.hget(compile_cache.entries_key, compile_cache.get_key(code, "Python 3", 0, 0, "", "")) is not None
+    assert os.path.exists(compile_cache.get_mark_path(slot))
+    assert slot not in [deleted_slot for deleted_slot, _ in scripted_library.deleted]
+
+@then(parsers.parse("the files of the code {code} are evicted under an exclusive lock"))
+def files_evicted(scripted_library: ScriptedLibrary, data: dict[str, str | int | bool], code: str) -> None:
+    slot: int = get_compiled_slots(data, code)[-1]
+    assert cache.hget(compile_cache.entries_key, compile_cache.get_key(code, "Python 3", 0, 0, "", "")) is None
+    assert cache.zscore(compile_cache.lru_key, compile_cache.get_key(code, "Python 3", 0, 0, "", "")) is None
+    assert not os.path.exists(compile_cache.get_mark_path(slot))
+    assert scripted_library.deleted == [(slot, True)]
+
+@then(parsers.parse("the files of every compilation of the code {code} are deleted"))
+def files_deleted(scripted_library: ScriptedLibrary, data: dict[str, str | int | bool], code: str) -> None:
+    assert [deleted_slot for deleted_slot, _ in scripted_library.deleted] == get_compiled_slots(data, code)
+
+# Scoreboards -------------------------------------------------------
+@then("add the scoreboard competition to the database")
+def scoreboard_competition_in_database() -> None:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        cursor.execute("""
+            INSERT INTO problems (author_user_id, name, statement, input_statement, output_statement, notes, time_restriction, memory_restriction, private, approved, edition)
+            VALUES (2, 'A', 'A', 'A', 'A', 'A', 1, 128, 0, 1, 1), (2, 'B', 'B', 'B', 'B', 'B', 1, 128, 0, 1, 1)
+        """)
+        cursor.execute("""
+            INSERT INTO competitions (author_user_id, name, description, start_time, end_time, private, maximum_team_members_number, auto_confirm_participants, approved, only_count_submissions_with_zero_edition_difference, only_count_solved_or_not, count_scores_as_percentages, time_penalty_coefficient, wrong_attempt_penalty)
+            VALUES (2, 'Scoreboard', 'Scoreboard', '2024-01-01 00:00:00', '2024-01-02 00:00:00', 0, 1, 1, 1, 0, 0, 0, 1, 20)
+        """)
+        cursor.execute("INSERT INTO competition_problems (competition_id, problem_id, problem_edition) VALUES (1, 2, 1), (1, 3, 1)")
+        cursor.execute("""
+            INSERT INTO competition_participants (competition_id, team_id, author_confirmed, author_declined, participant_confirmed, participant_declined)
+            VALUES (1, 2, 1, 0, 1, 0), (1, 3, 1, 0, 1, 0)
+        """)
+    # The correct team solves A at the second attempt and gets a partial score on B, another team solves A at once, submissions before the start and after the end do not count
+    for team_id, problem_id, time_sent, correct_score in [(2, 2, '2024-01-01 00:10:00', 0), (2, 2, '2024-01-01 00:30:00', 10), (2, 3, '2024-01-01 00:20:00', 5), (2, 3, '2024-01-01 01:00:00', 3), (2, 2, '2024-01-02 01:00:00', 10), (3, 2, '2024-01-01 00:05:00', 10), (3, 3, '2023-12-31 23:00:00', 10)]:
+        add_competition_submission(team_id, problem_id, time_sent, correct_score)
+
+def add_competition_submission(team_id: int, problem_id: int, time_sent: str, correct_score: int) -> int:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        cursor.execute("""
+            INSERT INTO submissions (author_user_id, problem_id, code, language_id, time_sent, checked, compiled, compilation_details, correct_score, total_score, total_verdict_id, problem_edition)
+            VALUES (%(author_user_id)s, %(problem_id)s, '', 1, %(time_sent)s, 1, 1, '', %(correct_score)s, 10, %(total_verdict_id)s, 1)
+        """, {'author_user_id': team_id, 'problem_id': problem_id, 'time_sent': time_sent, 'correct_score': correct_score, 'total_verdict_id': 2 if correct_score == 10 else 3})
+        submission_id: int = int(cursor.lastrowid or 0)
+        cursor.execute("INSERT INTO competition_submissions (competition_id, submission_id, team_id) VALUES (1, %(submission_id)s, %(team_id)s)", {'submission_id': submission_id, 'team_id': team_id})
+        return submission_id
+
+@when(parsers.parse("{count:d} subscribers watch the scoreboard of the competition {competition_id:d} while it is reset"))
+def watch_scoreboard_reset(data: dict[str, str | int | bool], count: int, competition_id: int) -> None:
+    # Subscribers share the event loop of the entered client, as they do in the server
+    with TestClient(app) as test_client, ExitStack() as websockets_stack:
+        websockets: list[Any] = [websockets_stack.enter_context(test_client.websocket_connect(f"/ws/competitions/{competition_id}/scoreboard")) for _ in range(count)]
+        data['connect_messages'] = dumps([loads(websocket.receive_text()) for websocket in websockets])
+        invalidate_scoreboard(competition_id)
+        data['reset_messages'] = dumps([websocket.receive_text() for websocket in websockets])
+        data['rebuilds'] = realtime_scoreboards[competition_id].rebuilds
+
+@then("every subscriber gets the same rebuilt scoreboard")
+def same_rebuilt_scoreboard(data: dict[str, str | int | bool]) -> None:
+    reset_messages: list[str] = loads(str(data['reset_messages']))
+    assert len(set(reset_messages)) == 1
+    assert loads(reset_messages[0])['type'] == 'scoreboard'
+    assert [loads(reset_message) for reset_message in reset_messages] == loads(str(data['connect_messages']))
+
+@then(parsers.parse("the scoreboard is rebuilt {count:d} time per reset"))
+def rebuilds_per_reset(data: dict[str, str | int | bool], count: int) -> None:
+    assert data['rebuilds'] == count
+
+# Computed by the per participant loops the scoreboard had before it was read with one query
+@fixture
+def baseline_scoreboard() -> dict[str, Any]:
+    return {
+        'time_penalty_coefficient': 1.0,
+        'wrong_attempt_penalty': 20,
+        'participants': [
+            {
+                'username_or_team_name': 'correct',
+                'individual': 1,
+                'problems': [
+                    {'id': 2, 'name': 'A', 'edition': 1, 'best_score': 10, 'solved': True, 'penalty_minutes': 30, 'penalty_score': 50, 'attempts': 2},
+                    {'id': 3, 'name': 'B', 'edition': 1, 'best_score': 5, 'solved': False, 'penalty_minutes': 0, 'penalty_score': 0, 'attempts': 1}
+                ],
+                'total_score': 15,
+                'total_penalty_score': 50
+            },
+            {
+                'username_or_team_name': 'another',
+                'individual': 1,
+                'problems': [
+                    {'id': 2, 'name': 'A', 'edition': 1, 'best_score': 10, 'solved': True, 'penalty_minutes': 5, 'penalty_score': 5, 'attempts': 1},
+                    {'id': 3, 'name': 'B', 'edition': 1, 'best_score': None, 'solved': False, 'penalty_minutes': 0, 'penalty_score': 0, 'attempts': 0}
+                ],
+                'total_score': 10,
+                'total_penalty_score': 5
+            }
+        ]
+    }
+
+@then("equals to the baseline scoreboard")
+def equals_baseline_scoreboard(baseline_scoreboard: dict[str, Any], response: Response) -> None:
+    assert response.json() == baseline_scoreboard
+
+@given(parsers.parse("the stored scoreboard of the competition {competition_id:d}"))
+def stored_scoreboard(data: dict[str, str | int | bool], competition_id: int) -> None:
+    assert client.get(f"/competitions/{competition_id}/scoreboard").status_code == 200
+    data['stored_scoreboard'] = dumps(cache.hgetall(get_scoreboard_key(competition_id)))
+
+@when(parsers.parse("the competition {competition_id:d} gets a judged submission of the team {team_id:d} for the problem {problem_id:d}"))
+def judged_competition_submission(competition_id: int, team_id: int, problem_id: int) -> None:
+    submission_id: int = add_competition_submission(team_id, problem_id, '2024-01-01 02:00:00', 10)
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        update_scoreboard_submission(cursor, submission_id)
+
+@when(parsers.parse("the team {team_id:d} row of the competition {competition_id:d} is written with a stale version"))
+def stale_scoreboard_write(data: dict[str, str | int | bool], team_id: int, competition_id: int) -> None:
+    stored: dict[str, str] = loads(str(data['stored_scoreboard']))
+    data['team_write'] = dumps(update_scoreboard_team_script(keys=[get_scoreboard_key(competition_id)], args=[team_id, '{}', stored['version']]))
+    data['scoreboard_write'] = store_scoreboard_script(keys=[get_scoreboard_key(competition_id), get_scoreboard_version_key(competition_id)], args=[int(stored['version']) - 1, scoreboard_config['ttl'], team_id, '{}'])
+
+@then("the stale writes are rejected")
+def stale_writes_rejected(data: dict[str, str | int | bool]) -> None:
+    assert loads(str(data['team_write'])) is None
+    assert data['scoreboard_write'] == 0
+
+@then(parsers.parse("only the team {team_id:d} changed in the stored scoreboard of the competition {competition_id:d}"))
+def only_team_changed(data: dict[str, str | int | bool], team_id: int, competition_id: int) -> None:
+    stored: dict[str, str] = loads(str(data['stored_scoreboard']))
+    current: dict[str, str] = cache.hgetall(get_scoreboard_key(competition_id))
+    assert {field for field in stored.keys() | current.keys() if stored.get(field) != current.get(field)} == {str(team_id), f"version:{team_id}"}
+
+@then(parsers.parse("the stored scoreboard of the competition {competition_id:d} is unchanged"))
+def stored_scoreboard_unchanged(data: dict[str, str | int | bool], competition_id: int) -> None:
+    assert cache.hgetall(get_scoreboard_key(competition_id)) == loads(str(data['stored_scoreboard']))
+
+@when(parsers.parse("the scoreboard of the competition {competition_id:d} is invalidated"))
+def scoreboard_invalidated(competition_id: int) -> None:
+    invalidate_scoreboard(competition_id)
+
+@then(parsers.parse("equals to the cold scoreboard of the competition {competition_id:d}"))
+def equals_cold_scoreboard(competition_id: int, response: Response) -> None:
+    cursor: MySQLCursorAbstract
+    with ConnectionCursor(db_config) as cursor:
+        competition: Any = get_scoreboard_competition(cursor, competition_id)
+        problems: list[Any] = get_scoreboard_problems(cursor, competition_id)
+        submissions: dict[tuple[int, int], list[Any]] = get_scoreboard_submissions(cursor, competition_id, competition)
+        participants: list[dict[str, Any]] = [get_scoreboard_participant(team, problems, submissions, competition) for team in get_scoreboard_teams(cursor, competition_id)]
+    assert response.json() == loads(dumps({
+        'time_penalty_coefficient': competition['time_penalty_coefficient'],
+        'wrong_attempt_penalty': competition['wrong_attempt_penalty'],
+        'participants': sort_scoreboard_participants(participants)
+    }))
+    assert 'version' in cache.hgetall(get_scoreboard_key(competition_id))
@@ -0,0 +1,3 @@
+from pytest_bdd import scenarios
+
+scenarios("../features/async_connection_cursor.feature")